@@ -0,0 +1,168 @@
+# ai_migrate_v1_to_v2.py
+# Warm-start a v2 (30-dim obs) PPO run from the latest v1 (24-dim obs) checkpoint
+# - Maps v1 observation indices onto the v2 layout
+# - Expands the first layer of the policy/value MLPs; new feature columns start at zero
+# - Carries the matching VecNormalize mean/var entries over; new entries start at mean 0 / var 1
+#   and the sample count is capped so the new entries adapt within the first rollouts
+#
+# Usage: python ai_migrate_v1_to_v2.py [--src checkpoints/ai_v1] [--dst checkpoints/ai_v2] [--force]
+
+import argparse
+import os
+import pickle
+import sys
+from typing import Dict, List
+
+import numpy as np
+import torch
+
+import gymnasium as gym
+from gymnasium import spaces
+
+from stable_baselines3 import PPO
+from stable_baselines3.common.running_mean_std import RunningMeanStd
+from stable_baselines3.common.vec_env import DummyVecEnv
+
+from ai_ppo_server import latest_ckpt
+
+
+BASE_DIR = os.path.dirname(__file__)
+CKPT_BASE_DIR = os.path.join(BASE_DIR, "checkpoints")
+
+V1_OBS_DIM = 24
+V2_OBS_DIM = 30
+ACTION_DIM = 5
+
+# v2 index for each v1 feature (0-based). v2 adds the 2nd and 3rd upcoming checkpoint
+# (v2 indices 9..14) between the first checkpoint and the rays; everything else shifts by 6.
+#   0-4   car/velocity angle, speed        -> 0-4
+#   5     drift signal                     -> 5  (frameScore_norm in v2)
+#   6-8   next checkpoint dx, dy, angle    -> 6-8
+#   9-15  7 ray distances                  -> 15-21
+#   16-23 wall prox, progress, time, wrong way, pos x/y, boost, multiplier -> 22-29
+V1_TO_V2_OBS_INDEX: List[int] = list(range(0, 9)) + list(range(15, 30))
+assert len(V1_TO_V2_OBS_INDEX) == V1_OBS_DIM
+
+# RunningMeanStd keeps one sample count for all features and weights updates by it, so
+# carrying a long v1 run's count over would freeze the placeholder stats of the new
+# features. Capping it lets them converge within a few rollouts; the carried-over
+# features are already close and only move slightly.
+MIGRATED_OBS_COUNT = 10_000.0
+
+
+class SpaceOnlyEnv(gym.Env):
+    """Carries the v2 spaces so PPO can build a policy; never stepped."""
+    metadata = {}
+
+    def __init__(self, obs_dim: int):
+        super().__init__()
+        self.observation_space = spaces.Box(low=-1.0, high=1.0, shape=(obs_dim,), dtype=np.float32)
+        self.action_space = spaces.Box(low=-1.0, high=1.0, shape=(ACTION_DIM,), dtype=np.float32)
+
+    def reset(self, *, seed=None, options=None):
+        return np.zeros(self.observation_space.shape, dtype=np.float32), {}
+
+    def step(self, action):
+        raise RuntimeError("SpaceOnlyEnv is not meant to be stepped")
+
+
+def expand_input_layers(state_dict: Dict[str, torch.Tensor]) -> Dict[str, torch.Tensor]:
+    """Widen every first MLP layer from V1_OBS_DIM to V2_OBS_DIM input columns."""
+    index = torch.as_tensor(V1_TO_V2_OBS_INDEX, dtype=torch.long)
+    expanded = {}
+    for key, value in state_dict.items():
+        is_input_layer = (
+            key.startswith("mlp_extractor.")
+            and key.endswith(".0.weight")
+            and value.ndim == 2
+            and value.shape[1] == V1_OBS_DIM
+        )
+        if is_input_layer:
+            weight = torch.zeros(value.shape[0], V2_OBS_DIM, dtype=value.dtype)
+            weight[:, index] = value
+            expanded[key] = weight
+            print(f"[MIGRATE] {key}: {tuple(value.shape)} -> {tuple(weight.shape)}")
+        else:
+            expanded[key] = value
+    return expanded
+
+
+def migrate_model(src_zip: str, dst_zip: str):
+    v1 = PPO.load(src_zip, device="cpu")
+    if v1.observation_space.shape != (V1_OBS_DIM,):
+        raise RuntimeError(f"Expected a {V1_OBS_DIM}-dim v1 model, got {v1.observation_space.shape}")
+
+    env = DummyVecEnv([lambda: SpaceOnlyEnv(V2_OBS_DIM)])
+    v2 = PPO(
+        policy=v1.policy_class,
+        env=env,
+        policy_kwargs=v1.policy_kwargs,
+        n_steps=v1.n_steps,
+        batch_size=v1.batch_size,
+        gae_lambda=v1.gae_lambda,
+        gamma=v1.gamma,
+        learning_rate=v1.learning_rate,
+        n_epochs=v1.n_epochs,
+        clip_range=v1.clip_range,
+        ent_coef=v1.ent_coef,
+        vf_coef=v1.vf_coef,
+        device="cpu",
+    )
+    # Optimizer moments are shaped for the old layer, so v2 starts with a fresh optimizer
+    v2.policy.load_state_dict(expand_input_layers(v1.policy.state_dict()))
+    v2.num_timesteps = v1.num_timesteps
+    v2.save(dst_zip)
+    print(f"[MIGRATE] Saved v2 model to {dst_zip} (num_timesteps={v2.num_timesteps})")
+
+
+def migrate_obs_rms(old_rms: RunningMeanStd) -> RunningMeanStd:
+    if old_rms.mean.shape != (V1_OBS_DIM,):
+        raise RuntimeError(f"Expected {V1_OBS_DIM}-dim VecNormalize stats, got {old_rms.mean.shape}")
+
+    new_rms = RunningMeanStd(shape=(V2_OBS_DIM,))
+    new_rms.mean[V1_TO_V2_OBS_INDEX] = old_rms.mean
+    new_rms.var[V1_TO_V2_OBS_INDEX] = old_rms.var
+    new_rms.count = min(float(old_rms.count), MIGRATED_OBS_COUNT)
+    return new_rms
+
+
+def migrate_vecnorm(src_pkl: str, dst_pkl: str):
+    with open(src_pkl, "rb") as f:
+        vecnorm = pickle.load(f)
+
+    vecnorm.obs_rms = migrate_obs_rms(vecnorm.obs_rms)
+    vecnorm.observation_space = spaces.Box(low=-1.0, high=1.0, shape=(V2_OBS_DIM,), dtype=np.float32)
+    with open(dst_pkl, "wb") as f:
+        pickle.dump(vecnorm, f)
+    print(f"[MIGRATE] Saved v2 VecNormalize stats to {dst_pkl}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm-start ai_v2 checkpoints from ai_v1.")
+    parser.add_argument("--src", default=os.path.join(CKPT_BASE_DIR, "ai_v1"))
+    parser.add_argument("--dst", default=os.path.join(CKPT_BASE_DIR, "ai_v2"))
+    parser.add_argument("--force", action="store_true", help="write even if the destination has checkpoints")
+    args = parser.parse_args()
+
+    src_zip = latest_ckpt(args.src)
+    if not src_zip:
+        print(f"[MIGRATE] No v1 checkpoint found in {args.src}")
+        sys.exit(1)
+    if latest_ckpt(args.dst) and not args.force:
+        print(f"[MIGRATE] {args.dst} already has checkpoints; pass --force to add the migrated one anyway")
+        sys.exit(1)
+
+    os.makedirs(args.dst, exist_ok=True)
+    print(f"[MIGRATE] Source checkpoint: {src_zip}")
+    # Newest file wins in latest_ckpt(), so the v2 server resumes from this one
+    migrate_model(src_zip, os.path.join(args.dst, "ppo_drift_migrated_from_v1.zip"))
+
+    src_pkl = os.path.join(args.src, "vecnorm.pkl")
+    if os.path.exists(src_pkl):
+        migrate_vecnorm(src_pkl, os.path.join(args.dst, "vecnorm.pkl"))
+    else:
+        print(f"[MIGRATE] No VecNormalize stats at {src_pkl}; v2 will start fresh stats")
+
+
+if __name__ == "__main__":
+    main()
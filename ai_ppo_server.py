@@ -4,19 +4,34 @@
 # - Infinite training in chunks
 # - Checkpoint save/restore + VecNormalize save/restore
 # - Reason logger
-# - Optional render "watch windows"
-# - Anti-stall warmup curriculum
-
+# - Spectator stream: throttled car pose/telemetry for viewer tabs (?spectate=1)
+# - Anti-stall warmup curriculum, annealed by the rolling "stuck" rate; envs report the applied action
+# - Failure-driven spawn sampler: resets favour checkpoints where episodes fail
+# - Headless mode: spawn N Node game instances as child processes (no browser)
+# - Multi-car games: K AI cars per game instance, stepped together and batched into one VecEnv
+# - Throughput calibration (--calibrate): times env count / frame skip / PPO batch shape
+#   and writes a recommended config that main() loads on the next run
+# - CPU learner fast path: learner/bridge thread pinning, preallocated minibatches,
+#   optional torch.compile, per-epoch update timing
+
+import argparse
 import asyncio
+import collections
+import functools
 import json
 import os
+import resource
 import time
+import select
 import signal
+import subprocess
 import sys
+from abc import ABC, abstractmethod
 from threading import Thread, Event
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 import numpy as np
+import torch
 import websockets
 
 import gymnasium as gym
@@ -24,8 +39,15 @@ from gymnasium import spaces
 
 from stable_baselines3 import PPO
 from stable_baselines3.common.callbacks import BaseCallback, CheckpointCallback, CallbackList
-from stable_baselines3.common.vec_env import DummyVecEnv, VecNormalize
+from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv, VecEnv, VecMonitor, VecNormalize
 from stable_baselines3.common.monitor import Monitor
+from stable_baselines3.common.buffers import RolloutBuffer
+from stable_baselines3.common.type_aliases import RolloutBufferSamples
+
+try:
+    import psutil
+except ImportError:  # memory figures fall back to peak RSS from getrusage
+    psutil = None
 
 
 # ========================
@@ -47,21 +69,81 @@ SAVE_EVERY_STEPS = 25_000
 FRAME_SKIP = 4
 DISABLE_RENDER_FOR_SPEED = True
 
-# Optional watch windows
-ENABLE_WATCH_WINDOWS = False
-WATCH_EVERY_STEPS = 100_000
-WATCH_FOR_SECONDS = 15
+# PPO batch shape (n_steps is per env)
+PPO_N_STEPS = 4096
+PPO_BATCH_SIZE = 1024
+PPO_N_EPOCHS = 10
+
+# CPU learner (used when no CUDA device is available): the PPO update runs on pinned
+# learner cores while the bridge / spectator asyncio threads keep their own reserved cores.
+CPU_LEARNER = True
+BRIDGE_RESERVED_CORES = 1         # cores kept free for the env I/O threads
+LEARNER_THREADS = None            # None = every core not reserved for the bridge
+TORCH_COMPILE = False             # compile the policy MLP in place (torch >= 2.2)
+
+# Throughput calibration (python ai_ppo_server.py --calibrate). Runs headless games only.
+# Stage 1 times random-action rollouts over env count x frame skip; stage 2 times one PPO
+# rollout + update per batch shape on the fastest env setup. Only list values you are
+# happy to train with: the recommendation simply maximizes end-to-end env steps/sec.
+TUNED_CONFIG_PATH = os.path.join(BASE_DIR, "ppo_tuned.json")
+CALIBRATE_ENV_COUNTS = [1, 2, 4, 8]
+CALIBRATE_FRAME_SKIPS = [2, 4, 6]
+CALIBRATE_N_STEPS = [1024, 2048, 4096]
+CALIBRATE_BATCH_SIZES = [256, 512, 1024]
+CALIBRATE_N_EPOCHS = [5, 10]
+CALIBRATE_ROLLOUT_SECONDS = 10.0
+CALIBRATE_MAX_MEMORY_MB = 0       # 0 = no memory limit on recommended settings
+
+# Headless envs: run the game in Node (src/sim/headless.ts) as child processes
+# talking JSON lines over stdio. 0 = wait for a browser tab on the WebSocket instead.
+HEADLESS_ENVS = 0
+HEADLESS_AI_VERSION = 2
+HEADLESS_TRACK = None             # None = first track in tracks.json
+HEADLESS_CMD = ["npx", "ts-node", "src/sim/headless.ts"]
+HEADLESS_START_TIMEOUT_S = 60
+
+# Multi-car games: K AI cars share one game instance (one track, one simulation step) and
+# report one batched result per step, so the PPO batch grows without more processes.
+# Headless: every game gets K cars and all games are stepped from this process in lockstep.
+# Browser: open the game with ?ai=1&aicars=K (&aicollide=1); K is read from its hello.
+CARS_PER_GAME = 1
+CAR_COLLISIONS = False            # car-to-car contact between the K cars (headless games)
+
+# Spectator stream: the game attaches ~10 Hz pose/telemetry frames to step infos and we
+# fan them out to viewer tabs (open the game with ?spectate=1). Never blocks training.
+ENABLE_SPECTATOR = True
+SPECTATOR_PORT = 8766
 
 # Targets / stopping criteria
 DRIFTSCORE_TARGET = 1_000_000
 STOP_ON_DRIFTSCORE = True
 
-# Curriculum / anti-stall warmup
+# Curriculum / anti-stall warmup (values at full strength, curriculum level 1.0)
 WARMUP_STEPS_PER_EPISODE = 600
 MIN_THROTTLE_DURING_WARMUP = 0.55
 MAX_BRAKE_DURING_WARMUP = 0.10
 DISABLE_HANDBRAKE_DURING_WARMUP = True
 
+# Adaptive warmup: the level scales warmup length and clamp strength. It drops while few
+# episodes end "stuck" and climbs back if the stuck rate rises again. False = always 1.0.
+ADAPTIVE_WARMUP = True
+CURRICULUM_WINDOW = 200           # episodes in the rolling termination-reason window
+CURRICULUM_UPDATE_EVERY = 25      # episodes between level updates
+CURRICULUM_STUCK_LOW = 0.05       # stuck rate below this: anneal
+CURRICULUM_STUCK_HIGH = 0.15      # stuck rate above this: strengthen again
+CURRICULUM_LEVEL_STEP = 0.1
+
+# Report the clamped action the game actually applied (info["applied_action"]); the rollout
+# buffer is relabeled with it so PPO updates on what the car really did.
+RELABEL_APPLIED_ACTIONS = True
+
+# Spawn sampler: per-checkpoint failure rates are sent with every reset as spawn weights.
+# A floor keeps some uniform coverage; old statistics decay every episode.
+ENABLE_SPAWN_SAMPLER = True
+SPAWN_UNIFORM_FLOOR = 0.3         # share of the spawn distribution that stays uniform
+SPAWN_STATS_DECAY = 0.995         # per-episode decay of pass/failure counts
+SPAWN_FAILURE_REASONS = ("stuck", "collisions", "wrong_way")
+
 
 # ========================
 # Utility: latest checkpoint
@@ -80,14 +162,21 @@ def latest_ckpt(path: str) -> Optional[str]:
 # Reason counter
 # ========================
 class ReasonCounter:
-    def __init__(self):
+    def __init__(self, window: int = CURRICULUM_WINDOW):
         self.counts: Dict[str, int] = {}
         self.episodes = 0
+        self.recent = collections.deque(maxlen=window)
 
     def add(self, reason: Optional[str]):
         key = reason if reason else "other"
         self.counts[key] = self.counts.get(key, 0) + 1
         self.episodes += 1
+        self.recent.append(key)
+
+    def rolling_rate(self, reason: str) -> float:
+        if not self.recent:
+            return 0.0
+        return sum(1 for r in self.recent if r == reason) / len(self.recent)
 
     def summary(self) -> str:
         parts = [f"{k}:{v}" for k, v in sorted(self.counts.items())]
@@ -98,22 +187,403 @@ REASONS = ReasonCounter()
 
 
 # ========================
-# WebSocket bridge (async loop in side thread)
+# Anti-stall curriculum
+# ========================
+class WarmupCurriculum:
+    """Anneals the anti-stall warmup from the rolling stuck rate in REASONS.
+
+    One per process, like REASONS: SubprocVecEnv workers anneal on their own episodes.
+    """
+
+    def __init__(self):
+        self.level = 1.0
+
+    def on_episode_end(self):
+        if not ADAPTIVE_WARMUP or REASONS.episodes % CURRICULUM_UPDATE_EVERY != 0:
+            return
+        if len(REASONS.recent) < min(CURRICULUM_WINDOW, 2 * CURRICULUM_UPDATE_EVERY):
+            return
+        stuck = REASONS.rolling_rate("stuck")
+        old = self.level
+        if stuck < CURRICULUM_STUCK_LOW:
+            self.level = max(0.0, self.level - CURRICULUM_LEVEL_STEP)
+        elif stuck > CURRICULUM_STUCK_HIGH:
+            self.level = min(1.0, self.level + CURRICULUM_LEVEL_STEP)
+        if self.level != old:
+            print(f"[CURRICULUM] stuck rate {stuck:.2f} -> warmup level {self.level:.1f} "
+                  f"({self.warmup_steps()} steps)")
+
+    def warmup_steps(self) -> int:
+        return int(round(WARMUP_STEPS_PER_EPISODE * self.level))
+
+    def clamp(self, throttle: float, brake: float, handbrake: float):
+        throttle = max(throttle, MIN_THROTTLE_DURING_WARMUP * self.level)
+        brake = min(brake, 1.0 - (1.0 - MAX_BRAKE_DURING_WARMUP) * self.level)
+        if DISABLE_HANDBRAKE_DURING_WARMUP and self.level > 0:
+            handbrake = 0.0
+        return throttle, brake, handbrake
+
+
+CURRICULUM = WarmupCurriculum()
+
+
+# ========================
+# Spawn sampler
+# ========================
+class SpawnSampler:
+    """Tracks decayed per-checkpoint failure rates and turns them into spawn weights."""
+
+    def __init__(self, floor: float = SPAWN_UNIFORM_FLOOR, decay: float = SPAWN_STATS_DECAY):
+        self.floor = floor
+        self.decay = decay
+        self.passes = np.zeros(0, dtype=np.float64)
+        self.failures = np.zeros(0, dtype=np.float64)
+        self._section: Dict[int, int] = {}  # last section per agent (cars of one game share the stats)
+
+    def _resize(self, n: int):
+        # Track (re)loaded with a different checkpoint count: old stats no longer apply
+        if n != len(self.passes):
+            self.passes = np.zeros(n, dtype=np.float64)
+            self.failures = np.zeros(n, dtype=np.float64)
+
+    def failure_rates(self) -> np.ndarray:
+        return self.failures / (self.failures + self.passes + 1.0)
+
+    def weights(self) -> Optional[list]:
+        n = len(self.passes)
+        if n == 0:
+            return None
+        rates = self.failure_rates()
+        total = rates.sum()
+        if total <= 0:
+            return None
+        w = self.floor / n + (1.0 - self.floor) * rates / total
+        return [round(float(x), 5) for x in w]
+
+    def on_reset(self, info: Dict[str, Any], agent: int = 0):
+        n = int(info.get("numCheckpoints", 0) or 0)
+        if n > 0:
+            self._resize(n)
+        self._section[agent] = int(info.get("spawnIndex", -1))
+
+    def on_step(self, info: Dict[str, Any], done: bool, reason: Optional[str], agent: int = 0):
+        n = len(self.passes)
+        section = int(info.get("section", -1))
+        valid = 0 <= section < n
+        last = self._section.get(agent, -1)
+        if valid and section != last:
+            if 0 <= last < n:
+                self.passes[last] += 1.0
+            self._section[agent] = section
+        if done:
+            if valid and reason in SPAWN_FAILURE_REASONS:
+                self.failures[section] += 1.0
+            self.passes *= self.decay
+            self.failures *= self.decay
+
+    def summary(self, top: int = 3) -> str:
+        if len(self.passes) == 0:
+            return "no stats"
+        rates = self.failure_rates()
+        worst = np.argsort(-rates)[:top]
+        return " ".join(f"cp{i}:{rates[i]:.2f}" for i in worst)
+
+
+# ========================
+# CPU learner: thread pinning
+# ========================
+# Filled by configure_cpu_learner(); None = no pinning (non-Linux, GPU, or disabled)
+LEARNER_CPUS: Optional[set] = None
+BRIDGE_CPUS: Optional[set] = None
+ALL_CPUS: Optional[set] = None
+
+
+def pin_current_thread(cpus: Optional[set]):
+    # On Linux, pid 0 means the calling thread; threads it starts afterwards inherit the mask
+    if cpus and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+
+
+def configure_cpu_learner() -> str:
+    """Pick the training device; on CPU, split cores between learner and bridge threads."""
+    global LEARNER_CPUS, BRIDGE_CPUS, ALL_CPUS
+    if not CPU_LEARNER or torch.cuda.is_available():
+        return "auto"
+
+    if hasattr(os, "sched_getaffinity"):
+        cpus = sorted(os.sched_getaffinity(0))
+        reserved = min(BRIDGE_RESERVED_CORES, len(cpus) - 1)
+        if reserved > 0:
+            ALL_CPUS = set(cpus)
+            BRIDGE_CPUS = set(cpus[-reserved:])
+            LEARNER_CPUS = set(cpus[:-reserved])
+            # Before any torch work, so the intra-op pool is created on learner cores
+            pin_current_thread(LEARNER_CPUS)
+        n_threads = LEARNER_THREADS or len(LEARNER_CPUS or cpus)
+    else:
+        n_threads = LEARNER_THREADS or max(1, (os.cpu_count() or 1) - BRIDGE_RESERVED_CORES)
+
+    torch.set_num_threads(n_threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # already fixed once torch ran inter-op work
+    print(f"[CPU] Learner threads: {n_threads}"
+          + (f", learner cores {sorted(LEARNER_CPUS)}, bridge cores {sorted(BRIDGE_CPUS)}" if LEARNER_CPUS else ""))
+    return "cpu"
+
+
+# ========================
+# CPU learner: preallocated minibatches
+# ========================
+class PreallocRolloutBuffer(RolloutBuffer):
+    """
+    RolloutBuffer that gathers minibatches into tensors allocated once and reused across
+    epochs (index_select(out=...)) instead of building new tensors for every minibatch,
+    and records the wall time of each epoch pass.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.epoch_times: list = []
+        self._sources = None
+        self._outs: Dict[int, tuple] = {}
+
+    def reset(self) -> None:
+        super().reset()
+        self._sources = None
+
+    def get(self, batch_size: Optional[int] = None):
+        start = time.perf_counter()
+        yield from super().get(batch_size)
+        self.epoch_times.append(time.perf_counter() - start)
+
+    def _get_samples(self, batch_inds: np.ndarray, env=None) -> RolloutBufferSamples:
+        if self.device.type != "cpu":
+            return super()._get_samples(batch_inds, env)
+        if self._sources is None:
+            # Zero-copy views over the flattened numpy storage (valid until the next reset)
+            self._sources = tuple(torch.from_numpy(a) for a in (
+                self.observations, self.actions, self.values.reshape(-1),
+                self.log_probs.reshape(-1), self.advantages.reshape(-1), self.returns.reshape(-1),
+            ))
+        n = len(batch_inds)
+        outs = self._outs.get(n)
+        if outs is None:
+            outs = tuple(torch.empty((n,) + tuple(src.shape[1:]), dtype=src.dtype) for src in self._sources)
+            self._outs[n] = outs
+        index = torch.from_numpy(batch_inds)
+        for src, out in zip(self._sources, outs):
+            torch.index_select(src, 0, index, out=out)
+        return RolloutBufferSamples(*outs)
+
+
+def learner_kwargs(device: str) -> Dict[str, Any]:
+    kwargs: Dict[str, Any] = {"device": device}
+    if device == "cpu":
+        kwargs["rollout_buffer_class"] = PreallocRolloutBuffer
+    return kwargs
+
+
+def maybe_compile_policy(model: PPO):
+    if not TORCH_COMPILE:
+        return
+    extractor = model.policy.mlp_extractor
+    if not hasattr(extractor, "compile"):
+        print("[CPU] TORCH_COMPILE needs torch >= 2.2 (nn.Module.compile); skipping")
+        return
+    # In-place compile keeps state_dict keys unchanged, so checkpoints stay loadable
+    extractor.compile()
+    model.policy.action_net.compile()
+    model.policy.value_net.compile()
+    print("[CPU] Compiled policy MLP with torch.compile")
+
+
+def obs_dim_for(ai_version: int) -> int:
+    return 30 if ai_version == 2 else 24
+
+
+# ========================
+# Game bridge (protocol shared by all transports)
+# ========================
+class GameBridge(ABC):
+    def __init__(self):
+        self.ai_version = 1
+        self.obs_dim = 24
+        self.num_agents = 1
+        self._warmup_steps_left = [0]
+        self._applied_actions: List[Optional[List[float]]] = [None]
+        self._pending_step_multi: Optional[Dict[str, Any]] = None
+        self.last_step_multi_infos: List[Dict[str, Any]] = []  # per car, from the latest step_multi
+        self.spawn_sampler = SpawnSampler() if ENABLE_SPAWN_SAMPLER else None
+
+    # --- transport hooks ---
+    @abstractmethod
+    def _request(self, msg: Any) -> Dict[str, Any]:
+        """Send msg and block until the game's reply."""
+
+    @abstractmethod
+    def _notify(self, msg: Any):
+        """Send msg without waiting for a reply."""
+
+    def _on_hello(self, hello: Dict[str, Any]):
+        self.ai_version = hello.get("aiVersion", 1)
+        self.obs_dim = obs_dim_for(self.ai_version)
+        self.num_agents = int(hello.get("numAgents", 1) or 1)
+        self._warmup_steps_left = [0] * self.num_agents
+        self._applied_actions = [None] * self.num_agents
+
+    # --- message helpers ---
+    def _reset_msg(self, msg_type: str) -> Dict[str, Any]:
+        msg: Dict[str, Any] = {"type": msg_type}
+        if self.spawn_sampler is not None:
+            weights = self.spawn_sampler.weights()
+            if weights is not None:
+                msg["spawnWeights"] = weights
+        return msg
+
+    def _parse_obs(self, raw) -> np.ndarray:
+        obs = np.array(raw, dtype=np.float32)
+        if len(obs) != self.obs_dim:
+            raise RuntimeError(f"Observation dimension mismatch: expected {self.obs_dim}, got {len(obs)}")
+        return obs
+
+    @staticmethod
+    def _parse_info(raw) -> Dict[str, Any]:
+        info = raw or {}
+        if "episode" in info and not isinstance(info["episode"], dict):
+            info["ep_num"] = info["episode"]
+            del info["episode"]
+        return info
+
+    def _finish_reset(self, res: Dict[str, Any], agent: int):
+        obs = self._parse_obs(res["obs"])
+        info = self._parse_info(res.get("info"))
+        if self.spawn_sampler is not None:
+            self.spawn_sampler.on_reset(info, agent)
+        self._warmup_steps_left[agent] = CURRICULUM.warmup_steps()
+        return obs, info
+
+    def _game_action(self, action_vec: np.ndarray, agent: int) -> List[float]:
+        a = np.clip(action_vec, -1.0, 1.0).astype(float)
+        steer = float(a[0])
+        throttle = float((a[1] + 1) / 2)
+        brake = float((a[2] + 1) / 2)
+        handbrake = 1.0 if a[3] > 0 else 0.0
+        boost = 1.0 if a[4] > 0 else 0.0
+
+        self._applied_actions[agent] = None
+        if self._warmup_steps_left[agent] > 0:
+            throttle, brake, handbrake = CURRICULUM.clamp(throttle, brake, handbrake)
+            self._warmup_steps_left[agent] -= 1
+            # Same clamp in policy space ([-1, 1]); handbrake only flips at 0, so cap it there
+            applied = a.copy()
+            applied[1] = 2.0 * throttle - 1.0
+            applied[2] = 2.0 * brake - 1.0
+            if handbrake == 0.0:
+                applied[3] = min(applied[3], 0.0)
+            if not np.allclose(applied, a):
+                self._applied_actions[agent] = [float(x) for x in applied]
+
+        return [steer, throttle, brake, handbrake, boost]
+
+    def _finish_step(self, res: Dict[str, Any], agent: int):
+        obs = self._parse_obs(res["obs"])
+        reward = float(res["reward"])
+        done = bool(res["done"])
+        info = self._parse_info(res.get("info"))
+        if self._applied_actions[agent] is not None:
+            info["applied_action"] = self._applied_actions[agent]
+        info["warmup_level"] = CURRICULUM.level
+
+        reason = info.get("reason")
+        terminated = done and reason not in ("timeout",)
+        truncated = done and reason in ("timeout",)
+
+        if self.spawn_sampler is not None:
+            self.spawn_sampler.on_step(info, done, reason, agent)
+
+        if done:
+            REASONS.add(reason)
+            CURRICULUM.on_episode_end()
+            if REASONS.episodes % 25 == 0:
+                print(f"[REASONS] {REASONS.summary()}")
+                if self.spawn_sampler is not None:
+                    print(f"[SPAWN] worst failure rates: {self.spawn_sampler.summary()}")
+
+        return obs, reward, terminated, truncated, info
+
+    # --- env methods (agent 0 only) ---
+    def reset(self):
+        res = self._request(self._reset_msg("reset"))
+        if res.get("type") != "reset_result":
+            raise RuntimeError(f"Unexpected reset_result: {res}")
+        return self._finish_reset(res, 0)
+
+    def step(self, action_vec: np.ndarray, repeat: Optional[int] = None):
+        if repeat is None:
+            repeat = FRAME_SKIP
+        payload = {"type": "step", "action": self._game_action(action_vec, 0), "repeat": repeat}
+        res = self._request(payload)
+        if res.get("type") != "step_result":
+            raise RuntimeError(f"Unexpected step_result: {res}")
+        return self._finish_step(res, 0)
+
+    # --- multi-car methods (all num_agents cars of this game) ---
+    def reset_multi(self):
+        res = self._request(self._reset_msg("reset_multi"))
+        if res.get("type") != "reset_multi_result":
+            raise RuntimeError(f"Unexpected reset_multi_result: {res}")
+        return [self._finish_reset(r, i) for i, r in enumerate(res["results"])]
+
+    def begin_step_multi(self, actions: np.ndarray, repeat: Optional[int] = None):
+        """Queue one step for every car. Transports that can pipeline send it right away."""
+        if repeat is None:
+            repeat = FRAME_SKIP
+        msg = self._reset_msg("step_multi")  # spawn weights for cars the game resets in place
+        msg["actions"] = [self._game_action(actions[i], i) for i in range(self.num_agents)]
+        msg["repeat"] = repeat
+        self._pending_step_multi = msg
+
+    def _wait_step_multi(self) -> Dict[str, Any]:
+        msg, self._pending_step_multi = self._pending_step_multi, None
+        return self._request(msg)
+
+    def end_step_multi(self):
+        """Per car: (obs, reward, terminated, truncated, info, reset_obs, reset_info); reset_* only when done."""
+        res = self._wait_step_multi()
+        if res.get("type") != "step_multi_result":
+            raise RuntimeError(f"Unexpected step_multi_result: {res}")
+        out = []
+        for i, r in enumerate(res["results"]):
+            obs, reward, terminated, truncated, info = self._finish_step(r, i)
+            reset_obs, reset_info = None, None
+            if "resetObs" in r:
+                reset_obs, reset_info = self._finish_reset({"obs": r["resetObs"], "info": r.get("resetInfo")}, i)
+            out.append((obs, reward, terminated, truncated, info, reset_obs, reset_info))
+        self.last_step_multi_infos = [o[4] for o in out]
+        return out
+
+    def set_render(self, enabled: bool):
+        self._notify({"type": "render", "enabled": bool(enabled)})
+
+
+# ========================
+# WebSocket bridge (browser tab; async loop in side thread)
 # ========================
-class WSBridge:
+class WSBridge(GameBridge):
     def __init__(self, host=HOST, port=PORT):
+        super().__init__()
         self.host = host
         self.port = port
         self.loop = asyncio.new_event_loop()
         self.thread: Optional[Thread] = None
         self.ws: Optional[websockets.WebSocketServerProtocol] = None
         self.connected_evt = Event()
-        self._warmup_steps_left = 0
-        self.ai_version = 1
-        self.obs_dim = 24
 
     def start(self):
         def runner():
+            pin_current_thread(BRIDGE_CPUS)
             asyncio.set_event_loop(self.loop)
             self.loop.run_until_complete(self._serve())
             self.loop.run_forever()
@@ -124,8 +594,7 @@ class WSBridge:
         async def on_connect(websocket):
             try:
                 hello = json.loads(await websocket.recv())
-                self.ai_version = hello.get("aiVersion", 1)
-                self.obs_dim = 30 if self.ai_version == 2 else 24
+                self._on_hello(hello)
                 print(f"Client connected: AI version {self.ai_version}, obs_dim={self.obs_dim}")
             except Exception as e:
                 print(f"Error during hello: {e}")
@@ -143,7 +612,7 @@ class WSBridge:
         if not ok:
             raise TimeoutError("Game did not connect to WSBridge in time.")
         if DISABLE_RENDER_FOR_SPEED:
-            self.call(self._send({"type": "render", "enabled": False}))
+            self.set_render(False)
 
     async def _send(self, msg: Any):
         if not self.ws:
@@ -159,64 +628,130 @@ class WSBridge:
         fut = asyncio.run_coroutine_threadsafe(coro, self.loop)
         return fut.result()
 
-    def reset(self):
-        res = self.call(self._send_recv({"type": "reset"}))
-        if res.get("type") != "reset_result":
-            raise RuntimeError(f"Unexpected reset_result: {res}")
-        obs = np.array(res["obs"], dtype=np.float32)
-        if len(obs) != self.obs_dim:
-            raise RuntimeError(f"Observation dimension mismatch: expected {self.obs_dim}, got {len(obs)}")
-        info = res.get("info", {}) or {}
-        if "episode" in info and not isinstance(info["episode"], dict):
-            info["ep_num"] = info["episode"]
-            del info["episode"]
-        self._warmup_steps_left = WARMUP_STEPS_PER_EPISODE
-        return obs, info
+    def _request(self, msg: Any) -> Dict[str, Any]:
+        return self.call(self._send_recv(msg))
 
-    def step(self, action_vec: np.ndarray, repeat: int = FRAME_SKIP):
-        a = np.clip(action_vec, -1.0, 1.0).astype(float)
-        steer = float(a[0])
-        throttle = float((a[1] + 1) / 2)
-        brake = float((a[2] + 1) / 2)
-        handbrake = 1.0 if a[3] > 0 else 0.0
-        boost = 1.0 if a[4] > 0 else 0.0
+    def _notify(self, msg: Any):
+        self.call(self._send(msg))
 
-        if self._warmup_steps_left > 0:
-            throttle = max(throttle, MIN_THROTTLE_DURING_WARMUP)
-            brake = min(brake, MAX_BRAKE_DURING_WARMUP)
-            if DISABLE_HANDBRAKE_DURING_WARMUP:
-                handbrake = 0.0
-            self._warmup_steps_left -= 1
 
-        payload = {"type": "step", "action": [steer, throttle, brake, handbrake, boost], "repeat": repeat}
-        res = self.call(self._send_recv(payload))
-        if res.get("type") != "step_result":
-            raise RuntimeError(f"Unexpected step_result: {res}")
+# ========================
+# Child process bridge (headless Node game over stdio)
+# ========================
+class ChildProcessBridge(GameBridge):
+    def __init__(self, ai_version: int = HEADLESS_AI_VERSION, track: Optional[str] = HEADLESS_TRACK,
+                 cars: int = 1, car_collisions: bool = False):
+        super().__init__()
+        self.requested_version = ai_version
+        self.track = track
+        self.cars = cars
+        self.car_collisions = car_collisions
+        self.proc: Optional[subprocess.Popen] = None
 
-        obs = np.array(res["obs"], dtype=np.float32)
-        if len(obs) != self.obs_dim:
-            raise RuntimeError(f"Observation dimension mismatch: expected {self.obs_dim}, got {len(obs)}")
-        reward = float(res["reward"])
-        done = bool(res["done"])
-        info = res.get("info", {}) or {}
+    def start(self):
+        cmd = list(HEADLESS_CMD) + ["--aiver", str(self.requested_version)]
+        if self.track:
+            cmd += ["--track", self.track]
+        if self.cars > 1:
+            cmd += ["--cars", str(self.cars)]
+            if self.car_collisions:
+                cmd += ["--collide", "1"]
+        # stderr is inherited so the game's console output shows up in our terminal
+        self.proc = subprocess.Popen(
+            cmd,
+            cwd=BASE_DIR,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+        )
+        if ALL_CPUS and hasattr(os, "sched_setaffinity"):
+            # The game simulates during rollouts; don't inherit the learner-only mask
+            os.sched_setaffinity(self.proc.pid, ALL_CPUS)
 
-        if "episode" in info and not isinstance(info["episode"], dict):
-            info["ep_num"] = info["episode"]
-            del info["episode"]
+    def wait_connected(self, timeout=None):
+        ready, _, _ = select.select([self.proc.stdout], [], [], timeout)
+        if not ready:
+            raise TimeoutError("Headless game did not start in time.")
+        hello = self._recv()
+        if hello.get("type") != "hello":
+            raise RuntimeError(f"Unexpected hello from headless game: {hello}")
+        self._on_hello(hello)
 
-        reason = info.get("reason")
-        terminated = done and reason not in ("timeout",)
-        truncated = done and reason in ("timeout",)
+    def close(self):
+        if self.proc and self.proc.poll() is None:
+            self.proc.stdin.close()
+            try:
+                self.proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
 
-        if done:
-            REASONS.add(reason)
-            if REASONS.episodes % 25 == 0:
-                print(f"[REASONS] {REASONS.summary()}")
+    def _recv(self) -> Dict[str, Any]:
+        line = self.proc.stdout.readline()
+        if not line:
+            raise RuntimeError(f"Headless game exited (code {self.proc.poll()})")
+        return json.loads(line)
 
-        return obs, reward, terminated, truncated, info
+    def _notify(self, msg: Any):
+        self.proc.stdin.write(json.dumps(msg) + "\n")
+        self.proc.stdin.flush()
 
-    def set_render(self, enabled: bool):
-        self.call(self._send({"type": "render", "enabled": bool(enabled)}))
+    def _request(self, msg: Any) -> Dict[str, Any]:
+        self._notify(msg)
+        return self._recv()
+
+    # Write now, read in end_step_multi(): several games simulate while we wait on the first
+    def begin_step_multi(self, actions: np.ndarray, repeat: Optional[int] = None):
+        super().begin_step_multi(actions, repeat)
+        self._notify(self._pending_step_multi)
+
+    def _wait_step_multi(self) -> Dict[str, Any]:
+        self._pending_step_multi = None
+        return self._recv()
+
+
+# ========================
+# Spectator hub (viewer tabs; async loop in side thread)
+# ========================
+class SpectatorHub:
+    def __init__(self, host=HOST, port=SPECTATOR_PORT):
+        self.host = host
+        self.port = port
+        self.loop = asyncio.new_event_loop()
+        self.thread: Optional[Thread] = None
+        self.clients = set()
+
+    def start(self):
+        def runner():
+            pin_current_thread(BRIDGE_CPUS)
+            asyncio.set_event_loop(self.loop)
+            self.loop.run_until_complete(self._serve())
+            self.loop.run_forever()
+        self.thread = Thread(target=runner, daemon=True)
+        self.thread.start()
+
+    async def _serve(self):
+        async def on_connect(websocket):
+            self.clients.add(websocket)
+            print(f"[Spectator] Viewer connected ({len(self.clients)} watching)")
+            try:
+                await websocket.wait_closed()
+            finally:
+                self.clients.discard(websocket)
+
+        server = await websockets.serve(on_connect, self.host, self.port)
+        print(f"[Spectator] Streaming on ws://{self.host}:{self.port}")
+        return server
+
+    def publish(self, frame: Dict[str, Any]):
+        # Fire-and-forget: slow viewers drop frames instead of stalling the training thread
+        if not self.clients:
+            return
+        msg = json.dumps(frame)
+        self.loop.call_soon_threadsafe(self._broadcast, msg)
+
+    def _broadcast(self, msg: str):
+        websockets.broadcast(self.clients, msg)
 
 
 # ========================
@@ -225,9 +760,10 @@ class WSBridge:
 class DriftGymEnv(gym.Env):
     metadata = {}
 
-    def __init__(self, bridge: WSBridge):
+    def __init__(self, bridge: GameBridge, frame_skip: Optional[int] = None):
         super().__init__()
         self.bridge = bridge
+        self.frame_skip = frame_skip if frame_skip is not None else FRAME_SKIP
         self.observation_space = spaces.Box(low=-1.0, high=1.0, shape=(bridge.obs_dim,), dtype=np.float32)
         self.action_space = spaces.Box(low=-1.0, high=1.0, shape=(5,), dtype=np.float32)
 
@@ -236,14 +772,129 @@ class DriftGymEnv(gym.Env):
         return obs, info
 
     def step(self, action):
-        obs, reward, terminated, truncated, info = self.bridge.step(action)
+        obs, reward, terminated, truncated, info = self.bridge.step(action, repeat=self.frame_skip)
         return obs, reward, terminated, truncated, info
 
+    def set_frame_skip(self, frame_skip: int):
+        self.frame_skip = int(frame_skip)
+
     def render(self):
         pass
 
     def close(self):
-        pass
+        if isinstance(self.bridge, ChildProcessBridge):
+            self.bridge.close()
+
+
+def make_headless_env(frame_skip: Optional[int] = None, worker_cpus: Optional[tuple] = None):
+    # Runs inside the SubprocVecEnv worker when HEADLESS_ENVS > 1, so each worker owns its Node child
+    if worker_cpus:
+        # The worker inherited the learner-only mask and, when started with spawn/forkserver,
+        # none of configure_cpu_learner()'s globals: move its pipe I/O to the bridge cores and
+        # let ChildProcessBridge give the Node child every core again
+        global BRIDGE_CPUS, ALL_CPUS
+        BRIDGE_CPUS, ALL_CPUS = worker_cpus
+        pin_current_thread(BRIDGE_CPUS)
+    bridge = ChildProcessBridge()
+    bridge.start()
+    bridge.wait_connected(timeout=HEADLESS_START_TIMEOUT_S)
+    return Monitor(DriftGymEnv(bridge, frame_skip=frame_skip))
+
+
+class MultiCarVecEnv(VecEnv):
+    """All cars of one or more multi-car games as one VecEnv (env index = game-major, car-minor).
+
+    Every game advances once per step_wait(); finished cars are reset by the game itself and
+    come back with their next first observation, like SB3's auto-reset.
+    """
+
+    def __init__(self, bridges: List[GameBridge], frame_skip: Optional[int] = None):
+        self.bridges = bridges
+        self.frame_skip = frame_skip if frame_skip is not None else FRAME_SKIP
+        self._offsets = np.cumsum([0] + [b.num_agents for b in bridges]).tolist()
+        self._actions: Optional[np.ndarray] = None
+        obs_dim = bridges[0].obs_dim
+        observation_space = spaces.Box(low=-1.0, high=1.0, shape=(obs_dim,), dtype=np.float32)
+        action_space = spaces.Box(low=-1.0, high=1.0, shape=(5,), dtype=np.float32)
+        super().__init__(self._offsets[-1], observation_space, action_space)
+
+    def reset(self):
+        obs = np.zeros((self.num_envs, *self.observation_space.shape), dtype=np.float32)
+        for b, bridge in enumerate(self.bridges):
+            for i, (car_obs, info) in enumerate(bridge.reset_multi()):
+                obs[self._offsets[b] + i] = car_obs
+                self.reset_infos[self._offsets[b] + i] = info
+        return obs
+
+    def step_async(self, actions: np.ndarray) -> None:
+        self._actions = actions
+
+    def step_wait(self):
+        for b, bridge in enumerate(self.bridges):
+            bridge.begin_step_multi(self._actions[self._offsets[b]:self._offsets[b + 1]], self.frame_skip)
+
+        obs = np.zeros((self.num_envs, *self.observation_space.shape), dtype=np.float32)
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+        dones = np.zeros(self.num_envs, dtype=bool)
+        infos: List[Dict[str, Any]] = [{} for _ in range(self.num_envs)]
+        for b, bridge in enumerate(self.bridges):
+            for i, result in enumerate(bridge.end_step_multi()):
+                car_obs, reward, terminated, truncated, info, reset_obs, reset_info = result
+                k = self._offsets[b] + i
+                rewards[k] = reward
+                dones[k] = terminated or truncated
+                obs[k] = car_obs
+                if dones[k]:
+                    info["TimeLimit.truncated"] = truncated and not terminated
+                    info["terminal_observation"] = car_obs
+                    if reset_obs is not None:
+                        obs[k] = reset_obs
+                        self.reset_infos[k] = reset_info
+                infos[k] = info
+        return obs, rewards, dones, infos
+
+    def close(self) -> None:
+        for bridge in self.bridges:
+            if isinstance(bridge, ChildProcessBridge):
+                bridge.close()
+
+    def get_attr(self, attr_name: str, indices=None) -> List[Any]:
+        return [getattr(self, attr_name, None) for _ in self._get_indices(indices)]
+
+    def set_attr(self, attr_name: str, value: Any, indices=None) -> None:
+        setattr(self, attr_name, value)
+
+    def env_method(self, method_name: str, *method_args, indices=None, **method_kwargs) -> List[Any]:
+        # Frame skip is per game, so it is shared by every car (same as DriftGymEnv.set_frame_skip)
+        if method_name != "set_frame_skip":
+            raise AttributeError(f"MultiCarVecEnv does not support env_method({method_name!r})")
+        self.frame_skip = int(method_args[0])
+        return [None for _ in self._get_indices(indices)]
+
+    def env_is_wrapped(self, wrapper_class, indices=None) -> List[bool]:
+        return [False for _ in self._get_indices(indices)]
+
+
+def make_multi_car_vec_env(n_games: int, frame_skip: int):
+    bridges = []
+    for _ in range(n_games):
+        bridge = ChildProcessBridge(cars=CARS_PER_GAME, car_collisions=CAR_COLLISIONS)
+        bridge.start()
+        bridges.append(bridge)
+    for bridge in bridges:
+        bridge.wait_connected(timeout=HEADLESS_START_TIMEOUT_S)
+    return VecMonitor(MultiCarVecEnv(bridges, frame_skip))
+
+
+def make_headless_vec_env(n_envs: int, frame_skip: int):
+    if CARS_PER_GAME > 1:
+        # One process drives every game; the Node children simulate in parallel
+        return make_multi_car_vec_env(n_envs, frame_skip)
+    # frame_skip and the CPU masks are bound explicitly so workers started with "spawn" see them too
+    worker_cpus = (BRIDGE_CPUS, ALL_CPUS) if n_envs > 1 and ALL_CPUS else None
+    env_fns = [functools.partial(make_headless_env, frame_skip, worker_cpus) for _ in range(n_envs)]
+    # Episode reasons are counted (and printed) inside each worker process
+    return SubprocVecEnv(env_fns) if n_envs > 1 else DummyVecEnv(env_fns)
 
 
 # ========================
@@ -266,6 +917,69 @@ class VecNormSaveCallback(BaseCallback):
         return True
 
 
+class UpdateTimingCallback(BaseCallback):
+    """Reports per-epoch PPO update time (measured by PreallocRolloutBuffer) once per rollout."""
+
+    def _on_rollout_start(self) -> None:
+        epoch_times = getattr(self.model.rollout_buffer, "epoch_times", None)
+        if not epoch_times:
+            return
+        mean_ms = 1000.0 * sum(epoch_times) / len(epoch_times)
+        total_s = sum(epoch_times)
+        self.logger.record("time/update_epoch_ms", mean_ms)
+        self.logger.record("time/update_s", total_s)
+        if self.verbose:
+            print(f"[CPU] Update: {len(epoch_times)} epochs, {mean_ms:.0f} ms/epoch, {total_s:.2f} s total")
+        epoch_times.clear()
+
+    def _on_step(self) -> bool:
+        return True
+
+
+class AppliedActionCallback(BaseCallback):
+    """Relabels clamped warmup steps with the action the game really applied.
+
+    Runs between env.step() and rollout_buffer.add(), so the sampled actions and their
+    log-probs are overwritten in place; the update then sees what the car actually did.
+    """
+
+    def _on_step(self) -> bool:
+        infos = self.locals.get("infos", [])
+        rows = [i for i, info in enumerate(infos) if "applied_action" in info]
+        warmup = [info["warmup_level"] for info in infos if "warmup_level" in info]
+        if warmup:
+            self.logger.record_mean("curriculum/warmup_level", float(np.mean(warmup)))
+        if not rows:
+            return True
+
+        actions = self.locals["actions"]
+        log_probs = self.locals["log_probs"]
+        for i in rows:
+            actions[i] = np.asarray(infos[i].pop("applied_action"), dtype=actions.dtype)
+        with torch.no_grad():
+            obs = self.locals["obs_tensor"][rows]
+            act = torch.as_tensor(actions[rows], device=self.model.device)
+            _values, relabeled, _entropy = self.model.policy.evaluate_actions(obs, act)
+        log_probs[rows] = relabeled.to(log_probs.device, log_probs.dtype)
+        self.logger.record_mean("curriculum/relabeled_frac", len(rows) / len(infos))
+        return True
+
+
+class SpectatorCallback(BaseCallback):
+    """Forward the spectator frames the game attaches to step infos to the hub."""
+    def __init__(self, hub: SpectatorHub, verbose=0):
+        super().__init__(verbose)
+        self.hub = hub
+
+    def _on_step(self) -> bool:
+        for env_idx, info in enumerate(self.locals.get("infos", [])):
+            frame = info.pop("spectator", None)
+            if frame is not None:
+                frame["env"] = env_idx
+                self.hub.publish(frame)
+        return True
+
+
 class StopControls:
     def __init__(self):
         self.stop_flag = False
@@ -293,12 +1007,156 @@ def stop_file_requested() -> bool:
     return os.path.exists(STOP_FILE)
 
 
-def maybe_watch_window(bridge: WSBridge, enable=ENABLE_WATCH_WINDOWS):
-    if not enable:
+# ========================
+# Throughput calibration + tuned config
+# ========================
+TUNABLE_KEYS = ("HEADLESS_ENVS", "FRAME_SKIP", "PPO_N_STEPS", "PPO_BATCH_SIZE", "PPO_N_EPOCHS")
+
+
+def load_tuned_config(path: str = TUNED_CONFIG_PATH):
+    """Override the tunable constants above with a calibration result, if one exists."""
+    if not os.path.exists(path):
         return
-    bridge.set_render(True)
-    time.sleep(WATCH_FOR_SECONDS)
-    bridge.set_render(False)
+    with open(path, "r") as f:
+        tuned = json.load(f).get("recommended", {})
+    g = globals()
+    for key in TUNABLE_KEYS:
+        if key not in tuned:
+            continue
+        if key == "HEADLESS_ENVS" and HEADLESS_ENVS == 0:
+            continue  # browser mode stays browser mode; the env count only applies to headless runs
+        g[key] = int(tuned[key])
+    print(f"[TUNED] Loaded {path}: " + " ".join(f"{k}={g[k]}" for k in TUNABLE_KEYS))
+
+
+def memory_mb() -> float:
+    """RSS of this process plus its children (the headless games / SubprocVecEnv workers)."""
+    if psutil is not None:
+        proc = psutil.Process()
+        rss = proc.memory_info().rss
+        for child in proc.children(recursive=True):
+            try:
+                rss += child.memory_info().rss
+            except psutil.NoSuchProcess:
+                pass
+        return rss / (1024 * 1024)
+    # Peak values only (kB on Linux) — good enough to spot configurations that blow up
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss + resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return peak / 1024
+
+
+class UpdateTimer(BaseCallback):
+    """Splits one learn() call into rollout and update wall time."""
+
+    def __init__(self):
+        super().__init__()
+        self.rollout_start = 0.0
+        self.rollout_end = 0.0
+
+    def _on_rollout_start(self) -> None:
+        self.rollout_start = time.perf_counter()
+
+    def _on_rollout_end(self) -> None:
+        self.rollout_end = time.perf_counter()
+
+    def _on_step(self) -> bool:
+        return True
+
+
+def time_rollout(vec_env, frame_skip: int, seconds: float) -> float:
+    vec_env.env_method("set_frame_skip", frame_skip)
+    vec_env.reset()
+    n = vec_env.num_envs
+    steps = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        actions = np.random.uniform(-1.0, 1.0, size=(n, 5)).astype(np.float32)
+        vec_env.step(actions)
+        steps += n
+    return steps / (time.perf_counter() - start)
+
+
+def calibrate():
+    device = configure_cpu_learner()
+    cpu_count = os.cpu_count() or 1
+    env_counts = [n for n in CALIBRATE_ENV_COUNTS if n <= cpu_count] or [1]
+    trials = []
+
+    # Stage 1: env count x frame skip (rollout throughput only)
+    print(f"[CALIBRATE] Stage 1: envs {env_counts} x frame skip {CALIBRATE_FRAME_SKIPS}")
+    best_rollout = None
+    for n_envs in env_counts:
+        vec_env = make_headless_vec_env(n_envs, FRAME_SKIP)
+        try:
+            for frame_skip in CALIBRATE_FRAME_SKIPS:
+                sps = time_rollout(vec_env, frame_skip, CALIBRATE_ROLLOUT_SECONDS)
+                mem = memory_mb()
+                trial = {"stage": 1, "HEADLESS_ENVS": n_envs, "FRAME_SKIP": frame_skip,
+                         "env_steps_per_sec": round(sps, 1), "memory_mb": round(mem, 1)}
+                trials.append(trial)
+                print(f"[CALIBRATE] envs={n_envs} frame_skip={frame_skip}: {sps:.0f} steps/s, {mem:.0f} MB")
+                if CALIBRATE_MAX_MEMORY_MB and mem > CALIBRATE_MAX_MEMORY_MB:
+                    continue
+                if best_rollout is None or sps > best_rollout["env_steps_per_sec"]:
+                    best_rollout = trial
+        finally:
+            vec_env.close()
+
+    if best_rollout is None:
+        raise RuntimeError("No calibration trial fit within CALIBRATE_MAX_MEMORY_MB")
+    n_envs, frame_skip = best_rollout["HEADLESS_ENVS"], best_rollout["FRAME_SKIP"]
+
+    # Stage 2: PPO batch shape on the fastest env setup (one rollout + one update each)
+    print(f"[CALIBRATE] Stage 2: n_steps {CALIBRATE_N_STEPS} x batch {CALIBRATE_BATCH_SIZES} "
+          f"x epochs {CALIBRATE_N_EPOCHS} with envs={n_envs} frame_skip={frame_skip}")
+    best = None
+    vec_env = VecNormalize(make_headless_vec_env(n_envs, frame_skip), norm_obs=True, norm_reward=True, clip_obs=5.0)
+    n_cars = vec_env.num_envs  # n_envs x CARS_PER_GAME
+    try:
+        for n_steps in CALIBRATE_N_STEPS:
+            for batch_size in CALIBRATE_BATCH_SIZES:
+                if batch_size > n_steps * n_cars:
+                    continue
+                for n_epochs in CALIBRATE_N_EPOCHS:
+                    model = PPO("MlpPolicy", vec_env, n_steps=n_steps, batch_size=batch_size,
+                                n_epochs=n_epochs, gamma=0.995, verbose=0, **learner_kwargs(device))
+                    maybe_compile_policy(model)
+                    timer = UpdateTimer()
+                    start = time.perf_counter()
+                    model.learn(total_timesteps=n_steps * n_cars, callback=timer)
+                    end = time.perf_counter()
+                    rollout_s = timer.rollout_end - timer.rollout_start
+                    update_s = end - timer.rollout_end
+                    sps = (n_steps * n_cars) / (end - start)
+                    mem = memory_mb()
+                    trial = {"stage": 2, "HEADLESS_ENVS": n_envs, "FRAME_SKIP": frame_skip,
+                             "PPO_N_STEPS": n_steps, "PPO_BATCH_SIZE": batch_size, "PPO_N_EPOCHS": n_epochs,
+                             "rollout_s": round(rollout_s, 2), "update_s": round(update_s, 2),
+                             "env_steps_per_sec": round(sps, 1), "memory_mb": round(mem, 1)}
+                    trials.append(trial)
+                    print(f"[CALIBRATE] n_steps={n_steps} batch={batch_size} epochs={n_epochs}: "
+                          f"rollout {rollout_s:.1f}s, update {update_s:.1f}s, {sps:.0f} steps/s end-to-end, {mem:.0f} MB")
+                    del model
+                    if CALIBRATE_MAX_MEMORY_MB and mem > CALIBRATE_MAX_MEMORY_MB:
+                        continue
+                    if best is None or sps > best["env_steps_per_sec"]:
+                        best = trial
+    finally:
+        vec_env.close()
+
+    if best is None:
+        raise RuntimeError("No PPO batch shape fit the calibration grid; check CALIBRATE_* settings")
+
+    result = {
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "machine": {"cpu_count": cpu_count, "platform": sys.platform},
+        "recommended": {k: best[k] for k in TUNABLE_KEYS},
+        "trials": trials,
+    }
+    with open(TUNED_CONFIG_PATH, "w") as f:
+        json.dump(result, f, indent=2)
+    print("[CALIBRATE] Recommended: " + " ".join(f"{k}={best[k]}" for k in TUNABLE_KEYS))
+    print(f"[CALIBRATE] Wrote {TUNED_CONFIG_PATH}; main() loads it on the next run (delete it to go back to defaults)")
 
 
 # ========================
@@ -307,26 +1165,40 @@ def maybe_watch_window(bridge: WSBridge, enable=ENABLE_WATCH_WINDOWS):
 def main():
     os.makedirs(TENSORBOARD_DIR, exist_ok=True)
     os.makedirs(CKPT_BASE_DIR, exist_ok=True)
+    load_tuned_config()
+    device = configure_cpu_learner()
 
     setup_signals()
 
-    bridge = WSBridge()
-    bridge.start()
-    print("[PPO] Waiting for the game to connect (open your game with ?ai=1&aiver=2)…")
-    bridge.wait_connected(timeout=120)
-    print(f"[PPO] Game connected! AI version: {bridge.ai_version}, obs_dim: {bridge.obs_dim}")
+    bridge: Optional[WSBridge] = None
+    if HEADLESS_ENVS > 0:
+        ai_version = HEADLESS_AI_VERSION
+        print(f"[PPO] Spawning {HEADLESS_ENVS} headless game(s) x {CARS_PER_GAME} car(s): {' '.join(HEADLESS_CMD)}")
+        base_env = make_headless_vec_env(HEADLESS_ENVS, FRAME_SKIP)
+        print(f"[PPO] Headless games ready! AI version: {ai_version}, obs_dim: {obs_dim_for(ai_version)}")
+    else:
+        bridge = WSBridge()
+        bridge.start()
+        print("[PPO] Waiting for the game to connect (open your game with ?ai=1&aiver=2)…")
+        bridge.wait_connected(timeout=120)
+        ai_version = bridge.ai_version
+        print(f"[PPO] Game connected! AI version: {bridge.ai_version}, obs_dim: {bridge.obs_dim}")
+
+        if bridge.num_agents > 1:
+            print(f"[PPO] Multi-car game: {bridge.num_agents} AI cars")
+            base_env = VecMonitor(MultiCarVecEnv([bridge], FRAME_SKIP))
+        else:
+            def make_env():
+                return Monitor(DriftGymEnv(bridge, frame_skip=FRAME_SKIP))
+
+            base_env = DummyVecEnv([make_env])
 
     # Version-specific directories
-    version_suffix = f"ai_v{bridge.ai_version}"
+    version_suffix = f"ai_v{ai_version}"
     CKPT_DIR = os.path.join(CKPT_BASE_DIR, version_suffix)
     VECNORM_PATH = os.path.join(CKPT_DIR, "vecnorm.pkl")
     os.makedirs(CKPT_DIR, exist_ok=True)
 
-    def make_env():
-        return Monitor(DriftGymEnv(bridge))
-
-    base_env = DummyVecEnv([make_env])
-
     if os.path.exists(VECNORM_PATH):
         print(f"[VecNormalize] Loading stats from {VECNORM_PATH}")
         vec_env = VecNormalize.load(VECNORM_PATH, base_env)
@@ -337,24 +1209,33 @@ def main():
     model_path = latest_ckpt(CKPT_DIR)
     if model_path:
         print(f"[PPO] Resuming from checkpoint: {model_path}")
-        model = PPO.load(model_path, env=vec_env, device="auto", tensorboard_log=TENSORBOARD_DIR)
+        model = PPO.load(
+            model_path,
+            env=vec_env,
+            tensorboard_log=TENSORBOARD_DIR,
+            n_steps=PPO_N_STEPS,
+            batch_size=PPO_BATCH_SIZE,
+            n_epochs=PPO_N_EPOCHS,
+            **learner_kwargs(device),
+        )
     else:
         model = PPO(
             policy="MlpPolicy",
             env=vec_env,
             verbose=1,
             tensorboard_log=TENSORBOARD_DIR,
-            n_steps=4096,
-            batch_size=1024,
+            n_steps=PPO_N_STEPS,
+            batch_size=PPO_BATCH_SIZE,
             gae_lambda=0.95,
             gamma=0.995,
             learning_rate=3e-4,
-            n_epochs=10,
+            n_epochs=PPO_N_EPOCHS,
             clip_range=0.2,
             ent_coef=0.0,
             vf_coef=0.5,
-            device="auto",
+            **learner_kwargs(device),
         )
+    maybe_compile_policy(model)
 
     ckpt_cb = CheckpointCallback(
         save_freq=SAVE_EVERY_STEPS,
@@ -364,20 +1245,22 @@ def main():
         save_vecnormalize=False,
     )
     vecnorm_cb = VecNormSaveCallback(vec_env, VECNORM_PATH, save_every_steps=SAVE_EVERY_STEPS, verbose=1)
-    callbacks = CallbackList([ckpt_cb, vecnorm_cb])
+    callback_list = [ckpt_cb, vecnorm_cb, UpdateTimingCallback(verbose=1)]
+    if RELABEL_APPLIED_ACTIONS:
+        callback_list.append(AppliedActionCallback())
+    if ENABLE_SPECTATOR:
+        hub = SpectatorHub()
+        hub.start()
+        callback_list.append(SpectatorCallback(hub))
+    callbacks = CallbackList(callback_list)
 
     total_steps = 0
-    last_watch_trigger = 0
 
     while True:
         if stop_file_requested():
             print(f"[STOP] Detected STOP file at {STOP_FILE}. Finishing current chunk and saving…")
             STOP.stop_flag = True
 
-        if ENABLE_WATCH_WINDOWS and (total_steps - last_watch_trigger) >= WATCH_EVERY_STEPS:
-            maybe_watch_window(bridge, enable=True)
-            last_watch_trigger = total_steps
-
         start = time.time()
         model.learn(
             total_timesteps=CHUNK_TIMESTEPS,
@@ -395,10 +1278,15 @@ def main():
         vec_env.save(VECNORM_PATH)
         print(f"[PPO] Saved final model to {final_path} and VecNormalize to {VECNORM_PATH}")
 
-        if STOP_ON_DRIFTSCORE:
+        if STOP_ON_DRIFTSCORE and bridge:
             try:
-                _obs, _reward, _terminated, _truncated, info = bridge.step(np.zeros(5, dtype=np.float32), repeat=1)
-                ds = info.get("driftScore")
+                if bridge.num_agents > 1:
+                    # A single-car step would advance car 0 behind MultiCarVecEnv's back; use the last batch
+                    scores = [i["driftScore"] for i in bridge.last_step_multi_infos if "driftScore" in i]
+                    ds = max(scores) if scores else None
+                else:
+                    _obs, _reward, _terminated, _truncated, info = bridge.step(np.zeros(5, dtype=np.float32), repeat=1)
+                    ds = info.get("driftScore")
                 if ds is not None:
                     print(f"[TARGET] Current driftScore from game: {ds}")
                     if ds >= DRIFTSCORE_TARGET:
@@ -415,11 +1303,19 @@ def main():
     model.save(final_path)
     vec_env.save(VECNORM_PATH)
     print(f"[PPO] Saved final model to {final_path} and VecNormalize to {VECNORM_PATH}")
+    vec_env.close()
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="PPO training server for the drift game.")
+    parser.add_argument("--calibrate", action="store_true",
+                        help=f"time env/PPO settings on headless games and write {os.path.basename(TUNED_CONFIG_PATH)}")
+    args = parser.parse_args()
     try:
-        main()
+        if args.calibrate:
+            calibrate()
+        else:
+            main()
     except KeyboardInterrupt:
         print("\n[MAIN] KeyboardInterrupt — exiting.")
         sys.exit(0)
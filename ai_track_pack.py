@@ -0,0 +1,127 @@
+# ai_track_pack.py
+# Reader for the binary track pack (src/assets/tracks.pack, built by `npm run build:tracks`)
+# - Same geometry the game uses: wall segments, checkpoints, bounding boxes, segment grid
+# - Arrays are numpy views over a memory map (no parsing / copying)
+# - Layout is documented in src/race/TrackPack.ts
+#
+# Usage: python ai_track_pack.py [path/to/tracks.pack]
+
+import mmap
+import os
+import struct
+import sys
+from typing import Dict, List
+
+import numpy as np
+
+
+BASE_DIR = os.path.dirname(__file__)
+DEFAULT_PACK_PATH = os.path.join(BASE_DIR, "src", "assets", "tracks.pack")
+
+TRACK_PACK_MAGIC = b"PTPK"
+TRACK_PACK_VERSION = 1
+
+
+def _align4(n: int) -> int:
+    return (n + 3) & ~3
+
+
+class TrackPackEntry:
+    def __init__(self):
+        self.name = ""
+        self.background = ""
+        self.map_size = None            # (width, height) or None
+        self.source_hash = 0
+        self.bbox = (0.0, 0.0, 0.0, 0.0)  # min_x, min_y, max_x, max_y
+        self.ring_segment_counts = None  # uint32[rings]
+        self.segments = None             # float32[n, 4]: x0, y0, x1, y1
+        self.checkpoints = None          # float32[n, 4]: ax, ay, bx, by (index 0 = start)
+        self.cell_size = 0.0
+        self.origin = (0.0, 0.0)
+        self.cols = 0
+        self.rows = 0
+        self.cell_start = None           # uint32[cols * rows + 1]
+        self.cell_segments = None        # uint32[...]
+
+    def segments_near(self, x: float, y: float, radius: float) -> np.ndarray:
+        """Indices of segments whose grid cells overlap the box around (x, y)."""
+        cx0 = max(0, int((x - radius - self.origin[0]) // self.cell_size))
+        cy0 = max(0, int((y - radius - self.origin[1]) // self.cell_size))
+        cx1 = min(self.cols - 1, int((x + radius - self.origin[0]) // self.cell_size))
+        cy1 = min(self.rows - 1, int((y + radius - self.origin[1]) // self.cell_size))
+        if cx0 > cx1 or cy0 > cy1:
+            return np.zeros(0, dtype=np.uint32)
+        parts = []
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                cell = cy * self.cols + cx
+                parts.append(self.cell_segments[self.cell_start[cell]:self.cell_start[cell + 1]])
+        return np.unique(np.concatenate(parts)) if parts else np.zeros(0, dtype=np.uint32)
+
+
+def load_track_pack(path: str = DEFAULT_PACK_PATH) -> Dict[str, TrackPackEntry]:
+    with open(path, "rb") as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if buf[:4] != TRACK_PACK_MAGIC:
+        raise ValueError(f"{path}: bad magic {buf[:4]!r}")
+    version, _reserved, track_count = struct.unpack_from("<HHI", buf, 4)
+    if version != TRACK_PACK_VERSION:
+        raise ValueError(f"{path}: unsupported track pack version {version} (expected {TRACK_PACK_VERSION})")
+
+    o = 12
+    tracks: Dict[str, TrackPackEntry] = {}
+
+    def read_string(at: int):
+        (length,) = struct.unpack_from("<H", buf, at)
+        return bytes(buf[at + 2:at + 2 + length]).decode("utf-8"), at + _align4(2 + length)
+
+    def view(dtype, count: int, at: int):
+        return np.frombuffer(buf, dtype=dtype, count=count, offset=at), at + 4 * count
+
+    for _ in range(track_count):
+        start = o
+        (record_bytes,) = struct.unpack_from("<I", buf, o)
+        o += 4
+        t = TrackPackEntry()
+        t.name, o = read_string(o)
+        t.background, o = read_string(o)
+        width, height, t.source_hash = struct.unpack_from("<ffI", buf, o)
+        o += 12
+        t.map_size = (width, height) if width > 0 and height > 0 else None
+        t.bbox = struct.unpack_from("<ffff", buf, o)
+        o += 16
+
+        (ring_count,) = struct.unpack_from("<I", buf, o)
+        t.ring_segment_counts, o = view("<u4", ring_count, o + 4)
+        (segment_count,) = struct.unpack_from("<I", buf, o)
+        segments, o = view("<f4", segment_count * 4, o + 4)
+        t.segments = segments.reshape(segment_count, 4)
+        (checkpoint_count,) = struct.unpack_from("<I", buf, o)
+        checkpoints, o = view("<f4", checkpoint_count * 4, o + 4)
+        t.checkpoints = checkpoints.reshape(checkpoint_count, 4)
+
+        t.cell_size, ox, oy, t.cols, t.rows = struct.unpack_from("<fffII", buf, o)
+        t.origin = (ox, oy)
+        o += 20
+        t.cell_start, o = view("<u4", t.cols * t.rows + 1, o)
+        t.cell_segments, o = view("<u4", int(t.cell_start[-1]), o)
+
+        tracks[t.name] = t
+        o = start + record_bytes
+
+    return tracks
+
+
+def main(argv: List[str]):
+    path = argv[1] if len(argv) > 1 else DEFAULT_PACK_PATH
+    if not os.path.exists(path):
+        print(f"[TRACKPACK] {path} not found; build it with `npm run build:tracks`")
+        sys.exit(1)
+    for name, t in load_track_pack(path).items():
+        print(f"[TRACKPACK] {name}: {len(t.segments)} segments in {len(t.ring_segment_counts)} rings, "
+              f"{len(t.checkpoints)} checkpoints, {t.cols}x{t.rows} cells of {t.cell_size:.0f}, bbox={t.bbox}")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -4,6 +4,31 @@ const cors = require('cors');
 const WS = require('ws');
 const protobuf = require('protobufjs');
 const { performance: perfHooks } = require('perf_hooks');
+const { Relay } = require('./src/net/Relay');
+const { RELAY_FRAMES_ACK } = require('./src/net/RelayWire');
+
+// Relay settings (environment):
+//   RELAY_MODE=tick          batch every update of a tick into one send per client (default)
+//   RELAY_MODE=immediate     forward each update to every client as it arrives
+//   RELAY_TICK_MS            tick length in tick mode
+//   RELAY_INTEREST_RADIUS    > 0: players farther apart than this (world px) only get each
+//                            other's updates every RELAY_FAR_EVERY_TICKS ticks; stamps and bursts
+//                            of the skipped updates are delivered with the next one
+//   RELAY_MAX_PENDING        updates kept per player per tick (oldest dropped beyond this)
+//   RELAY_MAX_BUFFERED_BYTES skip a client's tick while its socket buffer is above this
+//   RELAY_DEBUG=1            per-message logging
+const RELAY_MODE = process.env.RELAY_MODE || 'tick';
+const RELAY_TICK_MS = Number(process.env.RELAY_TICK_MS || 33);
+const RELAY_DEBUG = process.env.RELAY_DEBUG === '1';
+
+// Coalescing, interest management and drop policy live in src/net/Relay.ts
+const relay = new Relay({
+    mode: RELAY_MODE,
+    interestRadius: Number(process.env.RELAY_INTEREST_RADIUS || 0),
+    farEveryTicks: Number(process.env.RELAY_FAR_EVERY_TICKS || 10),
+    maxPending: Number(process.env.RELAY_MAX_PENDING || 8),
+    maxBufferedBytes: Number(process.env.RELAY_MAX_BUFFERED_BYTES || 1 << 20),
+});
 
 const app = express();
 const server = http.createServer(app);
@@ -12,8 +37,7 @@ app.use(cors());
 
 const wss = new WS.Server({ server, path: '/ws' });
 
-let PlayerState = null;
-const seqMap = new Map(); // WebSocket -> sequence number
+let PlayerState = null; // only needed to decode messages for debug logging
 
 // Load protobuf schema
 protobuf.load(require('path').join(__dirname, 'src', 'assets', 'player.proto'), (err, root) => {
@@ -23,58 +47,40 @@ protobuf.load(require('path').join(__dirname, 'src', 'assets', 'player.proto'),
     }
     PlayerState = root.lookupType("PlayerState");
     console.log("Protobuf loaded successfully");
-    console.log('has stamps:', !!PlayerState.fields.stamps);
-    console.log('has bursts:', !!PlayerState.fields.bursts);
+    if (RELAY_DEBUG) {
+        console.log('has stamps:', !!PlayerState.fields.stamps);
+        console.log('has bursts:', !!PlayerState.fields.bursts);
+    }
 });
 
-wss.on('connection', (ws) => {
-    console.log('User connected');
+function debugLog(direction, payload) {
+    if (!PlayerState) return;
+    const msg = PlayerState.decode(payload);
+    console.log(`server ${direction} stamps:`, (msg.stamps?.length || 0), 'bursts:', (msg.bursts?.length || 0), `seq ${msg.seq}`);
+}
+
+wss.on('connection', (ws, req) => {
+    const frames = new URL(req.url, 'http://localhost').searchParams.get('frames') === '1';
+    console.log('User connected', frames ? '(relay frames)' : '');
     const iv = setInterval(() => { if (ws.readyState === WS.OPEN) ws.ping(); }, 30000);
-    seqMap.set(ws, 0); // Initialize sequence counter
+    relay.addClient(ws, frames);
+    if (frames) {
+        // Clients only decode RelayFrames after this; older servers never send it
+        ws.send(RELAY_FRAMES_ACK);
+    }
 
     ws.on('close', () => {
         console.log('User disconnected!');
         clearInterval(iv);
-        seqMap.delete(ws);
+        relay.removeClient(ws);
     });
 
     ws.on('message', (data) => {
-        if (!PlayerState) {
-            console.error("PlayerState not loaded yet");
-            return;
-        }
-
         try {
-            // Decode incoming message
-            const buffer = new Uint8Array(data);
-            const message = PlayerState.decode(buffer);
-            const playerState = PlayerState.toObject(message, {
-                longs: String,
-                enums: String,
-                bytes: String,
-            });
-
-            console.log('server IN stamps:', (playerState.stamps?.length || 0), 'bursts:', (playerState.bursts?.length || 0));
-
-            // Stamp with server time and sequence
-            const tServerMs = Math.floor(perfHooks.now());
-            const seq = seqMap.get(ws) + 1;
-            seqMap.set(ws, seq);
-
-            playerState.tServerMs = tServerMs;
-            playerState.seq = seq;
-
-            console.log('server OUT stamps:', (playerState.stamps?.length || 0), 'bursts:', (playerState.bursts?.length || 0), 'seq', seq);
-
-            // Re-encode and broadcast to ALL clients (including sender)
-            const stampedMessage = PlayerState.create(playerState);
-            const stampedBuffer = PlayerState.encode(stampedMessage).finish();
-
-            wss.clients.forEach((client) => {
-                if (client.readyState === WS.OPEN) {
-                    client.send(stampedBuffer);
-                }
-            });
+            const stamped = relay.onMessage(ws, new Uint8Array(data), Math.floor(perfHooks.now()));
+            if (RELAY_DEBUG && stamped) {
+                debugLog('IN/OUT', stamped);
+            }
         } catch (error) {
             console.error('Error processing message:', error);
             // Drop the packet, don't crash
@@ -86,9 +92,27 @@ wss.on('connection', (ws) => {
     });
 });
 
+if (RELAY_MODE !== 'immediate') {
+    setInterval(() => relay.flushTick(), RELAY_TICK_MS);
+}
+
 app.get('/healthz', (_req,res)=>res.send('ok'));
 
-server.listen(3000, () => {
-    console.log('Listening on port 3000');
+// Counters and process CPU time for load tests
+app.get('/relay-stats', (_req, res) => {
+    const cpu = process.cpuUsage();
+    res.json({
+        mode: RELAY_MODE,
+        tickMs: RELAY_TICK_MS,
+        interestRadius: relay.options.interestRadius,
+        clients: relay.size,
+        ...relay.stats,
+        cpuUserMs: cpu.user / 1000,
+        cpuSystemMs: cpu.system / 1000,
+        uptimeMs: Math.floor(perfHooks.now()),
+    });
 });
 
+server.listen(3000, () => {
+    console.log(`Listening on port 3000 (relay mode ${RELAY_MODE}${RELAY_MODE === 'immediate' ? '' : `, tick ${RELAY_TICK_MS} ms`})`);
+});
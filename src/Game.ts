@@ -40,6 +40,12 @@ import { ZoomController } from "./render/ZoomController";
 import { WorldRenderer } from "./render/WorldRenderer";
 import { AIController } from "./ai/AIController";
 import { TrainingBridge } from "./ai/TrainingBridge";
+import { AIFleet } from "./ai/AIFleet";
+import { TrainingWorkerClient } from "./ai/TrainingWorkerClient";
+import { TrainingWorkerInit } from "./sim/TrainingWorkerProtocol";
+import { SpectatorClient } from "./net/SpectatorClient";
+import { wallProximity } from "./ai/Raycast";
+import { stepLocalPlayer } from "./core/PlayerPhysics";
 import EventBus from "./runtime/events/EventBus";
 import { GameEventBus, GameEvents } from "./runtime/events/GameEvents";
 import GameState from "./runtime/state/GameState";
@@ -109,12 +115,23 @@ class Game {
     private trainingEnabled: boolean = false;
     private aiController: AIController | null = null;
     private trainingBridge: TrainingBridge | null = null;
+    private aiFleet: AIFleet | null = null;
+    private aiCars: number = 1;
+    private aiCarCollisions: boolean = false;
+    private trainingInWorker: boolean = false;
+    private trainingWorker: TrainingWorkerClient | null = null;
     private lastCollision: boolean = false;
     private renderThrottle: number = 1;
     private renderFrameCounter: number = 0;
     private trainingOverlayVisible: boolean = true;
     private performanceMode: 'normal' | 'fast' = 'normal';
     private renderSkipN: number = 10;
+    private headless: boolean = false;
+
+    // Spectator viewer (?spectate=1): training envs rendered as ghosts
+    private spectatorEnabled: boolean = false;
+    private spectator: SpectatorClient | null = null;
+    private spectatorFollow: number = 0;
 
     private readonly eventBus: GameEventBus;
     private readonly state: GameState;
@@ -150,6 +167,21 @@ class Game {
         const urlParams = new URLSearchParams(window.location.search);
         this.trainingEnabled = urlParams.get('ai') === '1' || !!(window as any).__TRAINING__;
         this.renderSkipN = Number(urlParams.get('renderskip') || '10');
+        this.spectatorEnabled = urlParams.get('spectate') === '1' && !this.trainingEnabled;
+        this.aiCars = Math.max(1, Number(urlParams.get('aicars') || '1'));
+        this.aiCarCollisions = urlParams.get('aicollide') === '1';
+        this.trainingInWorker = this.trainingEnabled && urlParams.get('worker') === '1';
+    }
+
+    // Training and spectating run without the multiplayer server
+    private get offline(): boolean {
+        return this.trainingEnabled || this.spectatorEnabled;
+    }
+
+    private localPlayerId(): string {
+        if (this.trainingEnabled) return 'ai_agent';
+        if (this.spectatorEnabled) return 'spectator';
+        return this.net.socketId;
     }
 
     async preload() {
@@ -163,7 +195,8 @@ class Game {
         // Load car and track data before any other usage
         await Promise.all([
             CarData.loadFromJSON('assets/cars.json'),
-            TrackData.loadFromJSON('assets/tracks.json')
+            TrackData.loadFromJSON('assets/tracks.json'),
+            TrackData.loadPack('assets/tracks.pack')
         ]);
 
         this.session = this.state.ensureSession();
@@ -184,6 +217,19 @@ class Game {
             console.log('AI Training Mode Enabled');
             this.aiController = new AIController();
             this.inputController = new InputController(InputType.AI, this.aiController);
+        } else {
+            this.inputController = new InputController(InputType.KEYBOARD);
+        }
+
+        // Worker training (?worker=1): sim and agent connection run in a worker, shown via the spectator client below
+        if (this.trainingEnabled && !this.trainingInWorker) {
+            if (this.aiCars > 1) {
+                this.aiFleet = new AIFleet(this.playerManager, {
+                    extraCars: this.aiCars - 1,
+                    carCollisions: this.aiCarCollisions
+                });
+                console.log(`AI fleet: ${this.aiCars} cars, car collisions ${this.aiCarCollisions ? 'on' : 'off'}`);
+            }
             
             this.trainingBridge = new TrainingBridge(this.aiController, {
                 onReset: () => this.handleAIReset(),
@@ -193,13 +239,12 @@ class Game {
                 getLapCounter: () => this.playerManager.getLapCounter(),
                 getMapSize: () => this.mapSize,
                 getCollision: () => this.lastCollision,
-                getWallProximity: () => this.getWallProximity()
+                getWallProximity: () => this.getWallProximity(),
+                getFleet: () => this.aiFleet
             });
             
             // Connect to training server
             this.trainingBridge.connect();
-        } else {
-            this.inputController = new InputController(InputType.KEYBOARD);
         }
 
         this.lastUdpate = 0;
@@ -257,7 +302,7 @@ class Game {
 
         this.scheduler.add('netSend', SCHEDULER_INTERVALS.networkSendMs, () => {
             const localPlayer = this.playerManager.getLocalPlayer();
-            if (localPlayer && !this.trainingEnabled) {
+            if (localPlayer && !this.offline) {
                 this.net.sendUpdate(localPlayer);
             }
         });
@@ -294,7 +339,7 @@ class Game {
                 boost: { charge: 0, max: 1, active: false },
                 lap: { best: null, last: null, current: null }
             },
-            training: this.trainingEnabled ? {
+            training: this.offline ? {
                 enabled: true,
                 connected: false,
                 episode: 0,
@@ -337,9 +382,7 @@ class Game {
             });
             
             this.inputController.handleKey('F8', () => {
-                if (this.trainingBridge) {
-                    this.trainingBridge.renderEnabled = true;
-                }
+                this.enableTrainingRender();
                 this.renderThrottle = 1;
                 this.performanceMode = 'normal';
                 if (this.worldRenderer) {
@@ -349,9 +392,7 @@ class Game {
             });
             
             this.inputController.handleKey('F9', () => {
-                if (this.trainingBridge) {
-                    this.trainingBridge.renderEnabled = true;
-                }
+                this.enableTrainingRender();
                 this.renderThrottle = 1;
                 this.performanceMode = 'fast';
                 if (this.worldRenderer) {
@@ -361,9 +402,7 @@ class Game {
             });
             
             this.inputController.handleKey('F10', () => {
-                if (this.trainingBridge) {
-                    this.trainingBridge.renderEnabled = true;
-                }
+                this.enableTrainingRender();
                 this.renderThrottle = this.renderSkipN;
                 this.performanceMode = 'fast';
                 if (this.worldRenderer) {
@@ -373,7 +412,24 @@ class Game {
             });
         }
         
-        if (!this.trainingEnabled) {
+        if (this.spectatorEnabled || this.trainingInWorker) {
+            const callbacks = {
+                onFrame: (id, snapshot) => this.playerManager.onNetworkSnapshot(id, snapshot, []),
+                onRemove: (id) => this.playerManager.removePlayer(id)
+            };
+            if (this.trainingInWorker) {
+                this.trainingWorker = new TrainingWorkerClient(callbacks, this.trainingWorkerInit());
+                this.spectator = this.trainingWorker;
+            } else {
+                this.spectator = new SpectatorClient(callbacks);
+            }
+            this.spectator.connect();
+            this.inputController.handleKey('KeyG', () => {
+                this.spectatorFollow++;
+            });
+        }
+
+        if (!this.offline) {
             this.net.connect()
                 .then(() => {
                     this.eventBus.emit('network:connected', { socketId: this.net.socketId });
@@ -417,11 +473,17 @@ class Game {
     private simStep(stepMs: number): void {
         this._lastStepMs = stepMs;
         
-        if (!this.net.socketId && !this.trainingEnabled) {
+        // Worker training: the worker simulates every car, the page only shows its frames
+        if (this.trainingInWorker) {
+            this.updateSimTier();
             return;
         }
 
-        const socketId = this.trainingEnabled ? 'ai_agent' : this.net.socketId;
+        if (!this.net.socketId && !this.offline) {
+            return;
+        }
+
+        const socketId = this.localPlayerId();
         const localPlayer = this.playerManager.ensureLocalPlayer(
             this.session,
             socketId,
@@ -436,17 +498,22 @@ class Game {
                 requireAllCheckpoints: true
             });
             
+            this.aiFleet?.onTrackChanged(this.track);
+            
             this.playerManager.setCarType(this.session.carType);
+            this.aiFleet?.setCarType(this.session.carType);
             this.playerManager.setPlayerName(this.session.playerName);
             this.playerManager.setTrackScore(this.session.scores[this.session.trackName]);
             
             console.log("Added player", socketId);
         }
 
-        if (!localPlayer || (!this.net.connected && !this.trainingEnabled)) {
+        if (!localPlayer || (!this.net.connected && !this.offline)) {
             return;
         }
 
+        this.updateSimTier();
+
         // Update scheduler tasks
         this.scheduler.tick(stepMs);
 
@@ -457,25 +524,22 @@ class Game {
             localPlayer.score.driftScore = 30000;
         }
 
-        // Capture previous position before physics update
-        const prevPosForLap = { x: localPlayer.car.position.x, y: localPlayer.car.position.y };
-
-        // Update boost system
-        localPlayer.updateBoost(stepMs, actions.BOOST);
-        
-        // Update local player physics
-        localPlayer.car.update(compatKeys, stepMs);
-        localPlayer.car.interpolatePosition();
-        localPlayer.score.update(localPlayer.car.velocity, localPlayer.car.angle);
+        const { lapRes, collision } = stepLocalPlayer(
+            this.playerManager,
+            this.track,
+            localPlayer,
+            compatKeys,
+            actions.BOOST,
+            stepMs,
+            this.session.trackName
+        );
+        const carHit = this.aiFleet ? this.aiFleet.step(this.track, stepMs, localPlayer) : false;
+        this.lastCollision = collision || carHit;
         this.state.setScore(this.session.trackName, localPlayer.score);
         this.session = this.state.getSession();
 
-        // Capture current position after physics update and update lap timing
-        const curPosForLap = { x: localPlayer.car.position.x, y: localPlayer.car.position.y };
-        const lapRes = this.playerManager.updateLapTiming(prevPosForLap, curPosForLap, Date.now(), this.session.trackName);
-        
         // Handle lap completion popup
-        if (lapRes?.lapCompleted && lapRes.lastLapMs != null && lapRes.prevBestLapMs != null) {
+        if (!this.headless && lapRes?.lapCompleted && lapRes.lastLapMs != null && lapRes.prevBestLapMs != null) {
             const deltaMs = lapRes.lastLapMs - lapRes.prevBestLapMs;
             const deltaSeconds = Math.abs(deltaMs) / 1000;
             const sign = deltaMs < 0 ? '-' : '+';
@@ -489,29 +553,10 @@ class Game {
                 color
             });
         }
-        
-        // Store current position for any other consumers
-        localPlayer.lastPos = curPosForLap;
-
-        const now = performance.now();
-        if (localPlayer.car.isDrifting) {
-            localPlayer.lastDriftTime = now;
-        } else {
-            localPlayer.score.curveScore = 0;
-            if (now - localPlayer.lastDriftTime > 4000 && localPlayer.score.driftScore > 0) {
-                localPlayer.score.endDrift();
-            }
-        }
 
-        // Check for collisions
-        let wallHit = this.track.getWallHit(localPlayer.car);
-        this.lastCollision = wallHit !== null;
-        if (wallHit !== null) {
-            localPlayer.car.velocity = localPlayer.car.velocity.mult(0.99);
-            let pushBack = wallHit.normalVector.mult(Math.abs(localPlayer.car.carType.dimensions.length / 2 - wallHit.distance) * .4);
-            localPlayer.car.position = localPlayer.car.position.add(pushBack.mult(4));
-            localPlayer.car.velocity = localPlayer.car.velocity.add(pushBack);
-            localPlayer.score.endDrift()
+        // Everything below is cosmetic only; the headless tier skips it
+        if (this.headless) {
+            return;
         }
 
         // Update dynamic zoom based on car speed
@@ -550,33 +595,82 @@ class Game {
         }
     }
 
+    /**
+     * Headless tier: training with rendering disabled. Physics, lap timing and
+     * scoring run unchanged; particles, zoom, popups, HUD and overlay updates are
+     * skipped and their buffers released so unwatched tabs only pay for the sim.
+     */
+    private updateSimTier(): void {
+        const headless = this.trainingEnabled && this.trainingRenderEnabled() === false;
+        if (headless === this.headless) {
+            return;
+        }
+        this.headless = headless;
+
+        if (headless) {
+            this.particleSystem?.clear();
+            this.worldRenderer?.clearPopups();
+            for (const player of Object.values(this.playerManager.getPlayers())) {
+                player.pendingTrailStamps = [];
+            }
+        }
+        console.log('Simulation tier:', headless ? 'headless (cosmetics skipped)' : 'full');
+    }
+
+    // Render flag of whichever side runs the training bridge; null when not training
+    private trainingRenderEnabled(): boolean | null {
+        if (this.trainingBridge) return this.trainingBridge.isRenderEnabled();
+        if (this.trainingWorker) return this.trainingWorker.isRenderEnabled();
+        return null;
+    }
+
+    private enableTrainingRender(): void {
+        if (this.trainingBridge) {
+            this.trainingBridge.renderEnabled = true;
+        }
+        this.trainingWorker?.setRenderEnabled(true);
+    }
+
     private renderFrame(): void {
         if (this.modeManager?.isBuildMode()) {
             this.editorManager?.render();
             return;
         }
 
+        if (this.headless) {
+            return;
+        }
+
         // Render throttling for AI training
-        if (this.trainingEnabled && this.trainingBridge && this.trainingBridge.isRenderEnabled()) {
+        if (this.trainingEnabled && this.trainingRenderEnabled()) {
             this.renderFrameCounter++;
             if (this.renderFrameCounter % this.renderThrottle !== 0) {
                 return;
             }
         }
         
+        // No local car in worker training; the camera follows one of the worker's cars
         const localPlayer = this.playerManager.getLocalPlayer();
         const players = this.playerManager.getPlayers();
+        const followed = this.spectatorFollowedId();
+        const viewed = (followed ? players?.[followed] : null) ?? localPlayer;
         
-        if (!players || !localPlayer || (!this.net.connected && !this.trainingEnabled) || !this.worldRenderer) {
+        if (!players || !viewed || (!this.net.connected && !this.offline) || !this.worldRenderer) {
             return;
         }
         
         // Update camera with current world scale
         this.camera.setScale(this.worldScale);
-        this.camera.moveTowards(localPlayer.car.position);
+        this.camera.moveTowards(viewed.car.position);
+
+        // Interpolate ghosts on the local receive clock
+        if (this.spectator) {
+            const renderTime = performance.now() - 200;
+            this.playerManager.interpolateRemotes(renderTime, renderTime - 1000, localPlayer?.id ?? null);
+        }
 
         // Interpolate remote players (skip in training mode)
-        if (!this.trainingEnabled) {
+        if (!this.offline) {
             const renderTime = this.net.serverNowMs() - 100;
             this.playerManager.interpolateRemotes(renderTime, renderTime - 1000, this.net.socketId);
         }
@@ -618,19 +712,21 @@ class Game {
             }
         }
         
-        const boost = {
-            charge: localPlayer.boostCharge,
-            max: localPlayer.BOOST_MAX,
-            active: localPlayer.boostActive
-        };
-        
-        const lap = {
-            best: bestLapMs,
-            last: localPlayer.lapLastMs,
-            current: currentLapTime
-        };
-        
-        this.ui.updateHUD({ boost, lap });
+        if (localPlayer) {
+            const boost = {
+                charge: localPlayer.boostCharge,
+                max: localPlayer.BOOST_MAX,
+                active: localPlayer.boostActive
+            };
+            
+            const lap = {
+                best: bestLapMs,
+                last: localPlayer.lapLastMs,
+                current: currentLapTime
+            };
+            
+            this.ui.updateHUD({ boost, lap });
+        }
 
         // Update training overlay with breakdown (only if visible)
         if (this.trainingEnabled && this.trainingBridge && this.ui.updateTraining && this.trainingOverlayVisible) {
@@ -650,6 +746,50 @@ class Game {
                 rewardBreakdown: breakdown
             });
         }
+
+        if (this.spectator && this.ui.updateTraining) {
+            const frame = followed ? this.spectator.getFrame(followed) : null;
+            this.ui.updateTraining({
+                enabled: true,
+                connected: this.spectator.isConnected(),
+                episode: frame?.episode ?? 0,
+                step: frame?.step ?? 0,
+                reward: frame?.totalReward ?? 0,
+                avgReward: frame && frame.step > 0 ? frame.totalReward / frame.step : 0,
+                bestLapMs: frame?.bestLapMs ?? null,
+                lastLapMs: frame?.lastLapMs ?? null,
+                collisions: frame?.collisions ?? 0
+            });
+        }
+    }
+
+    private trainingWorkerInit(): TrainingWorkerInit {
+        const urlParams = new URLSearchParams(window.location.search);
+        return {
+            type: 'init',
+            url: 'ws://127.0.0.1:8765',
+            aiVersion: Number(urlParams.get('aiver') || '1'),
+            trackName: this.session.trackName,
+            carType: this.session.carType,
+            tracks: TrackData.tracks,
+            cars: this.aiCars,
+            carCollisions: this.aiCarCollisions
+        };
+    }
+
+    // Ghost the spectator camera follows; KeyG cycles through envs (and back to the local car, if any)
+    private spectatorFollowedId(): string | null {
+        if (!this.spectator) {
+            return null;
+        }
+        const ids = this.spectator.getGhostIds();
+        // Worker training has no local car to come back to
+        const slots = ids.length + (this.trainingInWorker ? 0 : 1);
+        if (slots === 0) {
+            return null;
+        }
+        const slot = this.spectatorFollow % slots;
+        return slot < ids.length ? ids[slot] : null;
     }
 
     // Fast step for AI training (no rendering)
@@ -672,19 +812,7 @@ class Game {
         const localPlayer = this.playerManager.getLocalPlayer();
         if (!localPlayer) return 1.0;
 
-        const { raycastDistances } = require('./ai/Raycast');
-        const rayAngles = [-0.6, -0.4, -0.2, 0, 0.2, 0.4, 0.6];
-        const maxDist = 400;
-        
-        const distances = raycastDistances(
-            localPlayer.car.position,
-            localPlayer.car.angle,
-            rayAngles,
-            this.track.boundaries,
-            maxDist
-        );
-
-        return Math.min(...distances) / maxDist;
+        return wallProximity(localPlayer.car.position, localPlayer.car.angle, this.track.boundaries);
     }
 
 
@@ -785,6 +913,7 @@ class Game {
         this.state.updateCarType(carTypeName);
         this.session = this.state.getSession();
         this.playerManager.setCarType(carTypeName);
+        this.aiFleet?.setCarType(carTypeName);
     }
 
     loadTrack(name: string, options: { skipStateUpdate?: boolean } = {}) {
@@ -810,6 +939,7 @@ class Game {
                 minLapMs: 10000,
                 requireAllCheckpoints: true
             });
+            this.aiFleet?.onTrackChanged(this.track);
         } catch (error) {
             console.error('Failed to load track:', name, error);
         }
@@ -826,12 +956,12 @@ class Game {
     }
 
     private createTrackFromBestLap(): void {
-        if ((!this.net.socketId && !this.trainingEnabled) || !this.session.trackName) {
+        if ((!this.net.socketId && !this.offline) || !this.session.trackName) {
             console.warn('Cannot create track: missing player ID or track name');
             return;
         }
 
-        const playerId = this.trainingEnabled ? 'ai_agent' : this.net.socketId;
+        const playerId = this.localPlayerId();
         const trackName = this.session.trackName;
         
         const bestPath = this.playerManager.getBestPathFor(trackName, playerId);
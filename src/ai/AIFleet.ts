@@ -0,0 +1,105 @@
+import Player from "../components/Player/Player";
+import Car from "../components/Car/Car";
+import Score from "../components/Score/Score";
+import CarData from "../components/Car/CarData";
+import Track from "../components/Playfield/Track";
+import { PlayerManager } from "../players/PlayerManager";
+import { LapCounter } from "../race/LapCounter";
+import { AIController } from "./AIController";
+import { stepPlayer, resolveCarCollisions } from "../core/PlayerPhysics";
+
+export interface FleetCar {
+    player: Player;
+    aiController: AIController;
+    lapCounter: LapCounter | null;
+    collision: boolean;
+}
+
+export interface AIFleetOptions {
+    /** Extra AI cars besides the local player (agent 0). */
+    extraCars: number;
+    /** Resolve car-to-car contact between all AI cars (off: cars drive through each other). */
+    carCollisions?: boolean;
+}
+
+/**
+ * The additional AI cars of a multi-car training game. Each car has its own
+ * controller and lap counter and is stepped with the same physics as the local
+ * player; the TrainingBridge gives each its own EpisodeManager and Reward.
+ */
+export class AIFleet {
+    readonly cars: FleetCar[] = [];
+    readonly carCollisions: boolean;
+
+    constructor(private playerManager: PlayerManager, options: AIFleetOptions) {
+        this.carCollisions = !!options.carCollisions;
+        const carType = CarData.types[0] || null;
+        for (let i = 1; i <= options.extraCars; i++) {
+            const player = new Player(`ai_agent_${i}`, `AI ${i}`, new Car(500, 1900, 0, carType), new Score());
+            this.playerManager.addPlayer(player);
+            this.cars.push({ player, aiController: new AIController(), lapCounter: null, collision: false });
+        }
+    }
+
+    get size(): number {
+        return this.cars.length;
+    }
+
+    setCarType(carTypeName: string): void {
+        const carType = CarData.getByName(carTypeName);
+        for (const car of this.cars) {
+            car.player.car.carType = carType;
+        }
+    }
+
+    onTrackChanged(track: Track, options?: { minLapMs?: number; requireAllCheckpoints?: boolean }): void {
+        for (const car of this.cars) {
+            car.lapCounter = track.checkpoints.length > 0
+                ? new LapCounter(track.checkpoints, {
+                    minLapMs: options?.minLapMs ?? 10000,
+                    requireAllCheckpoints: options?.requireAllCheckpoints ?? true
+                })
+                : null;
+        }
+    }
+
+    /**
+     * Step every fleet car once, then resolve car-to-car contact (including the
+     * local player when given). Returns whether the local player hit another car.
+     */
+    step(track: Track, stepMs: number, localPlayer: Player | null): boolean {
+        for (const car of this.cars) {
+            const actions = car.aiController.getActions();
+            const compatKeys = {
+                'ArrowUp': actions.ACCELERATE,
+                'ArrowDown': actions.BRAKE,
+                'ArrowLeft': actions.LEFT,
+                'ArrowRight': actions.RIGHT,
+                'Space': actions.HANDBRAKE,
+            };
+            const { collision } = stepPlayer(track, car.player, compatKeys, actions.BOOST, stepMs, (prev, cur, nowMs) => {
+                if (!car.lapCounter) return null;
+                const prevBestLapMs = car.lapCounter.getState().bestLapMs;
+                const lapRes = car.lapCounter.update(prev, cur, nowMs);
+                car.player.onLapUpdate(lapRes);
+                return { ...lapRes, prevBestLapMs };
+            });
+            car.collision = collision;
+        }
+
+        if (!this.carCollisions) {
+            return false;
+        }
+
+        const players = this.cars.map(car => car.player);
+        if (localPlayer) {
+            players.unshift(localPlayer);
+        }
+        const hits = resolveCarCollisions(players);
+        const offset = localPlayer ? 1 : 0;
+        this.cars.forEach((car, i) => {
+            car.collision = car.collision || hits[i + offset];
+        });
+        return localPlayer ? hits[0] : false;
+    }
+}
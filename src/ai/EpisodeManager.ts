@@ -11,6 +11,34 @@ export interface EpisodeState {
     stuckStartMs: number | null;
     wrongWayStartMs: number | null;
     recentCollisions: number[];
+    spawnIndex: number;
+}
+
+/**
+ * Pick a spawn checkpoint index from optional per-checkpoint weights (sent by
+ * the agent with `reset`). Falls back to uniform when the weights are missing,
+ * sized for another track, or all zero.
+ */
+export function pickSpawnIndex(count: number, weights?: number[] | null, rand: number = Math.random()): number {
+    if (count <= 0) return -1;
+
+    let total = 0;
+    if (weights && weights.length === count) {
+        for (const w of weights) {
+            total += w > 0 ? w : 0;
+        }
+    }
+    if (total <= 0) {
+        return Math.min(count - 1, Math.floor(rand * count));
+    }
+
+    let target = rand * total;
+    for (let i = 0; i < count; i++) {
+        const w = weights[i] > 0 ? weights[i] : 0;
+        if (target < w) return i;
+        target -= w;
+    }
+    return count - 1;
 }
 
 export class EpisodeManager {
@@ -21,7 +49,8 @@ export class EpisodeManager {
         startMs: 0,
         stuckStartMs: null,
         wrongWayStartMs: null,
-        recentCollisions: []
+        recentCollisions: [],
+        spawnIndex: -1
     };
 
     private readonly MAX_EPISODE_TIME_MS = 60000;
@@ -31,7 +60,7 @@ export class EpisodeManager {
     private readonly COLLISION_WINDOW_MS = 1500;
     private readonly MAX_COLLISIONS_IN_WINDOW = 3;
 
-    reset(player: Player, track: Track, lapCounter: LapCounter | null): void {
+    reset(player: Player, track: Track, lapCounter: LapCounter | null, spawnWeights?: number[] | null): void {
         this.state.episodeNumber++;
         this.state.stepCount = 0;
         this.state.totalReward = 0;
@@ -40,10 +69,12 @@ export class EpisodeManager {
         this.state.wrongWayStartMs = null;
         this.state.recentCollisions = [];
 
-        // Reset car at random checkpoint
+        this.state.spawnIndex = -1;
+
+        // Reset car at a sampled checkpoint (uniform unless the agent sent weights)
         if (lapCounter && track.checkpoints.length > 0) {
-            const randomIdx = Math.floor(Math.random() * track.checkpoints.length);
-            const startCP = track.checkpoints[randomIdx];
+            const spawnIdx = pickSpawnIndex(track.checkpoints.length, spawnWeights);
+            const startCP = track.checkpoints[spawnIdx];
 
             if (startCP) {
                 const midX = (startCP.a.x + startCP.b.x) / 2;
@@ -72,6 +103,7 @@ export class EpisodeManager {
                 
                 // Initialize lap counter from this checkpoint
                 lapCounter.initializeFromCheckpoint(startCP.id, Date.now());
+                this.state.spawnIndex = spawnIdx;
             }
         }
 
@@ -128,6 +160,26 @@ export class EpisodeManager {
         return { done: false, reason: '' };
     }
 
+    /**
+     * Index of the checkpoint the car last passed (the track section it is in),
+     * or the spawn checkpoint before the first crossing. -1 when unknown.
+     */
+    getSection(lapCounter: LapCounter | null, checkpointCount: number): number {
+        if (!lapCounter || checkpointCount <= 0) return this.state.spawnIndex;
+
+        const lap = lapCounter.getState();
+        if (lap.direction === 0 || lap.expectedIndex < 0) {
+            return lap.startIndex;
+        }
+
+        // expectedIndex skips the start checkpoint, so step back the same way
+        let prev = (lap.expectedIndex - lap.direction + checkpointCount) % checkpointCount;
+        if (prev === lap.startIndex) {
+            prev = (prev - lap.direction + checkpointCount) % checkpointCount;
+        }
+        return prev;
+    }
+
     getState(): EpisodeState {
         return { ...this.state };
     }
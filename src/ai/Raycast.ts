@@ -48,3 +48,21 @@ export function raycastDistances(
 
     return distances;
 }
+
+const WALL_PROXIMITY_RAY_ANGLES = [-0.6, -0.4, -0.2, 0, 0.2, 0.4, 0.6];
+const WALL_PROXIMITY_MAX_DIST = 400;
+
+export function wallProximity(
+    carPos: Vector,
+    carAngle: number,
+    boundaries: number[][][]
+): number {
+    const distances = raycastDistances(
+        carPos,
+        carAngle,
+        WALL_PROXIMITY_RAY_ANGLES,
+        boundaries,
+        WALL_PROXIMITY_MAX_DIST
+    );
+    return Math.min(...distances) / WALL_PROXIMITY_MAX_DIST;
+}
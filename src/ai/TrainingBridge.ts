@@ -6,6 +6,10 @@ import Player from "../components/Player/Player";
 import Track from "../components/Playfield/Track";
 import { LapCounter } from "../race/LapCounter";
 import { Dimensions } from "../utils/Utils";
+import { TrainingTransport, WebSocketTransport } from "./TrainingTransport";
+import { SpectatorFrame } from "../net/SpectatorClient";
+import { AIFleet } from "./AIFleet";
+import { wallProximity } from "./Raycast";
 
 export interface TrainingBridgeCallbacks {
     onReset: () => void;
@@ -16,82 +20,121 @@ export interface TrainingBridgeCallbacks {
     getMapSize: () => Dimensions;
     getCollision: () => boolean;
     getWallProximity: () => number;
+    /** Extra AI cars stepped alongside the local player (multi-car training). */
+    getFleet?: () => AIFleet | null;
+}
+
+// Per-car training state; agent 0 is the local player, agents 1..K-1 the fleet cars
+interface TrainingAgent {
+    aiController: AIController;
+    reward: Reward;
+    episodeManager: EpisodeManager;
+    lastLapSeenMs: number | null;
+    lastBestLapMs: number | null;
+    lastSpectatorMs: number;
+}
+
+interface AgentView {
+    player: Player;
+    lapCounter: LapCounter | null;
+    collision: boolean;
+    wallProximity: number;
+}
+
+export interface TrainingBridgeOptions {
+    aiVersion?: number;
+    transport?: TrainingTransport;
 }
 
 export class TrainingBridge {
-    private ws: WebSocket | null = null;
+    private transport: TrainingTransport | null = null;
+    private readonly customTransport: TrainingTransport | null;
     private connected: boolean = false;
     public renderEnabled: boolean = true;
-    private aiController: AIController;
-    private reward: Reward;
-    private episodeManager: EpisodeManager;
+    private agents: TrainingAgent[] = [];
+    private latestFrames: SpectatorFrame[] = [];
     private callbacks: TrainingBridgeCallbacks;
-    private lastLapSeenMs: number | null = null;
-    private lastBestLapMs: number | null = null;
     private aiVersion: number = 1;
+    private readonly SPECTATOR_INTERVAL_MS = 100;
 
-    constructor(aiController: AIController, callbacks: TrainingBridgeCallbacks) {
-        this.aiController = aiController;
+    constructor(aiController: AIController, callbacks: TrainingBridgeCallbacks, options: TrainingBridgeOptions = {}) {
         this.callbacks = callbacks;
-        this.reward = new Reward();
-        this.episodeManager = new EpisodeManager();
-        
-        // Read AI version from URL
+        this.agents.push(TrainingBridge.createAgent(aiController));
+        this.customTransport = options.transport ?? null;
+        this.aiVersion = options.aiVersion ?? TrainingBridge.readAiVersionFromUrl();
+    }
+
+    private static createAgent(aiController: AIController): TrainingAgent {
+        return {
+            aiController,
+            reward: new Reward(),
+            episodeManager: new EpisodeManager(),
+            lastLapSeenMs: null,
+            lastBestLapMs: null,
+            lastSpectatorMs: 0
+        };
+    }
+
+    private static readAiVersionFromUrl(): number {
+        if (typeof window === 'undefined') {
+            return 1;
+        }
         const urlParams = new URLSearchParams(window.location.search);
-        this.aiVersion = Number(urlParams.get('aiver') || '1');
+        return Number(urlParams.get('aiver') || '1');
     }
 
     connect(url: string = 'ws://127.0.0.1:8765'): void {
-        if (this.ws) {
+        if (this.transport) {
             console.warn('TrainingBridge: already connected');
             return;
         }
 
-        console.log('TrainingBridge: connecting to', url);
-        this.ws = new WebSocket(url);
-
-        this.ws.onopen = () => {
-            console.log('TrainingBridge: connected');
-            this.connected = true;
-            this.send({
-                type: 'hello',
-                aiVersion: this.aiVersion,
-                fps: 120
-            });
-        };
+        const transport = this.customTransport ?? new WebSocketTransport(url);
+        this.transport = transport;
+        console.log('TrainingBridge: connecting to', transport.label);
 
-        this.ws.onclose = () => {
-            console.log('TrainingBridge: disconnected');
-            this.connected = false;
-            this.ws = null;
-        };
-
-        this.ws.onerror = (error) => {
-            console.error('TrainingBridge: error', error);
-            this.send({
-                type: 'error',
-                message: 'WebSocket error'
-            });
-        };
-
-        this.ws.onmessage = (event) => {
-            try {
-                const msg = JSON.parse(event.data);
-                this.handleMessage(msg);
-            } catch (error) {
-                console.error('TrainingBridge: failed to parse message', error);
+        transport.open({
+            onOpen: () => {
+                console.log('TrainingBridge: connected');
+                this.connected = true;
+                this.send({
+                    type: 'hello',
+                    aiVersion: this.aiVersion,
+                    fps: 120,
+                    numAgents: this.getNumAgents()
+                });
+            },
+            onClose: () => {
+                console.log('TrainingBridge: disconnected');
+                this.connected = false;
+                this.transport = null;
+            },
+            onError: (error) => {
+                console.error('TrainingBridge: error', error);
                 this.send({
                     type: 'error',
-                    message: 'Failed to parse message'
+                    message: 'Transport error'
                 });
+            },
+            onMessage: (raw) => {
+                try {
+                    const msg = JSON.parse(raw);
+                    this.handleMessage(msg);
+                } catch (error) {
+                    console.error('TrainingBridge: failed to parse message', error);
+                    this.send({
+                        type: 'error',
+                        message: 'Failed to parse message'
+                    });
+                }
             }
-        };
+        });
     }
 
     disconnect(): void {
-        if (this.ws) {
-            this.ws.close();
-            this.ws = null;
+        if (this.transport) {
+            this.transport.close();
+            this.transport = null;
             this.connected = false;
         }
     }
@@ -105,11 +148,51 @@ export class TrainingBridge {
     }
 
     getEpisodeState() {
-        return this.episodeManager.getState();
+        return this.agents[0].episodeManager.getState();
     }
 
     getLastRewardBreakdown(): RewardBreakdown {
-        return this.reward.getLastBreakdown();
+        return this.agents[0].reward.getLastBreakdown();
+    }
+
+    /** Most recent spectator frame of every agent (env = agent index). */
+    getSpectatorFrames(): SpectatorFrame[] {
+        return this.latestFrames.filter(frame => !!frame);
+    }
+
+    getNumAgents(): number {
+        return 1 + (this.callbacks.getFleet?.()?.size ?? 0);
+    }
+
+    // Fleet cars get their training state on first use
+    private getAgent(index: number): TrainingAgent {
+        const fleet = this.callbacks.getFleet?.();
+        while (this.agents.length <= index && fleet && this.agents.length <= fleet.size) {
+            this.agents.push(TrainingBridge.createAgent(fleet.cars[this.agents.length - 1].aiController));
+        }
+        return this.agents[index];
+    }
+
+    private getAgentView(index: number, track: Track): AgentView | null {
+        if (index === 0) {
+            const player = this.callbacks.getPlayer();
+            if (!player) return null;
+            return {
+                player,
+                lapCounter: this.callbacks.getLapCounter(),
+                collision: this.callbacks.getCollision(),
+                wallProximity: this.callbacks.getWallProximity()
+            };
+        }
+
+        const car = this.callbacks.getFleet?.()?.cars[index - 1];
+        if (!car) return null;
+        return {
+            player: car.player,
+            lapCounter: car.lapCounter,
+            collision: car.collision,
+            wallProximity: wallProximity(car.player.car.position, car.player.car.angle, track.boundaries)
+        };
     }
 
     private handleMessage(msg: any): void {
@@ -119,13 +202,25 @@ export class TrainingBridge {
                 break;
 
             case 'reset':
-                this.handleReset();
+                this.handleReset(Array.isArray(msg.spawnWeights) ? msg.spawnWeights : null);
                 break;
 
             case 'step':
                 this.handleStep(msg.action, msg.repeat || 4);
                 break;
 
+            case 'reset_multi':
+                this.handleResetMulti(Array.isArray(msg.spawnWeights) ? msg.spawnWeights : null);
+                break;
+
+            case 'step_multi':
+                this.handleStepMulti(
+                    msg.actions,
+                    msg.repeat || 4,
+                    Array.isArray(msg.spawnWeights) ? msg.spawnWeights : null
+                );
+                break;
+
             case 'render':
                 this.renderEnabled = msg.enabled !== false;
                 console.log('TrainingBridge: render', this.renderEnabled ? 'enabled' : 'disabled');
@@ -136,12 +231,9 @@ export class TrainingBridge {
         }
     }
 
-    private handleReset(): void {
-        const player = this.callbacks.getPlayer();
+    private handleReset(spawnWeights: number[] | null): void {
         const track = this.callbacks.getTrack();
-        const lapCounter = this.callbacks.getLapCounter();
-
-        if (!player || !track) {
+        if (!this.callbacks.getPlayer() || !track) {
             this.send({
                 type: 'error',
                 message: 'Player or track not ready'
@@ -149,39 +241,20 @@ export class TrainingBridge {
             return;
         }
 
-        // Reset episode
-        this.episodeManager.reset(player, track, lapCounter);
-        this.reward.reset();
-        this.aiController.reset();
-        this.lastLapSeenMs = null;
-        this.lastBestLapMs = lapCounter?.getState().bestLapMs ?? null;
+        const result = this.resetAgent(0, track, spawnWeights);
 
         // Trigger game reset
         this.callbacks.onReset();
 
-        // Build initial observation
-        const mapSize = this.callbacks.getMapSize();
-        const { obs, info } = Observation.build(
-            player,
-            track,
-            lapCounter,
-            mapSize,
-            this.reward.getCollisionCount()
-        );
-
         this.send({
             type: 'reset_result',
-            obs,
-            info
+            ...result
         });
     }
 
     private handleStep(action: number[], repeat: number): void {
-        const player = this.callbacks.getPlayer();
         const track = this.callbacks.getTrack();
-        const lapCounter = this.callbacks.getLapCounter();
-
-        if (!player || !track) {
+        if (!this.callbacks.getPlayer() || !track) {
             this.send({
                 type: 'error',
                 message: 'Player or track not ready'
@@ -190,44 +263,147 @@ export class TrainingBridge {
         }
 
         // Set action
-        this.aiController.setAction(action);
+        this.agents[0].aiController.setAction(action);
 
         // Execute steps
         this.callbacks.onStep(action, repeat);
 
-        // Compute reward
-        const collision = this.callbacks.getCollision();
-        const wallProximity = this.callbacks.getWallProximity();
+        this.send({
+            type: 'step_result',
+            ...this.stepAgent(0, track, Date.now())
+        });
+    }
+
+    // All K cars of this instance in one message: reset every agent
+    private handleResetMulti(spawnWeights: number[] | null): void {
+        const track = this.callbacks.getTrack();
+        if (!this.callbacks.getPlayer() || !track) {
+            this.send({
+                type: 'error',
+                message: 'Player or track not ready'
+            });
+            return;
+        }
+
+        const results = [];
+        for (let i = 0; i < this.getNumAgents(); i++) {
+            results.push(this.resetAgent(i, track, spawnWeights));
+        }
+        this.callbacks.onReset();
+
+        this.send({
+            type: 'reset_multi_result',
+            results
+        });
+    }
+
+    // One action per car, one shared simulation advance, one batched reply. Finished
+    // agents are reset in place and report their next first observation as resetObs.
+    private handleStepMulti(actions: number[][], repeat: number, spawnWeights: number[] | null): void {
+        const track = this.callbacks.getTrack();
+        const numAgents = this.getNumAgents();
+        if (!this.callbacks.getPlayer() || !track) {
+            this.send({
+                type: 'error',
+                message: 'Player or track not ready'
+            });
+            return;
+        }
+        if (!Array.isArray(actions) || actions.length !== numAgents) {
+            this.send({
+                type: 'error',
+                message: `step_multi expects ${numAgents} actions`
+            });
+            return;
+        }
+
+        for (let i = 0; i < numAgents; i++) {
+            this.getAgent(i).aiController.setAction(actions[i]);
+        }
+        this.callbacks.onStep(actions[0], repeat);
+
         const nowMs = Date.now();
-        
-        let stepReward = this.reward.compute(
+        const results = [];
+        for (let i = 0; i < numAgents; i++) {
+            const result: any = this.stepAgent(i, track, nowMs);
+            if (result.done) {
+                const next = this.resetAgent(i, track, spawnWeights);
+                result.resetObs = next.obs;
+                result.resetInfo = next.info;
+            }
+            results.push(result);
+        }
+
+        this.send({
+            type: 'step_multi_result',
+            results
+        });
+    }
+
+    private resetAgent(index: number, track: Track, spawnWeights: number[] | null): { obs: number[]; info: any } {
+        const agent = this.getAgent(index);
+        const { player, lapCounter } = this.getAgentView(index, track);
+
+        // Reset episode
+        agent.episodeManager.reset(player, track, lapCounter, spawnWeights);
+        agent.reward.reset();
+        agent.aiController.reset();
+        agent.lastLapSeenMs = null;
+        agent.lastBestLapMs = lapCounter?.getState().bestLapMs ?? null;
+
+        // Build initial observation
+        const mapSize = this.callbacks.getMapSize();
+        const { obs, info } = Observation.build(
+            player,
+            track,
+            lapCounter,
+            mapSize,
+            agent.reward.getCollisionCount()
+        );
+
+        return {
+            obs,
+            info: {
+                ...info,
+                spawnIndex: agent.episodeManager.getState().spawnIndex,
+                numCheckpoints: track.checkpoints.length
+            }
+        };
+    }
+
+    private stepAgent(index: number, track: Track, nowMs: number): { obs: number[]; reward: number; done: boolean; info: any } {
+        const agent = this.getAgent(index);
+        const { player, lapCounter, collision, wallProximity: proximity } = this.getAgentView(index, track);
+
+        // Compute reward
+        let stepReward = agent.reward.compute(
             player,
             track,
             lapCounter,
             collision,
-            wallProximity,
+            proximity,
             nowMs
         );
 
         // Check for lap completion bonus
         const currentLapMs = lapCounter?.getState().lastLapMs ?? null;
         
-        if (currentLapMs !== null && currentLapMs !== this.lastLapSeenMs) {
+        if (currentLapMs !== null && currentLapMs !== agent.lastLapSeenMs) {
             // Lap completed
             const currentBestMs = lapCounter?.getState().bestLapMs ?? null;
             const improved = currentBestMs !== null && 
-                             (this.lastBestLapMs === null || currentBestMs < this.lastBestLapMs);
+                             (agent.lastBestLapMs === null || currentBestMs < agent.lastBestLapMs);
             
-            stepReward += this.reward.onLapComplete(improved);
-            this.lastBestLapMs = currentBestMs;
-            this.lastLapSeenMs = currentLapMs;
+            stepReward += agent.reward.onLapComplete(improved);
+            agent.lastBestLapMs = currentBestMs;
+            agent.lastLapSeenMs = currentLapMs;
         }
 
         // Update episode
-        this.episodeManager.step(stepReward);
+        agent.episodeManager.step(stepReward);
 
         // Check done
-        const { done, reason } = this.episodeManager.checkDone(
+        const { done, reason } = agent.episodeManager.checkDone(
             player,
             lapCounter,
             collision,
@@ -241,27 +417,66 @@ export class TrainingBridge {
             track,
             lapCounter,
             mapSize,
-            this.reward.getCollisionCount()
+            agent.reward.getCollisionCount()
         );
 
-        this.send({
-            type: 'step_result',
+        const episode = agent.episodeManager.getState();
+        return {
             obs,
             reward: stepReward,
             done,
             info: {
                 ...info,
                 reason: done ? reason : undefined,
-                episode: this.episodeManager.getState().episodeNumber,
-                step: this.episodeManager.getState().stepCount,
-                totalReward: this.episodeManager.getState().totalReward
+                episode: episode.episodeNumber,
+                step: episode.stepCount,
+                totalReward: episode.totalReward,
+                section: agent.episodeManager.getSection(lapCounter, track.checkpoints.length),
+                spectator: this.buildSpectatorFrame(index, agent, player, lapCounter, info, nowMs)
             }
-        });
+        };
+    }
+
+    // Throttled pose/telemetry for viewer tabs; undefined (dropped from JSON) between ticks
+    private buildSpectatorFrame(
+        index: number,
+        agent: TrainingAgent,
+        player: Player,
+        lapCounter: LapCounter | null,
+        info: ObservationInfo,
+        nowMs: number
+    ): SpectatorFrame | undefined {
+        if (nowMs - agent.lastSpectatorMs < this.SPECTATOR_INTERVAL_MS) {
+            return undefined;
+        }
+        agent.lastSpectatorMs = nowMs;
+
+        const episode = agent.episodeManager.getState();
+        const frame: SpectatorFrame = {
+            env: index,
+            x: player.car.position.x,
+            y: player.car.position.y,
+            angle: player.car.angle,
+            vx: player.car.velocity.x,
+            vy: player.car.velocity.y,
+            drifting: player.car.isDrifting,
+            frameScore: player.score.frameScore,
+            driftScore: player.score.driftScore,
+            episode: episode.episodeNumber,
+            step: episode.stepCount,
+            totalReward: episode.totalReward,
+            collisions: info.collisions,
+            lapMs: info.lapMs,
+            lastLapMs: lapCounter?.getState().lastLapMs ?? null,
+            bestLapMs: info.bestLapMs
+        };
+        this.latestFrames[index] = frame;
+        return frame;
     }
 
     private send(msg: any): void {
-        if (this.ws && this.ws.readyState === WebSocket.OPEN) {
-            this.ws.send(JSON.stringify(msg));
+        if (this.transport && this.transport.isOpen()) {
+            this.transport.send(JSON.stringify(msg));
         }
     }
 }
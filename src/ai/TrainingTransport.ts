@@ -0,0 +1,55 @@
+export interface TrainingTransportHandlers {
+    onOpen: () => void;
+    onMessage: (raw: string) => void;
+    onClose: () => void;
+    onError: (error: unknown) => void;
+}
+
+/**
+ * Message pipe between the TrainingBridge and the agent. The browser talks
+ * WebSocket; the headless Node runner talks newline-delimited JSON on stdio.
+ */
+export interface TrainingTransport {
+    readonly label: string;
+    open(handlers: TrainingTransportHandlers): void;
+    send(data: string): void;
+    close(): void;
+    isOpen(): boolean;
+}
+
+export class WebSocketTransport implements TrainingTransport {
+    readonly label: string;
+    private ws: WebSocket | null = null;
+
+    constructor(private readonly url: string) {
+        this.label = url;
+    }
+
+    open(handlers: TrainingTransportHandlers): void {
+        this.ws = new WebSocket(this.url);
+        this.ws.onopen = () => handlers.onOpen();
+        this.ws.onclose = () => {
+            this.ws = null;
+            handlers.onClose();
+        };
+        this.ws.onerror = (error) => handlers.onError(error);
+        this.ws.onmessage = (event) => handlers.onMessage(event.data);
+    }
+
+    send(data: string): void {
+        if (this.isOpen()) {
+            this.ws.send(data);
+        }
+    }
+
+    close(): void {
+        if (this.ws) {
+            this.ws.close();
+            this.ws = null;
+        }
+    }
+
+    isOpen(): boolean {
+        return !!this.ws && this.ws.readyState === WebSocket.OPEN;
+    }
+}
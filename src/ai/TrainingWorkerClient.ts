@@ -0,0 +1,72 @@
+import { SpectatorClient, SpectatorClientCallbacks } from "../net/SpectatorClient";
+import {
+    TrainingWorkerInit,
+    TrainingWorkerRender,
+    TrainingWorkerState,
+    TRAINING_WORKER_SCRIPT
+} from "../sim/TrainingWorkerProtocol";
+
+/**
+ * Page side of worker training: starts the training worker and shows its cars
+ * as spectator ghosts (`ghost_<agent>`), so the page renders them exactly like
+ * ?spectate=1 does. isConnected() reports the worker's agent connection and
+ * isRenderEnabled() the worker bridge's render flag.
+ */
+export class TrainingWorkerClient extends SpectatorClient {
+    private worker: Worker | null = null;
+    private agentConnected: boolean = false;
+    private renderEnabled: boolean = true;
+
+    constructor(callbacks: SpectatorClientCallbacks, private init: TrainingWorkerInit) {
+        super(callbacks);
+    }
+
+    connect(scriptUrl: string = TRAINING_WORKER_SCRIPT): void {
+        if (this.worker) {
+            console.warn('TrainingWorkerClient: worker already running');
+            return;
+        }
+
+        this.worker = new Worker(scriptUrl);
+        this.worker.onmessage = (event) => {
+            const msg = event.data as TrainingWorkerState;
+            if (msg?.type !== 'state') {
+                return;
+            }
+            this.agentConnected = msg.connected;
+            this.renderEnabled = msg.renderEnabled;
+            for (const frame of msg.frames) {
+                this.handleFrame(frame);
+            }
+        };
+        this.worker.onerror = (error) => {
+            console.error('TrainingWorkerClient: worker error', error);
+        };
+        this.worker.postMessage(this.init);
+        this.startPruning();
+        console.log('TrainingWorkerClient: training in worker, agent url', this.init.url);
+    }
+
+    disconnect(): void {
+        super.disconnect();
+        if (this.worker) {
+            this.worker.terminate();
+            this.worker = null;
+        }
+        this.agentConnected = false;
+    }
+
+    isConnected(): boolean {
+        return this.agentConnected;
+    }
+
+    isRenderEnabled(): boolean {
+        return this.renderEnabled;
+    }
+
+    setRenderEnabled(enabled: boolean): void {
+        this.renderEnabled = enabled;
+        const msg: TrainingWorkerRender = { type: 'render', enabled };
+        this.worker?.postMessage(msg);
+    }
+}
@@ -0,0 +1,31 @@
+import { describe, expect, it } from '@jest/globals';
+import { pickSpawnIndex } from '../EpisodeManager';
+
+describe('pickSpawnIndex', () => {
+    it('samples uniformly without weights', () => {
+        expect(pickSpawnIndex(4, null, 0)).toBe(0);
+        expect(pickSpawnIndex(4, null, 0.5)).toBe(2);
+        expect(pickSpawnIndex(4, null, 0.999)).toBe(3);
+    });
+
+    it('falls back to uniform when weights do not match the track', () => {
+        expect(pickSpawnIndex(4, [1, 0], 0.6)).toBe(2);
+        expect(pickSpawnIndex(4, [0, 0, 0, 0], 0.6)).toBe(2);
+    });
+
+    it('follows the weight distribution', () => {
+        const weights = [0.1, 0, 0.6, 0.3];
+        expect(pickSpawnIndex(4, weights, 0.05)).toBe(0);
+        expect(pickSpawnIndex(4, weights, 0.2)).toBe(2);
+        expect(pickSpawnIndex(4, weights, 0.69)).toBe(2);
+        expect(pickSpawnIndex(4, weights, 0.75)).toBe(3);
+    });
+
+    it('ignores negative weights', () => {
+        expect(pickSpawnIndex(3, [-5, 1, 0], 0.99)).toBe(1);
+    });
+
+    it('returns -1 for a track without checkpoints', () => {
+        expect(pickSpawnIndex(0, null, 0.3)).toBe(-1);
+    });
+});
@@ -8,7 +8,10 @@ export default class CarData {
   static async loadFromJSON(url: string = 'assets/cars.json'): Promise<void> {
     const res = await fetch(url);
     if (!res.ok) throw new Error(`Failed to load cars: ${res.status} ${res.statusText}`);
-    const json = await res.json();
+    CarData.loadFromObject(await res.json());
+  }
+
+  static loadFromObject(json: any): void {
     const raw = Array.isArray(json?.types) ? json.types : [];
     CarData.types = raw.map((t: any) => ({
       name: t.name,
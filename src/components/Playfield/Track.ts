@@ -3,6 +3,14 @@ import Vector from "../../utils/Vector"
 import {drawPolylineShape, drawCRSplinePath} from "./PlayfieldUtils";
 import {createShader, createProgram, createTexture} from "../../utils/WebGLUtils";
 import { Checkpoint, computeCheckpoints } from "../../race/CheckpointGenerator";
+import {
+    SegmentGrid,
+    TrackPackEntry,
+    buildSegmentGrid,
+    flattenSegments,
+    gridCellRange,
+    segmentsBBox
+} from "../../race/TrackPack";
 
 
 interface WallHit {
@@ -28,6 +36,11 @@ class Track {
     private ringAreas: number[] = [];
     private outerIndex: number = 0;
     private inwardSign: number[] = [];
+
+    // Uniform grid over wall segments for collision queries (from the track pack when available)
+    private segmentGrid: SegmentGrid | null = null;
+    private segmentSide: Uint16Array = new Uint16Array(0);
+    private ringFirstSegment: number[] = [];
     
     // Smooth rendering cache
     private smoothPath: Path2D | null = null;
@@ -74,7 +87,18 @@ class Track {
         // this.texture = createTexture(gl, distanceField, width, height);
     }
 
-    setBounds(boundaries: number[][][], ctx: CanvasRenderingContext2D) {
+    setBounds(boundaries: number[][][], ctx: CanvasRenderingContext2D, precomputed?: TrackPackEntry | null) {
+        this.setGeometry(boundaries, precomputed);
+        
+        // Rebuild cached smooth path for rendering
+        this.rebuildSmoothPath();
+        
+        this.draw(ctx);
+    }
+
+    // Collision and checkpoint data only; safe without a DOM (headless sim).
+    // A matching track pack entry skips checkpoint generation and the grid build.
+    setGeometry(boundaries: number[][][], precomputed?: TrackPackEntry | null) {
         this.boundaries = boundaries;
         
         // Compute ring metadata for collision normals
@@ -83,11 +107,27 @@ class Track {
             Math.abs(area) > Math.abs(areas[maxIdx]) ? idx : maxIdx, 0);
         this.inwardSign = this.ringAreas.map(area => area >= 0 ? 1 : -1); // CCW => +1
         
-        // Rebuild cached smooth path for rendering
-        this.rebuildSmoothPath();
-        
-        this.computeCheckpoints();
-        this.draw(ctx);
+        this.rebuildSegmentIndex(precomputed?.grid ?? null);
+
+        if (precomputed) {
+            this.checkpoints = precomputed.checkpoints;
+        } else {
+            this.computeCheckpoints();
+        }
+    }
+
+    private rebuildSegmentIndex(grid: SegmentGrid | null): void {
+        const { segments, ringSegmentCounts } = flattenSegments(this.boundaries);
+        this.segmentGrid = grid ?? buildSegmentGrid(segments, segmentsBBox(segments));
+
+        this.segmentSide = new Uint16Array(segments.length / 4);
+        this.ringFirstSegment = [];
+        let first = 0;
+        ringSegmentCounts.forEach((count, side) => {
+            this.ringFirstSegment.push(first);
+            this.segmentSide.fill(side, first, first + count);
+            first += count;
+        });
     }
 
     computeCheckpoints(stride: number = 10): void {
@@ -127,46 +167,79 @@ class Track {
     }
 
     getWallHit(car): WallHit {
-        // Iterate over each boundary line
-        for (let side = 0; side < this.boundaries.length; side++) {
-            let sideBoundaries = this.boundaries[side]
-            for (let i = 0; i < sideBoundaries.length - 1; i++) {
-                let start = new Vector(sideBoundaries[i][0], sideBoundaries[i][1]);
-                let end = new Vector(sideBoundaries[i + 1][0], sideBoundaries[i + 1][1]);
-                let carPos = car.position;
-
-                // Calculate the distance from the car to the boundary line
-                let lineDist = Vector.dist(carPos, this.closestPointOnLine(start, end, carPos));
-
-                // Check if the distance is less than the car's size (assuming the car is a circle with diameter of car.l)
-                if (lineDist < car.carType.dimensions.length / 2) {
-                    // Calculate the normal vector
-                    let boundaryVector = Vector.sub(end, start);
-                    // Base left normal (-dy, dx)
-                    let normalVector = new Vector(-boundaryVector.y, boundaryVector.x);
-                    
-                    // Make it "inward" for the ring (CCW => left is inward)
-                    normalVector = normalVector.mult(this.inwardSign[side] || 1);
-                    
-                    // For inner rings, flip to push cars OUT of the hole (into the track)
-                    if (side !== this.outerIndex) {
-                        normalVector = normalVector.mult(-1);
-                    }
-                    
-                    normalVector = normalVector.normalize();
-
-                    return {
-                        distance: lineDist,
-                        normalVector,
-                        wallStart: start,
-                        wallEnd: end,
-                    }
+        if (!this.segmentGrid) {
+            this.rebuildSegmentIndex(null);
+        }
+        const grid = this.segmentGrid;
+        const carPos = car.position;
+        // Assuming the car is a circle with diameter of car.l
+        const radius = car.carType.dimensions.length / 2;
+
+        // Only segments in grid cells around the car can be in reach (+1 for float32 rounding)
+        const range = gridCellRange(grid, carPos.x - radius - 1, carPos.y - radius - 1, carPos.x + radius + 1, carPos.y + radius + 1);
+        if (!range) {
+            return null;
+        }
 
+        // Lowest segment index wins, same as scanning ring by ring
+        let best = -1;
+        let bestDist = 0;
+        for (let cy = range.cy0; cy <= range.cy1; cy++) {
+            for (let cx = range.cx0; cx <= range.cx1; cx++) {
+                const cell = cy * grid.cols + cx;
+                for (let k = grid.cellStart[cell]; k < grid.cellStart[cell + 1]; k++) {
+                    const segment = grid.cellSegments[k];
+                    if (best !== -1 && segment >= best) continue;
+
+                    const { start, end } = this.segmentEndpoints(segment);
+                    // Calculate the distance from the car to the boundary line
+                    const lineDist = Vector.dist(carPos, this.closestPointOnLine(start, end, carPos));
+                    if (lineDist < radius) {
+                        best = segment;
+                        bestDist = lineDist;
+                    }
                 }
             }
         }
 
-        return null
+        if (best === -1) {
+            return null;
+        }
+
+        const side = this.segmentSide[best];
+        const { start, end } = this.segmentEndpoints(best);
+
+        // Calculate the normal vector
+        let boundaryVector = Vector.sub(end, start);
+        // Base left normal (-dy, dx)
+        let normalVector = new Vector(-boundaryVector.y, boundaryVector.x);
+
+        // Make it "inward" for the ring (CCW => left is inward)
+        normalVector = normalVector.mult(this.inwardSign[side] || 1);
+
+        // For inner rings, flip to push cars OUT of the hole (into the track)
+        if (side !== this.outerIndex) {
+            normalVector = normalVector.mult(-1);
+        }
+
+        normalVector = normalVector.normalize();
+
+        return {
+            distance: bestDist,
+            normalVector,
+            wallStart: start,
+            wallEnd: end,
+        }
+    }
+
+    private segmentEndpoints(segment: number): { start: Vector; end: Vector } {
+        const side = this.segmentSide[segment];
+        const i = segment - this.ringFirstSegment[side];
+        const ring = this.boundaries[side];
+        return {
+            start: new Vector(ring[i][0], ring[i][1]),
+            end: new Vector(ring[i + 1][0], ring[i + 1][1])
+        };
     }
 
     draw(ctx: CanvasRenderingContext2D) {
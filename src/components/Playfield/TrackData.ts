@@ -1,22 +1,56 @@
 import { Dimensions } from "../../utils/Utils";
 import { Integrations } from "../../editor/Integrations";
+import { TrackPackEntry, decodeTrackPack, hashBounds } from "../../race/TrackPack";
 
 export default class TrackData {
   static tracks: { name: string; background: string; bounds: number[][][]; mapSize?: Dimensions }[] = [];
   static loaded: boolean = false;
+  static packs: Map<string, TrackPackEntry> = new Map();
 
   static async loadFromJSON(url: string = 'assets/tracks.json'): Promise<void> {
     const res = await fetch(url);
     if (!res.ok) throw new Error(`Failed to load tracks: ${res.status} ${res.statusText}`);
-    const json = await res.json();
+    TrackData.loadFromObject(await res.json());
+  }
+
+  static loadFromObject(json: any, options: { mergeCustom?: boolean } = {}): void {
     TrackData.tracks = Array.isArray(json?.tracks) ? json.tracks : [];
     
     // Merge custom tracks from localStorage
-    Integrations.mergeCustomTracksIntoTrackData(TrackData);
+    if (options.mergeCustom ?? true) {
+      Integrations.mergeCustomTracksIntoTrackData(TrackData);
+    }
     
     TrackData.loaded = true;
   }
 
+  /** Optional precompiled geometry (see tools/build-track-pack.ts); tracks fall back to runtime generation. */
+  static async loadPack(url: string = 'assets/tracks.pack'): Promise<void> {
+    try {
+      const res = await fetch(url);
+      if (!res.ok) throw new Error(`${res.status} ${res.statusText}`);
+      TrackData.loadPackFromBuffer(await res.arrayBuffer());
+    } catch (error) {
+      console.warn(`Track pack not loaded (${url}); generating track geometry at runtime`, error);
+    }
+  }
+
+  static loadPackFromBuffer(buffer: ArrayBuffer): void {
+    TrackData.packs = new Map(decodeTrackPack(buffer).map(entry => [entry.name, entry]));
+  }
+
+  /** Pack entry for a track, only if it was built from the bounds currently loaded. */
+  static getPrecomputed(name: string): TrackPackEntry | null {
+    const entry = TrackData.packs.get(name);
+    if (!entry) return null;
+    const track = TrackData.tracks.find(tr => tr.name === name);
+    if (!track || hashBounds(track.bounds) !== entry.sourceHash) {
+      console.warn(`Track pack entry for ${name} is stale; rebuild with npm run build:tracks`);
+      return null;
+    }
+    return entry;
+  }
+
   static getByName(name: string) {
     const t = TrackData.tracks.find(tr => tr.name === name);
     if (!t) throw new Error("Track not found: " + name);
@@ -0,0 +1,109 @@
+import { describe, expect, it } from '@jest/globals';
+import * as fs from 'fs';
+import * as path from 'path';
+import Track from '../Track';
+import Vector from '../../../utils/Vector';
+import { buildTrackPackEntry, decodeTrackPack, encodeTrackPack } from '../../../race/TrackPack';
+
+const tracksJson = JSON.parse(
+    fs.readFileSync(path.resolve(__dirname, '../../../assets/tracks.json'), 'utf8')
+);
+
+// Deterministic positions across runs
+function mulberry32(seed: number): () => number {
+    return () => {
+        seed |= 0;
+        seed = (seed + 0x6D2B79F5) | 0;
+        let t = Math.imul(seed ^ (seed >>> 15), 1 | seed);
+        t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t;
+        return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+    };
+}
+
+function fakeCar(x: number, y: number, length: number) {
+    return { position: new Vector(x, y), carType: { dimensions: { length } } };
+}
+
+// The pre-grid collision check: first segment in reach, scanning ring by ring
+function linearWallHit(track: Track, car: ReturnType<typeof fakeCar>) {
+    for (const ring of track.boundaries) {
+        for (let i = 0; i < ring.length - 1; i++) {
+            const start = new Vector(ring[i][0], ring[i][1]);
+            const end = new Vector(ring[i + 1][0], ring[i + 1][1]);
+            const lineDist = Vector.dist(car.position, track.closestPointOnLine(start, end, car.position));
+            if (lineDist < car.carType.dimensions.length / 2) {
+                return { distance: lineDist, wallStart: start, wallEnd: end };
+            }
+        }
+    }
+    return null;
+}
+
+function samplePositions(bounds: number[][][], count: number): Array<{ x: number; y: number }> {
+    const random = mulberry32(1234);
+    const points = ([] as number[][]).concat(...bounds);
+    const xs = points.map(p => p[0]);
+    const ys = points.map(p => p[1]);
+    const minX = Math.min(...xs) - 100, maxX = Math.max(...xs) + 100;
+    const minY = Math.min(...ys) - 100, maxY = Math.max(...ys) + 100;
+
+    const positions = [];
+    for (let n = 0; n < count; n++) {
+        if (n % 2 === 0) {
+            // Anywhere around the track, including outside its bounds
+            positions.push({ x: minX + random() * (maxX - minX), y: minY + random() * (maxY - minY) });
+        } else {
+            // Close to a wall, where several segments compete
+            const ring = bounds[Math.floor(random() * bounds.length)];
+            const i = Math.floor(random() * (ring.length - 1));
+            const t = random();
+            positions.push({
+                x: ring[i][0] + t * (ring[i + 1][0] - ring[i][0]) + (random() - 0.5) * 80,
+                y: ring[i][1] + t * (ring[i + 1][1] - ring[i][1]) + (random() - 0.5) * 80
+            });
+        }
+    }
+    return positions;
+}
+
+describe('Track.getWallHit', () => {
+    const packed = decodeTrackPack(encodeTrackPack(tracksJson.tracks.map(buildTrackPackEntry)));
+
+    tracksJson.tracks.forEach((source: { name: string; bounds: number[][][] }, t: number) => {
+        it(`matches the linear segment scan on ${source.name}`, () => {
+            const built = new Track(source.name, null, { width: 5000, height: 4000 }, []);
+            built.setGeometry(source.bounds);
+            const fromPack = new Track(source.name, null, { width: 5000, height: 4000 }, []);
+            fromPack.setGeometry(source.bounds, packed[t]);
+
+            let hits = 0;
+            for (const { x, y } of samplePositions(source.bounds, 4000)) {
+                for (const length of [20, 45, 90]) {
+                    const car = fakeCar(x, y, length);
+                    const expected = linearWallHit(built, car);
+                    for (const track of [built, fromPack]) {
+                        const hit = track.getWallHit(car);
+                        if (expected === null) {
+                            expect(hit).toBeNull();
+                            continue;
+                        }
+                        expect(hit).not.toBeNull();
+                        expect(hit.distance).toBe(expected.distance);
+                        expect(hit.wallStart).toEqual(expected.wallStart);
+                        expect(hit.wallEnd).toEqual(expected.wallEnd);
+                        // Unit normal, perpendicular to the wall (rings may close with a zero-length segment)
+                        const wall = Vector.sub(expected.wallEnd, expected.wallStart);
+                        if (wall.mag() > 0) {
+                            const dir = wall.normalize();
+                            expect(hit.normalVector.mag()).toBeCloseTo(1, 6);
+                            expect(hit.normalVector.x * dir.x + hit.normalVector.y * dir.y).toBeCloseTo(0, 6);
+                        }
+                    }
+                    if (expected !== null) hits++;
+                }
+            }
+            // Make sure the sampling actually exercises collisions
+            expect(hits).toBeGreaterThan(1000);
+        });
+    });
+});
@@ -15,6 +15,7 @@ import ServerTimeSync from "../../net/ServerTimeSync";
 import SequenceGate from "../../net/SequenceGate";
 import ServerMessageDecoder, { PlayerStateMessage } from "../../net/ServerMessageDecoder";
 import { translatePlayerState } from "../../net/ServerMessageTranslator";
+import { RELAY_FRAMES_ACK } from "../../net/RelayWire";
 
 export default class ServerConnection {
     private ws: WebSocket | null = null;
@@ -42,6 +43,8 @@ export default class ServerConnection {
     private readonly timeSync = new ServerTimeSync();
     private readonly sequenceGate = new SequenceGate();
     private messageDecoder: ServerMessageDecoder | null = null;
+    // Set once the server acknowledges ?frames=1; until then messages are single PlayerStates
+    private relayFrames: boolean = false;
     private readonly hooks: { onDisconnect?: () => void; onError?: (error: unknown) => void };
 
     constructor(updatePlayer: (id: string, snapshot: Snapshot | null, stamps: TrailStamp[]) => void, removePlayer: (id: string) => void, hooks: { onDisconnect?: () => void; onError?: (error: unknown) => void } = {}) {
@@ -69,7 +72,7 @@ export default class ServerConnection {
             this.ScoreState = root.lookupType("ScoreState");
             this.TrailStamp = root.lookupType("TrailStamp");
             this.SparkBurst = root.lookupType("SparkBurst");
-            this.messageDecoder = new ServerMessageDecoder(this.PlayerState);
+            this.messageDecoder = new ServerMessageDecoder(this.PlayerState, root.lookupType("RelayFrame"));
         });
         
         this.stageRegistry = buildDefaultStageRegistry();
@@ -105,7 +108,9 @@ export default class ServerConnection {
             this.sessionId = sessionId;
             this.socketId = sessionId; // Use sessionId as socketId
 
-            this.ws = new WebSocket(socketUrl);
+            // Ask for one RelayFrame per server tick instead of one message per player update
+            this.relayFrames = false;
+            this.ws = new WebSocket(`${socketUrl}?frames=1`);
             this.ws.binaryType = 'arraybuffer';
 
             this.ws.onopen = () => {
@@ -115,6 +120,7 @@ export default class ServerConnection {
 
             this.ws.onclose = () => {
                 this.connected = false;
+                this.relayFrames = false;
                 this.sequenceGate.reset();
                 this.timeSync.reset();
                 this.hooks.onDisconnect?.();
@@ -127,51 +133,70 @@ export default class ServerConnection {
             };
 
             this.ws.onmessage = (event) => {
+                if (event.data === RELAY_FRAMES_ACK) {
+                    this.relayFrames = true;
+                    return;
+                }
                 if (!(event.data instanceof ArrayBuffer) || !this.messageDecoder) {
                     return;
                 }
 
-                const playerState: PlayerStateMessage = this.messageDecoder.decode(event.data);
-
-                if (!this.sequenceGate.shouldAccept(playerState.id, playerState.seq)) {
+                // Servers that ignore ?frames=1 keep sending single PlayerStates
+                let states: PlayerStateMessage[];
+                try {
+                    states = this.relayFrames
+                        ? this.messageDecoder.decodeFrame(event.data)
+                        : [this.messageDecoder.decode(event.data)];
+                } catch (error) {
+                    console.error('Error decoding server message:', error);
+                    // Drop the message, keep the connection
                     return;
                 }
-
-                if (playerState.tServerMs) {
-                    this.timeSync.sample(playerState.tServerMs);
+                for (const playerState of states) {
+                    this.handlePlayerState(playerState);
                 }
+            };
+        });
+    }
+
+    private handlePlayerState(playerState: PlayerStateMessage): void {
+        if (!this.sequenceGate.shouldAccept(playerState.id, playerState.seq)) {
+            return;
+        }
 
-                const { snapshot, trailStamps, bursts } = translatePlayerState(playerState);
-
-                if (this.particleSystem && bursts.length > 0) {
-                    const stageResolver = (stageId: string): SparkStageConfig | SmokeStageConfig | null => {
-                        const sparkStage = this.sparkStages.find((s) => s.id === stageId);
-                        if (sparkStage) {
-                            return sparkStage;
-                        }
-                        const smokeStage = this.smokeStages.find((s) => s.id === stageId);
-                        if (smokeStage) {
-                            return smokeStage;
-                        }
-                        return null;
-                    };
-
-                    const playerForColor = {
-                        score: {
-                            frameScore: snapshot.score.frameScore,
-                            driftScore: snapshot.score.driftScore,
-                            highScore: snapshot.score.highScore,
-                        },
-                    };
-
-                    for (const burst of bursts) {
-                        this.particleSystem.spawnFromBurst(burst, stageResolver, playerForColor, playerState.id);
-                    }
+        if (playerState.tServerMs) {
+            this.timeSync.sample(playerState.tServerMs);
+        }
+
+        const { snapshot, trailStamps, bursts } = translatePlayerState(playerState);
+
+        if (this.particleSystem && bursts.length > 0) {
+            const stageResolver = (stageId: string): SparkStageConfig | SmokeStageConfig | null => {
+                const sparkStage = this.sparkStages.find((s) => s.id === stageId);
+                if (sparkStage) {
+                    return sparkStage;
                 }
+                const smokeStage = this.smokeStages.find((s) => s.id === stageId);
+                if (smokeStage) {
+                    return smokeStage;
+                }
+                return null;
+            };
 
-                this.updateLocalPlayer(playerState.id, snapshot, trailStamps);
+            const playerForColor = {
+                score: {
+                    frameScore: snapshot.score.frameScore,
+                    driftScore: snapshot.score.driftScore,
+                    highScore: snapshot.score.highScore,
+                },
             };
-        });
+
+            for (const burst of bursts) {
+                this.particleSystem.spawnFromBurst(burst, stageResolver, playerForColor, playerState.id);
+            }
+        }
+
+        this.updateLocalPlayer(playerState.id, snapshot, trailStamps);
     }
 
     sendUpdate(player: Player) {
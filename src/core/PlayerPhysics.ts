@@ -0,0 +1,123 @@
+import Player from "../components/Player/Player";
+import Track from "../components/Playfield/Track";
+import Vector from "../utils/Vector";
+import { PlayerManager, LapTimingResult } from "../players/PlayerManager";
+
+export interface PlayerStepResult {
+    lapRes: LapTimingResult | null;
+    collision: boolean;
+}
+
+export type LapTimingFn = (
+    prevPos: { x: number; y: number },
+    curPos: { x: number; y: number },
+    nowMs: number
+) => LapTimingResult | null;
+
+/**
+ * Advance the local player by one fixed step: boost, car physics, scoring,
+ * lap timing, drift bookkeeping and wall collision response. Shared by the
+ * browser Game and the headless simulation so both produce identical results.
+ */
+export function stepLocalPlayer(
+    playerManager: PlayerManager,
+    track: Track,
+    localPlayer: Player,
+    compatKeys: Record<string, boolean>,
+    boostDown: boolean,
+    stepMs: number,
+    trackName: string
+): PlayerStepResult {
+    return stepPlayer(
+        track,
+        localPlayer,
+        compatKeys,
+        boostDown,
+        stepMs,
+        (prev, cur, nowMs) => playerManager.updateLapTiming(prev, cur, nowMs, trackName)
+    );
+}
+
+/** Same step for any player; lap timing is delegated so extra AI cars can use their own counters. */
+export function stepPlayer(
+    track: Track,
+    player: Player,
+    compatKeys: Record<string, boolean>,
+    boostDown: boolean,
+    stepMs: number,
+    updateLapTiming: LapTimingFn
+): PlayerStepResult {
+    // Capture previous position before physics update
+    const prevPosForLap = { x: player.car.position.x, y: player.car.position.y };
+
+    // Update boost system
+    player.updateBoost(stepMs, boostDown);
+
+    // Update player physics
+    player.car.update(compatKeys, stepMs);
+    player.car.interpolatePosition();
+    player.score.update(player.car.velocity, player.car.angle);
+
+    // Capture current position after physics update and update lap timing
+    const curPosForLap = { x: player.car.position.x, y: player.car.position.y };
+    const lapRes = updateLapTiming(prevPosForLap, curPosForLap, Date.now());
+
+    // Store current position for any other consumers
+    player.lastPos = curPosForLap;
+
+    const now = performance.now();
+    if (player.car.isDrifting) {
+        player.lastDriftTime = now;
+    } else {
+        player.score.curveScore = 0;
+        if (now - player.lastDriftTime > 4000 && player.score.driftScore > 0) {
+            player.score.endDrift();
+        }
+    }
+
+    // Check for collisions
+    const wallHit = track.getWallHit(player.car);
+    if (wallHit !== null) {
+        player.car.velocity = player.car.velocity.mult(0.99);
+        const pushBack = wallHit.normalVector.mult(Math.abs(player.car.carType.dimensions.length / 2 - wallHit.distance) * .4);
+        player.car.position = player.car.position.add(pushBack.mult(4));
+        player.car.velocity = player.car.velocity.add(pushBack);
+        player.score.endDrift()
+    }
+
+    return { lapRes, collision: wallHit !== null };
+}
+
+/**
+ * Car-to-car contact for locally simulated cars, treating each car as a circle
+ * like the wall check does. Overlapping pairs are pushed apart along the line
+ * between their centres. Returns a hit flag per player (same order).
+ */
+export function resolveCarCollisions(players: Player[]): boolean[] {
+    const hits = players.map(() => false);
+    for (let i = 0; i < players.length; i++) {
+        for (let j = i + 1; j < players.length; j++) {
+            const a = players[i].car;
+            const b = players[j].car;
+            const minDist = (a.carType.dimensions.length + b.carType.dimensions.length) / 2;
+            const dx = b.position.x - a.position.x;
+            const dy = b.position.y - a.position.y;
+            const dist = Math.sqrt(dx * dx + dy * dy);
+            if (dist >= minDist) {
+                continue;
+            }
+
+            const normal = dist > 1e-6 ? new Vector(dx / dist, dy / dist) : new Vector(1, 0);
+            const pushBack = normal.mult((minDist - dist) * 0.5);
+            a.position = a.position.sub(pushBack);
+            b.position = b.position.add(pushBack);
+            a.velocity = a.velocity.mult(0.99).sub(pushBack.mult(0.4));
+            b.velocity = b.velocity.mult(0.99).add(pushBack.mult(0.4));
+            players[i].score.endDrift();
+            players[j].score.endDrift();
+            hits[i] = true;
+            hits[j] = true;
+        }
+    }
+    return hits;
+}
@@ -28,8 +28,7 @@ export class PlayModeController {
     public applyTrack(trackName: string, trackCtx: CanvasRenderingContext2D): void {
         try {
             const trackData = TrackData.getByName(trackName);
-            this.track.setBounds(trackData.bounds, trackCtx);
-            this.track.computeCheckpoints(10);
+            this.track.setBounds(trackData.bounds, trackCtx, TrackData.getPrecomputed(trackName));
         } catch (error) {
             console.warn(`Track not found: ${trackName}. Falling back to default track.`);
             
@@ -0,0 +1,228 @@
+/**
+ * Relay logic of the multiplayer server (server.ts), kept free of ws/express so
+ * it can be tested with fake sockets. Incoming PlayerStates are stamped and
+ * either forwarded at once (immediate mode) or coalesced per tick (tick mode),
+ * with optional interest management by distance.
+ */
+import {
+  concatBytes,
+  encodeRelayFrame,
+  extractDeltaFields,
+  isWellFormedPlayerState,
+  peekCarPosition,
+  stampPlayerState
+} from "./RelayWire";
+
+// WebSocket readyState
+const OPEN = 1;
+
+export interface RelaySocket {
+  readonly readyState: number;
+  readonly bufferedAmount: number;
+  send(data: Uint8Array): void;
+}
+
+export interface RelayOptions {
+  /** 'tick': batch every update of a tick into one send per client; 'immediate': forward as they arrive */
+  mode: 'tick' | 'immediate';
+  /** > 0: players farther apart only get each other every farEveryTicks ticks */
+  interestRadius: number;
+  farEveryTicks: number;
+  /** Updates kept per player per tick (oldest dropped beyond this) */
+  maxPending: number;
+  /** Skip a client's tick while its socket buffer is above this */
+  maxBufferedBytes: number;
+}
+
+export const DEFAULT_RELAY_OPTIONS: RelayOptions = {
+  mode: 'tick',
+  interestRadius: 0,
+  farEveryTicks: 10,
+  maxPending: 8,
+  maxBufferedBytes: 1 << 20
+};
+
+export interface RelayStats {
+  messagesIn: number;
+  /** Malformed payloads dropped before stamping */
+  rejected: number;
+  sendsOut: number;
+  statesOut: number;
+  droppedPending: number;
+  droppedSlow: number;
+  deferredStates: number;
+  ticks: number;
+}
+
+interface RelayClient {
+  seq: number;
+  frames: boolean;
+  pos: { x: number; y: number } | null;
+  pending: Uint8Array[];
+  /** Stamps/bursts of senders skipped by interest management, sent ahead of their next state */
+  deferred: Map<RelayClient, Uint8Array[]>;
+}
+
+export class Relay {
+  readonly options: RelayOptions;
+  readonly stats: RelayStats = {
+    messagesIn: 0,
+    rejected: 0,
+    sendsOut: 0,
+    statesOut: 0,
+    droppedPending: 0,
+    droppedSlow: 0,
+    deferredStates: 0,
+    ticks: 0
+  };
+  private readonly clients = new Map<RelaySocket, RelayClient>();
+  private tick = 0;
+
+  constructor(options: Partial<RelayOptions> = {}) {
+    this.options = { ...DEFAULT_RELAY_OPTIONS, ...options };
+    this.options.farEveryTicks = Math.max(1, this.options.farEveryTicks);
+    this.options.maxPending = Math.max(1, this.options.maxPending);
+  }
+
+  get size(): number {
+    return this.clients.size;
+  }
+
+  addClient(socket: RelaySocket, frames: boolean): void {
+    this.clients.set(socket, { seq: 0, frames, pos: null, pending: [], deferred: new Map() });
+  }
+
+  removeClient(socket: RelaySocket): void {
+    const client = this.clients.get(socket);
+    if (!client) return;
+    this.clients.delete(socket);
+    for (const receiver of this.clients.values()) {
+      receiver.deferred.delete(client);
+    }
+  }
+
+  /**
+   * Stamp an incoming PlayerState with server time and sequence and queue or
+   * forward it. Malformed payloads are dropped (null): one bad state would
+   * otherwise break the decode of every frame it is batched into.
+   */
+  onMessage(socket: RelaySocket, payload: Uint8Array, tServerMs: number): Uint8Array | null {
+    const client = this.clients.get(socket);
+    if (!client) return null;
+
+    this.stats.messagesIn++;
+    if (!isWellFormedPlayerState(payload)) {
+      this.stats.rejected++;
+      return null;
+    }
+    client.seq++;
+    // Appended fields, no decode/re-encode
+    const stamped = stampPlayerState(payload, tServerMs, client.seq);
+
+    if (this.options.interestRadius > 0) {
+      client.pos = peekCarPosition(payload) || client.pos;
+    }
+
+    if (this.options.mode === 'immediate') {
+      for (const [other, receiver] of this.clients) {
+        if (other.readyState === OPEN && this.isInterested(receiver, client)) {
+          this.sendStates(other, receiver, [stamped]);
+        }
+      }
+      return stamped;
+    }
+
+    client.pending.push(stamped);
+    if (client.pending.length > this.options.maxPending) {
+      client.pending.shift();
+      this.stats.droppedPending++;
+    }
+    return stamped;
+  }
+
+  flushTick(): void {
+    this.tick++;
+    this.stats.ticks++;
+    const senders: RelayClient[] = [];
+    for (const client of this.clients.values()) {
+      if (client.pending.length > 0) senders.push(client);
+    }
+    if (senders.length === 0) {
+      return;
+    }
+
+    for (const [socket, receiver] of this.clients) {
+      if (socket.readyState !== OPEN) continue;
+      const states: Uint8Array[] = [];
+      for (const sender of senders) {
+        if (this.isInterested(receiver, sender)) {
+          states.push(...this.withDeferred(receiver, sender));
+        } else {
+          this.defer(receiver, sender);
+        }
+      }
+      if (states.length > 0) {
+        this.sendStates(socket, receiver, states);
+      }
+    }
+
+    for (const sender of senders) {
+      sender.pending = [];
+    }
+  }
+
+  // Far-away players still get each other every farEveryTicks ticks so nobody goes stale
+  private isInterested(receiver: RelayClient, sender: RelayClient): boolean {
+    const radius = this.options.interestRadius;
+    if (radius <= 0 || receiver === sender || !receiver.pos || !sender.pos) {
+      return true;
+    }
+    const dx = receiver.pos.x - sender.pos.x;
+    const dy = receiver.pos.y - sender.pos.y;
+    return dx * dx + dy * dy <= radius * radius || this.tick % this.options.farEveryTicks === 0;
+  }
+
+  // Skipped states: keep only their deltas; car/score fields are superseded by the next state
+  private defer(receiver: RelayClient, sender: RelayClient): void {
+    let deltas = receiver.deferred.get(sender);
+    for (const state of sender.pending) {
+      this.stats.deferredStates++;
+      const fields = extractDeltaFields(state);
+      if (fields.length === 0) continue;
+      if (!deltas) {
+        deltas = [];
+        receiver.deferred.set(sender, deltas);
+      }
+      deltas.push(fields);
+    }
+  }
+
+  // Repeated fields concatenate when decoding, so deferred deltas ride on the oldest pending state
+  private withDeferred(receiver: RelayClient, sender: RelayClient): Uint8Array[] {
+    const deltas = receiver.deferred.get(sender);
+    if (!deltas) {
+      return sender.pending;
+    }
+    receiver.deferred.delete(sender);
+    return [concatBytes([...deltas, sender.pending[0]]), ...sender.pending.slice(1)];
+  }
+
+  private sendStates(socket: RelaySocket, client: RelayClient, states: Uint8Array[]): void {
+    if (socket.bufferedAmount > this.options.maxBufferedBytes) {
+      this.stats.droppedSlow += states.length;
+      return;
+    }
+    if (client.frames) {
+      socket.send(encodeRelayFrame(states));
+      this.stats.sendsOut++;
+    } else {
+      for (const state of states) {
+        socket.send(state);
+      }
+      this.stats.sendsOut += states.length;
+    }
+    this.stats.statesOut += states.length;
+  }
+}
+
+export default Relay;
@@ -0,0 +1,250 @@
+/**
+ * Protobuf wire-format helpers for the relay in server.ts. They stamp, batch
+ * and peek at encoded PlayerState messages without decoding and re-encoding
+ * them (field numbers follow src/assets/player.proto).
+ */
+
+const WIRE_VARINT = 0;
+const WIRE_FIXED64 = 1;
+const WIRE_LEN = 2;
+const WIRE_FIXED32 = 5;
+
+const PLAYER_STATE_CAR = 4;
+const PLAYER_STATE_STAMPS = 5;
+const PLAYER_STATE_BURSTS = 9;
+const PLAYER_STATE_T_SERVER_MS = 7;
+const PLAYER_STATE_SEQ = 8;
+const CAR_STATE_POSITION = 1;
+const POSITION_X = 1;
+const POSITION_Y = 2;
+const RELAY_FRAME_STATES = 1;
+
+/**
+ * Text message the server sends right after a ?frames=1 connection, before any
+ * state. Clients decode RelayFrames only after seeing it; servers that predate
+ * frames never send it and keep sending single PlayerStates.
+ */
+export const RELAY_FRAMES_ACK = 'relay:frames';
+
+interface FieldRange {
+  start: number;
+  end: number;
+}
+
+function writeVarint(out: number[], value: number): void {
+  let v = value >>> 0;
+  while (v > 0x7f) {
+    out.push((v & 0x7f) | 0x80);
+    v >>>= 7;
+  }
+  out.push(v);
+}
+
+function varintSize(value: number): number {
+  let v = value >>> 0;
+  let size = 1;
+  while (v > 0x7f) {
+    v >>>= 7;
+    size++;
+  }
+  return size;
+}
+
+// Returns [value, next offset]; next is -1 when the varint runs past `end`
+function readVarint(buf: Uint8Array, pos: number, end: number): [number, number] {
+  let value = 0;
+  let scale = 1;
+  while (pos < end) {
+    const byte = buf[pos++];
+    value += (byte & 0x7f) * scale;
+    if (byte < 0x80) {
+      return [value, pos];
+    }
+    scale *= 128;
+  }
+  return [0, -1];
+}
+
+function skipField(buf: Uint8Array, pos: number, end: number, wireType: number): number {
+  switch (wireType) {
+    case WIRE_VARINT:
+      return readVarint(buf, pos, end)[1];
+    case WIRE_FIXED64:
+      return pos + 8 <= end ? pos + 8 : -1;
+    case WIRE_LEN: {
+      const [len, next] = readVarint(buf, pos, end);
+      return next >= 0 && next + len <= end ? next + len : -1;
+    }
+    case WIRE_FIXED32:
+      return pos + 4 <= end ? pos + 4 : -1;
+    default:
+      return -1;
+  }
+}
+
+// Last occurrence of a length-delimited field inside buf[start, end)
+function findLenField(buf: Uint8Array, start: number, end: number, field: number): FieldRange | null {
+  let found: FieldRange | null = null;
+  let pos = start;
+  while (pos < end) {
+    const [tag, afterTag] = readVarint(buf, pos, end);
+    if (afterTag < 0) return null;
+    const wireType = tag & 7;
+    if ((tag >>> 3) === field && wireType === WIRE_LEN) {
+      const [len, next] = readVarint(buf, afterTag, end);
+      if (next < 0 || next + len > end) return null;
+      found = { start: next, end: next + len };
+      pos = next + len;
+      continue;
+    }
+    pos = skipField(buf, afterTag, end, wireType);
+    if (pos < 0) return null;
+  }
+  return found;
+}
+
+/**
+ * Append tServerMs and seq to an encoded PlayerState. The last occurrence of a
+ * scalar field wins when decoding, so this overrides anything the client sent.
+ */
+export function stampPlayerState(payload: Uint8Array, tServerMs: number, seq: number): Uint8Array {
+  const tail: number[] = [];
+  tail.push((PLAYER_STATE_T_SERVER_MS << 3) | WIRE_VARINT);
+  writeVarint(tail, tServerMs);
+  tail.push((PLAYER_STATE_SEQ << 3) | WIRE_VARINT);
+  writeVarint(tail, seq);
+
+  const out = new Uint8Array(payload.length + tail.length);
+  out.set(payload, 0);
+  out.set(tail, payload.length);
+  return out;
+}
+
+/** Encode RelayFrame { repeated PlayerState states = 1 } from already encoded states. */
+export function encodeRelayFrame(states: Uint8Array[]): Uint8Array {
+  const tag = (RELAY_FRAME_STATES << 3) | WIRE_LEN;
+  let size = 0;
+  for (const state of states) {
+    size += 1 + varintSize(state.length) + state.length;
+  }
+
+  const out = new Uint8Array(size);
+  const header: number[] = [];
+  let pos = 0;
+  for (const state of states) {
+    header.length = 0;
+    header.push(tag);
+    writeVarint(header, state.length);
+    out.set(header, pos);
+    pos += header.length;
+    out.set(state, pos);
+    pos += state.length;
+  }
+  return out;
+}
+
+/** car.position of an encoded PlayerState, or null when absent or malformed. */
+export function peekCarPosition(payload: Uint8Array): { x: number; y: number } | null {
+  const car = findLenField(payload, 0, payload.length, PLAYER_STATE_CAR);
+  if (!car) return null;
+  const position = findLenField(payload, car.start, car.end, CAR_STATE_POSITION);
+  if (!position) return null;
+
+  const view = new DataView(payload.buffer, payload.byteOffset, payload.byteLength);
+  let x = 0;
+  let y = 0;
+  let pos = position.start;
+  while (pos < position.end) {
+    const [tag, afterTag] = readVarint(payload, pos, position.end);
+    if (afterTag < 0) return null;
+    const wireType = tag & 7;
+    const field = tag >>> 3;
+    if (wireType === WIRE_FIXED32 && afterTag + 4 <= position.end && (field === POSITION_X || field === POSITION_Y)) {
+      const value = view.getFloat32(afterTag, true);
+      if (field === POSITION_X) x = value;
+      else y = value;
+    }
+    pos = skipField(payload, afterTag, position.end, wireType);
+    if (pos < 0) return null;
+  }
+  return { x, y };
+}
+
+// Wire type of every PlayerState field; a mismatch makes the decoder misread the rest
+const PLAYER_STATE_WIRE_TYPES: { [field: number]: number } = {
+  1: WIRE_LEN,
+  2: WIRE_LEN,
+  3: WIRE_LEN,
+  [PLAYER_STATE_CAR]: WIRE_LEN,
+  [PLAYER_STATE_STAMPS]: WIRE_LEN,
+  6: WIRE_VARINT,
+  [PLAYER_STATE_T_SERVER_MS]: WIRE_VARINT,
+  [PLAYER_STATE_SEQ]: WIRE_VARINT,
+  [PLAYER_STATE_BURSTS]: WIRE_LEN
+};
+
+/**
+ * Whether every top-level field of an encoded PlayerState can be walked:
+ * valid tags, known fields with their declared wire type, and no field running
+ * past the end. Truncated or garbage payloads fail this and must not be relayed.
+ */
+export function isWellFormedPlayerState(payload: Uint8Array): boolean {
+  let pos = 0;
+  while (pos < payload.length) {
+    const [tag, afterTag] = readVarint(payload, pos, payload.length);
+    if (afterTag < 0) return false;
+    const wireType = tag & 7;
+    const field = tag >>> 3;
+    if (field === 0) return false;
+    const expected = PLAYER_STATE_WIRE_TYPES[field];
+    if (expected !== undefined && expected !== wireType) return false;
+    pos = skipField(payload, afterTag, payload.length, wireType);
+    if (pos < 0) return false;
+  }
+  return true;
+}
+
+/**
+ * Raw bytes (tag included) of the trail stamps and spark bursts of an encoded
+ * PlayerState. These are per-update deltas; prepended to a later state they
+ * decode as part of its repeated fields. Empty when there are none or the
+ * payload is malformed.
+ */
+export function extractDeltaFields(payload: Uint8Array): Uint8Array {
+  const ranges: FieldRange[] = [];
+  let size = 0;
+  let pos = 0;
+  while (pos < payload.length) {
+    const start = pos;
+    const [tag, afterTag] = readVarint(payload, pos, payload.length);
+    if (afterTag < 0) return new Uint8Array(0);
+    const wireType = tag & 7;
+    const field = tag >>> 3;
+    pos = skipField(payload, afterTag, payload.length, wireType);
+    if (pos < 0) return new Uint8Array(0);
+    if (wireType === WIRE_LEN && (field === PLAYER_STATE_STAMPS || field === PLAYER_STATE_BURSTS)) {
+      ranges.push({ start, end: pos });
+      size += pos - start;
+    }
+  }
+
+  const out = new Uint8Array(size);
+  let at = 0;
+  for (const range of ranges) {
+    out.set(payload.subarray(range.start, range.end), at);
+    at += range.end - range.start;
+  }
+  return out;
+}
+
+export function concatBytes(parts: Uint8Array[]): Uint8Array {
+  let size = 0;
+  for (const part of parts) size += part.length;
+  const out = new Uint8Array(size);
+  let pos = 0;
+  for (const part of parts) {
+    out.set(part, pos);
+    pos += part.length;
+  }
+  return out;
+}
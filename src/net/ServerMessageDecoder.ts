@@ -21,17 +21,26 @@ export interface PlayerStateMessage {
   bursts?: any[];
 }
 
+const TO_OBJECT_OPTIONS = {
+  longs: String,
+  enums: String,
+  bytes: String,
+};
+
 export class ServerMessageDecoder {
-  constructor(private readonly PlayerState: any) {}
+  constructor(private readonly PlayerState: any, private readonly RelayFrame: any = null) {}
 
   decode(buffer: ArrayBuffer | Uint8Array): PlayerStateMessage {
     const payload = buffer instanceof Uint8Array ? buffer : new Uint8Array(buffer);
     const message = this.PlayerState.decode(payload);
-    return this.PlayerState.toObject(message, {
-      longs: String,
-      enums: String,
-      bytes: String,
-    }) as PlayerStateMessage;
+    return this.PlayerState.toObject(message, TO_OBJECT_OPTIONS) as PlayerStateMessage;
+  }
+
+  /** States of one relay tick (RelayFrame), in the order the server batched them. */
+  decodeFrame(buffer: ArrayBuffer | Uint8Array): PlayerStateMessage[] {
+    const payload = buffer instanceof Uint8Array ? buffer : new Uint8Array(buffer);
+    const frame = this.RelayFrame.toObject(this.RelayFrame.decode(payload), TO_OBJECT_OPTIONS);
+    return (frame.states ?? []) as PlayerStateMessage[];
   }
 }
 
@@ -0,0 +1,139 @@
+import { Snapshot } from "./SnapshotBuffer";
+
+/** Throttled pose and telemetry a training env attaches to its step results. */
+export interface SpectatorFrame {
+    env?: number;
+    x: number;
+    y: number;
+    angle: number;
+    vx: number;
+    vy: number;
+    drifting: boolean;
+    frameScore: number;
+    driftScore: number;
+    episode: number;
+    step: number;
+    totalReward: number;
+    collisions: number;
+    lapMs: number | null;
+    lastLapMs: number | null;
+    bestLapMs: number | null;
+}
+
+export interface SpectatorClientCallbacks {
+    onFrame: (id: string, snapshot: Snapshot, frame: SpectatorFrame) => void;
+    onRemove: (id: string) => void;
+}
+
+/**
+ * Read-only subscriber to the PPO server's spectator stream. Each training env
+ * becomes a ghost id (`ghost_<env>`); snapshots are stamped with the local
+ * receive time so they can be interpolated like remote players.
+ */
+export class SpectatorClient {
+    private static readonly STALE_MS = 5000;
+    private static readonly RECONNECT_MS = 2000;
+
+    private ws: WebSocket | null = null;
+    private callbacks: SpectatorClientCallbacks;
+    private frames: Map<string, SpectatorFrame> = new Map();
+    private lastSeenMs: Map<string, number> = new Map();
+    private pruneInterval: ReturnType<typeof setInterval> | null = null;
+    private closed: boolean = false;
+
+    constructor(callbacks: SpectatorClientCallbacks) {
+        this.callbacks = callbacks;
+    }
+
+    connect(url: string = 'ws://127.0.0.1:8766'): void {
+        this.closed = false;
+        this.ws = new WebSocket(url);
+
+        this.ws.onopen = () => {
+            console.log('SpectatorClient: connected to', url);
+        };
+
+        this.ws.onmessage = (event) => {
+            try {
+                this.handleFrame(JSON.parse(event.data));
+            } catch (error) {
+                console.error('SpectatorClient: failed to parse frame', error);
+            }
+        };
+
+        this.ws.onclose = () => {
+            this.ws = null;
+            if (!this.closed) {
+                // Training may not be running yet; keep trying quietly
+                setTimeout(() => this.connect(url), SpectatorClient.RECONNECT_MS);
+            }
+        };
+
+        this.startPruning();
+    }
+
+    disconnect(): void {
+        this.closed = true;
+        if (this.ws) {
+            this.ws.close();
+            this.ws = null;
+        }
+        if (this.pruneInterval) {
+            clearInterval(this.pruneInterval);
+            this.pruneInterval = null;
+        }
+    }
+
+    protected startPruning(): void {
+        if (!this.pruneInterval) {
+            this.pruneInterval = setInterval(() => this.pruneStale(performance.now()), 1000);
+        }
+    }
+
+    isConnected(): boolean {
+        return !!this.ws && this.ws.readyState === WebSocket.OPEN;
+    }
+
+    getGhostIds(): string[] {
+        return Array.from(this.frames.keys()).sort();
+    }
+
+    getFrame(id: string): SpectatorFrame | null {
+        return this.frames.get(id) ?? null;
+    }
+
+    protected handleFrame(frame: SpectatorFrame): void {
+        const id = `ghost_${frame.env ?? 0}`;
+        const nowMs = performance.now();
+        this.frames.set(id, frame);
+        this.lastSeenMs.set(id, nowMs);
+
+        const snapshot: Snapshot = {
+            tMs: nowMs,
+            x: frame.x,
+            y: frame.y,
+            vx: frame.vx,
+            vy: frame.vy,
+            angle: frame.angle,
+            angVel: 0,
+            drifting: frame.drifting,
+            name: `env ${frame.env ?? 0}`,
+            score: {
+                frameScore: frame.frameScore,
+                driftScore: frame.driftScore,
+                highScore: 0
+            }
+        };
+        this.callbacks.onFrame(id, snapshot, frame);
+    }
+
+    private pruneStale(nowMs: number): void {
+        for (const [id, seenMs] of this.lastSeenMs) {
+            if (nowMs - seenMs > SpectatorClient.STALE_MS) {
+                this.lastSeenMs.delete(id);
+                this.frames.delete(id);
+                this.callbacks.onRemove(id);
+            }
+        }
+    }
+}
@@ -0,0 +1,191 @@
+import { describe, expect, it } from '@jest/globals';
+import * as path from 'path';
+import * as protobuf from 'protobufjs';
+import { Relay, RelaySocket } from '../Relay';
+
+const root = protobuf.loadSync(path.resolve(__dirname, '..', '..', 'assets', 'player.proto'));
+const PlayerState = root.lookupType('PlayerState');
+const RelayFrame = root.lookupType('RelayFrame');
+
+class FakeSocket implements RelaySocket {
+  readyState = 1;
+  bufferedAmount = 0;
+  sent: Uint8Array[] = [];
+
+  send(data: Uint8Array): void {
+    this.sent.push(data);
+  }
+
+  frames(): any[][] {
+    return this.sent.map(data => (RelayFrame.toObject(RelayFrame.decode(data)) as any).states);
+  }
+}
+
+function encodeState(id: string, x: number, tMs: number, stamps = 0): Uint8Array {
+  return PlayerState.encode(PlayerState.create({
+    id,
+    car: { position: { x, y: 0 } },
+    stamps: Array.from({ length: stamps }, (_, i) => ({ x, y: 0, tMs: tMs * 10 + i })),
+    tMs
+  })).finish();
+}
+
+function allStates(socket: FakeSocket): any[] {
+  return ([] as any[]).concat(...socket.frames());
+}
+
+function setup(options = {}) {
+  const relay = new Relay({ mode: 'tick', ...options });
+  const a = new FakeSocket();
+  const b = new FakeSocket();
+  relay.addClient(a, true);
+  relay.addClient(b, true);
+  return { relay, a, b };
+}
+
+describe('Relay', () => {
+  it('coalesces a tick of updates into one frame per client', () => {
+    const { relay, a, b } = setup();
+    relay.onMessage(a, encodeState('a', 0, 1), 100);
+    relay.onMessage(a, encodeState('a', 0, 2), 101);
+    relay.onMessage(b, encodeState('b', 0, 3), 102);
+
+    expect(a.sent).toHaveLength(0);
+    relay.flushTick();
+
+    const [frame] = b.frames();
+    expect(b.sent).toHaveLength(1);
+    expect(frame.map((s: any) => [s.id, s.seq, s.tServerMs])).toEqual([['a', 1, 100], ['a', 2, 101], ['b', 1, 102]]);
+    expect(relay.stats).toMatchObject({ messagesIn: 3, sendsOut: 2, statesOut: 6, ticks: 1 });
+
+    // Nothing pending: nothing sent
+    relay.flushTick();
+    expect(b.sent).toHaveLength(1);
+  });
+
+  it('sends single states to clients without frames', () => {
+    const relay = new Relay({ mode: 'tick' });
+    const legacy = new FakeSocket();
+    relay.addClient(legacy, false);
+    relay.onMessage(legacy, encodeState('a', 0, 1), 100);
+    relay.onMessage(legacy, encodeState('a', 0, 2), 101);
+    relay.flushTick();
+
+    expect(legacy.sent.map(data => (PlayerState.decode(data) as any).seq)).toEqual([1, 2]);
+  });
+
+  it('forwards at once in immediate mode', () => {
+    const { relay, a, b } = setup({ mode: 'immediate' });
+    relay.onMessage(a, encodeState('a', 0, 1), 100);
+
+    expect(a.sent).toHaveLength(1);
+    expect(b.frames()[0][0].id).toBe('a');
+  });
+
+  it('drops the oldest updates beyond maxPending', () => {
+    const { relay, a, b } = setup({ maxPending: 3 });
+    for (let t = 1; t <= 5; t++) {
+      relay.onMessage(a, encodeState('a', 0, t), 100 + t);
+    }
+    relay.flushTick();
+
+    expect(b.frames()[0].map((s: any) => s.tMs)).toEqual([3, 4, 5]);
+    expect(relay.stats.droppedPending).toBe(2);
+  });
+
+  it('skips a client whose socket buffer is full', () => {
+    const { relay, a, b } = setup({ maxBufferedBytes: 100 });
+    b.bufferedAmount = 1000;
+    relay.onMessage(a, encodeState('a', 0, 1), 100);
+    relay.flushTick();
+
+    expect(b.sent).toHaveLength(0);
+    expect(a.sent).toHaveLength(1);
+    expect(relay.stats.droppedSlow).toBe(1);
+  });
+
+  it('sends far players every farEveryTicks ticks, near players every tick', () => {
+    const { relay, a, b } = setup({ interestRadius: 500, farEveryTicks: 3 });
+    const near = new FakeSocket();
+    relay.addClient(near, true);
+
+    const received: string[][] = [];
+    for (let tick = 1; tick <= 6; tick++) {
+      relay.onMessage(a, encodeState('a', 0, tick), tick);
+      relay.onMessage(b, encodeState('b', 10_000, tick), tick);
+      relay.onMessage(near, encodeState('near', 100, tick), tick);
+      const before = b.sent.length;
+      relay.flushTick();
+      received.push(b.sent.length > before ? b.frames()[before].map((s: any) => s.id) : []);
+    }
+
+    // b is far from a and near; it always gets itself and gets the others on ticks 3 and 6
+    expect(received).toEqual([
+      ['b'], ['b'], ['a', 'b', 'near'], ['b'], ['b'], ['a', 'b', 'near']
+    ]);
+    expect(a.frames().every(frame => frame.some((s: any) => s.id === 'near'))).toBe(true);
+  });
+
+  it('delivers stamps of skipped updates with the next far update', () => {
+    const { relay, a, b } = setup({ interestRadius: 500, farEveryTicks: 3 });
+    relay.onMessage(b, encodeState('b', 10_000, 0), 0);
+
+    for (let tick = 1; tick <= 3; tick++) {
+      relay.onMessage(a, encodeState('a', tick, tick, 2), tick);
+      relay.flushTick();
+    }
+
+    const fromA = allStates(b).filter((s: any) => s.id === 'a');
+    expect(fromA).toHaveLength(1);
+    // Latest car state and stamp time order of all three updates
+    expect(fromA[0].tMs).toBe(3);
+    expect(fromA[0].seq).toBe(3);
+    expect(fromA[0].car.position.x).toBe(3);
+    expect(fromA[0].stamps.map((s: any) => s.tMs)).toEqual([10, 11, 20, 21, 30, 31]);
+    // a's two skipped updates for b, and b's first one for a
+    expect(relay.stats.deferredStates).toBe(3);
+
+    // Deltas are sent once
+    for (let tick = 4; tick <= 6; tick++) {
+      relay.onMessage(a, encodeState('a', tick, tick), tick);
+      relay.flushTick();
+    }
+    const later = allStates(b).filter((s: any) => s.id === 'a');
+    expect(later).toHaveLength(2);
+    expect(later[1].stamps ?? []).toEqual([]);
+  });
+
+  it('forgets deferred stamps of a client that leaves', () => {
+    const { relay, a, b } = setup({ interestRadius: 500, farEveryTicks: 3 });
+    relay.onMessage(b, encodeState('b', 10_000, 0), 0);
+    relay.onMessage(a, encodeState('a', 0, 1, 2), 1);
+    relay.flushTick();
+    relay.removeClient(a);
+    relay.flushTick();
+    relay.flushTick();
+
+    expect(relay.size).toBe(1);
+    expect(allStates(b).some((s: any) => s.id === 'a')).toBe(false);
+    expect(relay.onMessage(a, encodeState('a', 0, 2), 2)).toBeNull();
+  });
+
+  it('drops malformed payloads instead of forwarding them', () => {
+    const { relay, a, b } = setup();
+    const garbage = new Uint8Array([0x22, 0x40, 0x01]);
+    const truncated = encodeState('a', 0, 1, 2).subarray(0, 10);
+
+    expect(relay.onMessage(a, garbage, 100)).toBeNull();
+    expect(relay.onMessage(a, truncated, 101)).toBeNull();
+    relay.onMessage(b, encodeState('b', 0, 2), 102);
+    relay.flushTick();
+
+    // Frames still decode and only carry the good state; a's seq is untouched
+    expect(a.frames()).toEqual([[expect.objectContaining({ id: 'b', seq: 1 })]]);
+    expect(b.frames().map(frame => frame.map((s: any) => s.id))).toEqual([['b']]);
+    expect(relay.stats).toMatchObject({ messagesIn: 3, rejected: 2, statesOut: 2 });
+
+    relay.onMessage(a, encodeState('a', 0, 3), 103);
+    relay.flushTick();
+    expect(b.frames()[1][0]).toMatchObject({ id: 'a', seq: 1 });
+  });
+});
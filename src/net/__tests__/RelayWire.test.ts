@@ -0,0 +1,101 @@
+import { describe, expect, it } from '@jest/globals';
+import * as path from 'path';
+import * as protobuf from 'protobufjs';
+import {
+  concatBytes,
+  encodeRelayFrame,
+  extractDeltaFields,
+  isWellFormedPlayerState,
+  peekCarPosition,
+  stampPlayerState
+} from '../RelayWire';
+
+const root = protobuf.loadSync(path.resolve(__dirname, '..', '..', 'assets', 'player.proto'));
+const PlayerState = root.lookupType('PlayerState');
+const RelayFrame = root.lookupType('RelayFrame');
+
+function encodeState(fields: Record<string, unknown>): Uint8Array {
+  return PlayerState.encode(PlayerState.create(fields)).finish();
+}
+
+const baseState = {
+  id: 'player-1',
+  name: 'Player',
+  car: { position: { x: 1234.5, y: -42.25 }, angle: 1.5, vx: 3, vy: 4, drifting: true },
+  score: { frameScore: 1, driftScore: 2, highScore: 3 },
+  stamps: [{ x: 1, y: 2, angle: 0.5, weight: 1, tMs: 100 }],
+  tMs: 123456,
+};
+
+describe('RelayWire', () => {
+  it('stamps tServerMs and seq without touching the other fields', () => {
+    const stamped = stampPlayerState(encodeState(baseState), 987654321, 42);
+    const decoded: any = PlayerState.toObject(PlayerState.decode(stamped));
+
+    expect(decoded.tServerMs).toBe(987654321);
+    expect(decoded.seq).toBe(42);
+    expect(decoded.id).toBe('player-1');
+    expect(decoded.tMs).toBe(123456);
+    expect(decoded.stamps).toHaveLength(1);
+  });
+
+  it('overrides stamps the client already set', () => {
+    const stamped = stampPlayerState(encodeState({ ...baseState, tServerMs: 5, seq: 7 }), 10, 8);
+    const decoded: any = PlayerState.toObject(PlayerState.decode(stamped));
+
+    expect(decoded.tServerMs).toBe(10);
+    expect(decoded.seq).toBe(8);
+  });
+
+  it('batches encoded states into a RelayFrame', () => {
+    const a = stampPlayerState(encodeState(baseState), 1, 1);
+    const b = stampPlayerState(encodeState({ ...baseState, id: 'player-2' }), 2, 1);
+    const frame: any = RelayFrame.toObject(RelayFrame.decode(encodeRelayFrame([a, b])));
+
+    expect(frame.states.map((s: any) => s.id)).toEqual(['player-1', 'player-2']);
+    expect(frame.states[1].tServerMs).toBe(2);
+  });
+
+  it('peeks at the car position', () => {
+    const pos = peekCarPosition(encodeState(baseState));
+
+    expect(pos!.x).toBeCloseTo(1234.5);
+    expect(pos!.y).toBeCloseTo(-42.25);
+    expect(peekCarPosition(encodeState({ id: 'no-car' }))).toBeNull();
+    expect(peekCarPosition(new Uint8Array([0x22, 0x40]))).toBeNull();
+  });
+
+  it('carries stamps and bursts of a skipped state over to a later one', () => {
+    const skipped = encodeState({
+      ...baseState,
+      car: { position: { x: 1, y: 1 } },
+      bursts: [{ x: 1, y: 1, stageId: 'sparks', tMs: 90 }],
+    });
+    const latest = stampPlayerState(encodeState({ ...baseState, stamps: [{ x: 5, y: 6, tMs: 200 }] }), 10, 3);
+    const decoded: any = PlayerState.toObject(PlayerState.decode(concatBytes([extractDeltaFields(skipped), latest])));
+
+    expect(decoded.stamps.map((s: any) => s.tMs)).toEqual([100, 200]);
+    expect(decoded.bursts.map((b: any) => b.stageId)).toEqual(['sparks']);
+    expect(decoded.car.position.x).toBeCloseTo(1234.5);
+    expect(decoded.seq).toBe(3);
+    expect(extractDeltaFields(encodeState({ id: 'no-deltas' }))).toHaveLength(0);
+    expect(extractDeltaFields(new Uint8Array([0x2a, 0x40]))).toHaveLength(0);
+  });
+
+  it('tells well-formed states from truncated or garbage ones', () => {
+    const state = encodeState({ ...baseState, bursts: [{ x: 1, y: 1, stageId: 'sparks', tMs: 90 }] });
+
+    expect(isWellFormedPlayerState(state)).toBe(true);
+    expect(isWellFormedPlayerState(stampPlayerState(state, 10, 3))).toBe(true);
+    expect(isWellFormedPlayerState(new Uint8Array(0))).toBe(true);
+    // Cut inside a field
+    expect(isWellFormedPlayerState(state.subarray(0, state.length - 3))).toBe(false);
+    // Length running past the end, unfinished varint, field 0, group wire type
+    expect(isWellFormedPlayerState(new Uint8Array([0x22, 0x40]))).toBe(false);
+    expect(isWellFormedPlayerState(new Uint8Array([0x30, 0xff]))).toBe(false);
+    expect(isWellFormedPlayerState(new Uint8Array([0x00, 0x01]))).toBe(false);
+    expect(isWellFormedPlayerState(new Uint8Array([0x0b]))).toBe(false);
+    // car (field 4) sent as a varint
+    expect(isWellFormedPlayerState(new Uint8Array([0x20, 0x05]))).toBe(false);
+  });
+});
@@ -324,6 +324,13 @@ export class ParticleSystem {
         };
     }
 
+    clear(): void {
+        for (const particle of this.particles) {
+            particle.active = false;
+        }
+        this.playerParticleCounts.clear();
+    }
+
     getActiveParticleCount(): number {
         return this.particles.filter(p => p.active).length;
     }
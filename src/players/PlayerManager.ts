@@ -80,6 +80,11 @@ export class PlayerManager {
         }
     }
 
+    /** Register a locally simulated player that is not the local player (e.g. extra AI cars). */
+    addPlayer(player: Player): void {
+        this.players[player.id] = player;
+    }
+
     removePlayer(id: string): void {
         console.log("Remove player", id);
         delete this.players[id];
@@ -0,0 +1,356 @@
+import { Checkpoint, computeCheckpoints } from "./CheckpointGenerator";
+import { Dimensions } from "../utils/Utils";
+
+/**
+ * Binary track pack: every track from tracks.json with its geometry already
+ * compiled (flattened wall segments, checkpoints, bounding box and a uniform
+ * grid over the segments). Built offline by tools/build-track-pack.ts and read
+ * by the game, the headless sim and ai_track_pack.py.
+ *
+ * Layout (little-endian, every array 4-byte aligned so it can be viewed in place):
+ *
+ *   header   magic "PTPK" | u16 version | u16 reserved | u32 trackCount
+ *   track    u32 recordBytes (incl. this field)
+ *            u16 nameBytes | name utf8 | pad4
+ *            u16 backgroundBytes | background utf8 | pad4
+ *            f32 mapWidth, mapHeight (0 = not set) | u32 sourceHash
+ *            f32 minX, minY, maxX, maxY
+ *            u32 ringCount | u32 ringSegmentCount[ringCount]
+ *            u32 segmentCount | f32 segments[segmentCount * 4]     (x0, y0, x1, y1)
+ *            u32 checkpointCount | f32 checkpoints[count * 4]      (ax, ay, bx, by; id = index, 0 = start)
+ *            f32 cellSize, originX, originY | u32 cols, rows
+ *            u32 cellStart[cols * rows + 1] | u32 cellSegments[cellStart[cols * rows]]
+ */
+export const TRACK_PACK_MAGIC = 'PTPK';
+export const TRACK_PACK_VERSION = 1;
+export const TRACK_PACK_CHECKPOINT_STRIDE = 10;
+export const TRACK_PACK_CELL_SIZE = 256;
+
+export interface SegmentGrid {
+    cellSize: number;
+    originX: number;
+    originY: number;
+    cols: number;
+    rows: number;
+    /** Segments of cell c are cellSegments[cellStart[c] .. cellStart[c + 1]) */
+    cellStart: Uint32Array;
+    cellSegments: Uint32Array;
+}
+
+export interface TrackPackEntry {
+    name: string;
+    background: string;
+    mapSize: Dimensions | null;
+    sourceHash: number;
+    bbox: { minX: number; minY: number; maxX: number; maxY: number };
+    ringSegmentCounts: Uint32Array;
+    /** x0, y0, x1, y1 per wall segment, rings in order */
+    segments: Float32Array;
+    checkpoints: Checkpoint[];
+    grid: SegmentGrid;
+}
+
+interface TrackSource {
+    name: string;
+    background?: string;
+    bounds: number[][][];
+    mapSize?: Dimensions;
+}
+
+/** FNV-1a over the float32 bits of the bounds, so stale packs can be detected. */
+export function hashBounds(bounds: number[][][]): number {
+    let hash = 0x811c9dc5;
+    const scratch = new Float32Array(1);
+    const bytes = new Uint8Array(scratch.buffer);
+    const mix = (value: number) => {
+        scratch[0] = value;
+        for (let i = 0; i < 4; i++) {
+            hash ^= bytes[i];
+            hash = Math.imul(hash, 0x01000193);
+        }
+    };
+    for (const ring of bounds) {
+        mix(ring.length);
+        for (const point of ring) {
+            mix(point[0]);
+            mix(point[1]);
+        }
+    }
+    return hash >>> 0;
+}
+
+/** Wall segments as drawn and collided with: consecutive point pairs of each ring. */
+export function flattenSegments(bounds: number[][][]): { segments: Float32Array; ringSegmentCounts: Uint32Array } {
+    const ringSegmentCounts = new Uint32Array(bounds.length);
+    let total = 0;
+    bounds.forEach((ring, r) => {
+        ringSegmentCounts[r] = Math.max(0, ring.length - 1);
+        total += ringSegmentCounts[r];
+    });
+
+    const segments = new Float32Array(total * 4);
+    let o = 0;
+    for (const ring of bounds) {
+        for (let i = 0; i < ring.length - 1; i++) {
+            segments[o++] = ring[i][0];
+            segments[o++] = ring[i][1];
+            segments[o++] = ring[i + 1][0];
+            segments[o++] = ring[i + 1][1];
+        }
+    }
+    return { segments, ringSegmentCounts };
+}
+
+export function segmentsBBox(segments: Float32Array): TrackPackEntry['bbox'] {
+    if (segments.length === 0) {
+        return { minX: 0, minY: 0, maxX: 0, maxY: 0 };
+    }
+    let minX = Infinity, minY = Infinity, maxX = -Infinity, maxY = -Infinity;
+    for (let i = 0; i < segments.length; i += 2) {
+        minX = Math.min(minX, segments[i]);
+        maxX = Math.max(maxX, segments[i]);
+        minY = Math.min(minY, segments[i + 1]);
+        maxY = Math.max(maxY, segments[i + 1]);
+    }
+    return { minX, minY, maxX, maxY };
+}
+
+/** Uniform grid where each segment is listed in every cell its bounding box touches. */
+export function buildSegmentGrid(
+    segments: Float32Array,
+    bbox: TrackPackEntry['bbox'],
+    cellSize: number = TRACK_PACK_CELL_SIZE
+): SegmentGrid {
+    const originX = bbox.minX;
+    const originY = bbox.minY;
+    const cols = Math.max(1, Math.ceil((bbox.maxX - bbox.minX) / cellSize) || 1);
+    const rows = Math.max(1, Math.ceil((bbox.maxY - bbox.minY) / cellSize) || 1);
+    const grid: SegmentGrid = {
+        cellSize, originX, originY, cols, rows,
+        cellStart: new Uint32Array(cols * rows + 1),
+        cellSegments: new Uint32Array(0)
+    };
+
+    const segmentCount = segments.length / 4;
+    const forEachCell = (s: number, visit: (cell: number) => void) => {
+        const o = s * 4;
+        const range = gridCellRange(
+            grid,
+            Math.min(segments[o], segments[o + 2]), Math.min(segments[o + 1], segments[o + 3]),
+            Math.max(segments[o], segments[o + 2]), Math.max(segments[o + 1], segments[o + 3])
+        );
+        if (!range) return;
+        for (let cy = range.cy0; cy <= range.cy1; cy++) {
+            for (let cx = range.cx0; cx <= range.cx1; cx++) {
+                visit(cy * cols + cx);
+            }
+        }
+    };
+
+    // Two passes (count, then fill) into compact CSR arrays
+    const counts = new Uint32Array(cols * rows);
+    for (let s = 0; s < segmentCount; s++) {
+        forEachCell(s, cell => counts[cell]++);
+    }
+    for (let c = 0; c < cols * rows; c++) {
+        grid.cellStart[c + 1] = grid.cellStart[c] + counts[c];
+    }
+    grid.cellSegments = new Uint32Array(grid.cellStart[cols * rows]);
+    const cursor = grid.cellStart.slice(0, cols * rows);
+    for (let s = 0; s < segmentCount; s++) {
+        forEachCell(s, cell => { grid.cellSegments[cursor[cell]++] = s; });
+    }
+    return grid;
+}
+
+/** Inclusive cell range overlapping an axis-aligned box, or null when it misses the grid. */
+export function gridCellRange(
+    grid: SegmentGrid,
+    minX: number, minY: number, maxX: number, maxY: number
+): { cx0: number; cy0: number; cx1: number; cy1: number } | null {
+    const cx0 = Math.max(0, Math.floor((minX - grid.originX) / grid.cellSize));
+    const cy0 = Math.max(0, Math.floor((minY - grid.originY) / grid.cellSize));
+    const cx1 = Math.min(grid.cols - 1, Math.floor((maxX - grid.originX) / grid.cellSize));
+    const cy1 = Math.min(grid.rows - 1, Math.floor((maxY - grid.originY) / grid.cellSize));
+    if (cx0 > cx1 || cy0 > cy1) return null;
+    return { cx0, cy0, cx1, cy1 };
+}
+
+export function buildTrackPackEntry(track: TrackSource): TrackPackEntry {
+    const { segments, ringSegmentCounts } = flattenSegments(track.bounds);
+    const bbox = segmentsBBox(segments);
+    return {
+        name: track.name,
+        background: track.background ?? '',
+        mapSize: track.mapSize ?? null,
+        sourceHash: hashBounds(track.bounds),
+        bbox,
+        ringSegmentCounts,
+        segments,
+        checkpoints: computeCheckpoints(track.bounds, { stride: TRACK_PACK_CHECKPOINT_STRIDE }),
+        grid: buildSegmentGrid(segments, bbox)
+    };
+}
+
+const align4 = (n: number) => (n + 3) & ~3;
+
+export function encodeTrackPack(entries: TrackPackEntry[]): ArrayBuffer {
+    const encoder = new TextEncoder();
+    const records = entries.map(entry => {
+        const name = encoder.encode(entry.name);
+        const background = encoder.encode(entry.background);
+        const cellCount = entry.grid.cols * entry.grid.rows;
+        const bytes =
+            4 +
+            align4(2 + name.length) +
+            align4(2 + background.length) +
+            4 * 3 +
+            4 * 4 +
+            4 + 4 * entry.ringSegmentCounts.length +
+            4 + entry.segments.byteLength +
+            4 + 16 * entry.checkpoints.length +
+            4 * 5 +
+            4 * (cellCount + 1) + entry.grid.cellSegments.byteLength;
+        return { entry, name, background, bytes };
+    });
+
+    const total = 12 + records.reduce((sum, r) => sum + r.bytes, 0);
+    const buffer = new ArrayBuffer(total);
+    const view = new DataView(buffer);
+    const u8 = new Uint8Array(buffer);
+    let o = 0;
+
+    for (let i = 0; i < 4; i++) view.setUint8(o++, TRACK_PACK_MAGIC.charCodeAt(i));
+    view.setUint16(o, TRACK_PACK_VERSION, true); o += 2;
+    view.setUint16(o, 0, true); o += 2;
+    view.setUint32(o, records.length, true); o += 4;
+
+    const writeString = (bytes: Uint8Array) => {
+        view.setUint16(o, bytes.length, true);
+        u8.set(bytes, o + 2);
+        o += align4(2 + bytes.length);
+    };
+    const writeF32 = (value: number) => { view.setFloat32(o, value, true); o += 4; };
+    const writeU32 = (value: number) => { view.setUint32(o, value, true); o += 4; };
+
+    for (const { entry, name, background, bytes } of records) {
+        const start = o;
+        writeU32(bytes);
+        writeString(name);
+        writeString(background);
+        writeF32(entry.mapSize?.width ?? 0);
+        writeF32(entry.mapSize?.height ?? 0);
+        writeU32(entry.sourceHash);
+        writeF32(entry.bbox.minX);
+        writeF32(entry.bbox.minY);
+        writeF32(entry.bbox.maxX);
+        writeF32(entry.bbox.maxY);
+
+        writeU32(entry.ringSegmentCounts.length);
+        entry.ringSegmentCounts.forEach(writeU32);
+        writeU32(entry.segments.length / 4);
+        entry.segments.forEach(writeF32);
+
+        // Checkpoints are stored in id order, the start checkpoint first
+        writeU32(entry.checkpoints.length);
+        for (const cp of entry.checkpoints) {
+            writeF32(cp.a.x);
+            writeF32(cp.a.y);
+            writeF32(cp.b.x);
+            writeF32(cp.b.y);
+        }
+
+        writeF32(entry.grid.cellSize);
+        writeF32(entry.grid.originX);
+        writeF32(entry.grid.originY);
+        writeU32(entry.grid.cols);
+        writeU32(entry.grid.rows);
+        entry.grid.cellStart.forEach(writeU32);
+        entry.grid.cellSegments.forEach(writeU32);
+
+        if (o - start !== bytes) {
+            throw new Error(`TrackPack: size mismatch for ${entry.name} (${o - start} != ${bytes})`);
+        }
+    }
+    return buffer;
+}
+
+/**
+ * Decodes a pack; segment and grid arrays are views into `buffer` (no copies).
+ * Assumes a little-endian host, which is every platform we ship on.
+ */
+export function decodeTrackPack(buffer: ArrayBuffer): TrackPackEntry[] {
+    const view = new DataView(buffer);
+    const decoder = new TextDecoder();
+    let o = 0;
+
+    const magic = String.fromCharCode(view.getUint8(0), view.getUint8(1), view.getUint8(2), view.getUint8(3));
+    if (magic !== TRACK_PACK_MAGIC) {
+        throw new Error(`TrackPack: bad magic "${magic}"`);
+    }
+    const version = view.getUint16(4, true);
+    if (version !== TRACK_PACK_VERSION) {
+        throw new Error(`TrackPack: unsupported version ${version} (expected ${TRACK_PACK_VERSION})`);
+    }
+    const trackCount = view.getUint32(8, true);
+    o = 12;
+
+    const readString = () => {
+        const length = view.getUint16(o, true);
+        const text = decoder.decode(new Uint8Array(buffer, o + 2, length));
+        o += align4(2 + length);
+        return text;
+    };
+    const readF32 = () => { const v = view.getFloat32(o, true); o += 4; return v; };
+    const readU32 = () => { const v = view.getUint32(o, true); o += 4; return v; };
+    const f32View = (count: number) => { const a = new Float32Array(buffer, o, count); o += 4 * count; return a; };
+    const u32View = (count: number) => { const a = new Uint32Array(buffer, o, count); o += 4 * count; return a; };
+
+    const entries: TrackPackEntry[] = [];
+    for (let t = 0; t < trackCount; t++) {
+        const start = o;
+        const bytes = readU32();
+        const name = readString();
+        const background = readString();
+        const width = readF32();
+        const height = readF32();
+        const sourceHash = readU32();
+        const bbox = { minX: readF32(), minY: readF32(), maxX: readF32(), maxY: readF32() };
+        const ringSegmentCounts = u32View(readU32());
+        const segments = f32View(readU32() * 4);
+
+        const checkpointCount = readU32();
+        const cpData = f32View(checkpointCount * 4);
+        const checkpoints: Checkpoint[] = [];
+        for (let i = 0; i < checkpointCount; i++) {
+            checkpoints.push({
+                id: i,
+                a: { x: cpData[i * 4], y: cpData[i * 4 + 1] },
+                b: { x: cpData[i * 4 + 2], y: cpData[i * 4 + 3] },
+                isStart: i === 0
+            });
+        }
+
+        const cellSize = readF32();
+        const originX = readF32();
+        const originY = readF32();
+        const cols = readU32();
+        const rows = readU32();
+        const cellStart = u32View(cols * rows + 1);
+        const cellSegments = u32View(cellStart[cols * rows]);
+
+        entries.push({
+            name,
+            background,
+            mapSize: width > 0 && height > 0 ? { width, height } : null,
+            sourceHash,
+            bbox,
+            ringSegmentCounts,
+            segments,
+            checkpoints,
+            grid: { cellSize, originX, originY, cols, rows, cellStart, cellSegments }
+        });
+        o = start + bytes;
+    }
+    return entries;
+}
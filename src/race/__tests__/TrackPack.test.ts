@@ -0,0 +1,74 @@
+import { describe, expect, it } from '@jest/globals';
+import * as fs from 'fs';
+import * as path from 'path';
+import {
+    buildTrackPackEntry,
+    decodeTrackPack,
+    encodeTrackPack,
+    gridCellRange,
+    hashBounds
+} from '../TrackPack';
+
+const tracksJson = JSON.parse(
+    fs.readFileSync(path.resolve(__dirname, '../../assets/tracks.json'), 'utf8')
+);
+
+describe('TrackPack', () => {
+    const entries = tracksJson.tracks.map(buildTrackPackEntry);
+
+    it('round-trips every track through the binary format', () => {
+        const decoded = decodeTrackPack(encodeTrackPack(entries));
+
+        expect(decoded.map(e => e.name)).toEqual(entries.map(e => e.name));
+        decoded.forEach((entry, i) => {
+            const source = entries[i];
+            expect(entry.sourceHash).toBe(source.sourceHash);
+            expect(Array.from(entry.segments)).toEqual(Array.from(source.segments));
+            expect(Array.from(entry.ringSegmentCounts)).toEqual(Array.from(source.ringSegmentCounts));
+            expect(entry.checkpoints.length).toBe(source.checkpoints.length);
+            expect(entry.checkpoints[0].isStart).toBe(true);
+            expect(entry.checkpoints[1].a.x).toBeCloseTo(source.checkpoints[1].a.x, 2);
+            expect(Array.from(entry.grid.cellStart)).toEqual(Array.from(source.grid.cellStart));
+            expect(Array.from(entry.grid.cellSegments)).toEqual(Array.from(source.grid.cellSegments));
+        });
+    });
+
+    it('rejects a pack with an unknown version', () => {
+        const buffer = encodeTrackPack(entries.slice(0, 1));
+        new DataView(buffer).setUint16(4, 99, true);
+        expect(() => decodeTrackPack(buffer)).toThrow(/version/);
+    });
+
+    it('changes the source hash when the bounds change', () => {
+        const bounds = tracksJson.tracks[0].bounds.map((ring: number[][]) => ring.map(p => [...p]));
+        const before = hashBounds(bounds);
+        bounds[0][3][0] += 1;
+        expect(hashBounds(bounds)).not.toBe(before);
+    });
+
+    it('lists every segment touching a box in the overlapping grid cells', () => {
+        const entry = entries[0];
+        const { grid, segments } = entry;
+        const probe = (x: number, y: number, r: number) => {
+            const found = new Set<number>();
+            const range = gridCellRange(grid, x - r, y - r, x + r, y + r);
+            if (range) {
+                for (let cy = range.cy0; cy <= range.cy1; cy++) {
+                    for (let cx = range.cx0; cx <= range.cx1; cx++) {
+                        const cell = cy * grid.cols + cx;
+                        for (let k = grid.cellStart[cell]; k < grid.cellStart[cell + 1]; k++) {
+                            found.add(grid.cellSegments[k]);
+                        }
+                    }
+                }
+            }
+            return found;
+        };
+
+        for (let s = 0; s < segments.length / 4; s += 7) {
+            const x = (segments[s * 4] + segments[s * 4 + 2]) / 2;
+            const y = (segments[s * 4 + 1] + segments[s * 4 + 3]) / 2;
+            expect(probe(x, y, 20).has(s)).toBe(true);
+        }
+    });
+});
@@ -91,6 +91,10 @@ export class WorldRenderer {
         });
     }
 
+    clearPopups(): void {
+        this.popups = [];
+    }
+
     private updatePopups(deltaMs: number): void {
         for (let i = this.popups.length - 1; i >= 0; i--) {
             this.popups[i].ageMs += deltaMs;
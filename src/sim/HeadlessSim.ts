@@ -0,0 +1,132 @@
+import Track from "../components/Playfield/Track";
+import TrackData from "../components/Playfield/TrackData";
+import CarData from "../components/Car/CarData";
+import Session from "../components/Session/Session";
+import { PlayerManager } from "../players/PlayerManager";
+import { AIController } from "../ai/AIController";
+import { TrainingBridge } from "../ai/TrainingBridge";
+import { AIFleet } from "../ai/AIFleet";
+import { TrainingTransport } from "../ai/TrainingTransport";
+import { wallProximity } from "../ai/Raycast";
+import { stepLocalPlayer } from "../core/PlayerPhysics";
+import { STEP_MS } from "../config/GameConfig";
+import { DEFAULT_MAP_SIZE } from "../config/RuntimeConfig";
+import { Dimensions } from "../utils/Utils";
+
+export interface HeadlessSimOptions {
+    trackName?: string;
+    carType?: string;
+    playerId?: string;
+    /** AI cars in this instance, including the local player (default 1). */
+    cars?: number;
+    carCollisions?: boolean;
+}
+
+/**
+ * DOM-free counterpart of Game for training: one AI-driven local player on a
+ * track (plus an optional fleet of extra AI cars), stepped through the same
+ * physics as the browser. No canvas, camera, particles, network or UI.
+ */
+export class HeadlessSim {
+    readonly playerManager: PlayerManager = new PlayerManager();
+    readonly aiController: AIController = new AIController();
+    readonly track: Track;
+    readonly fleet: AIFleet | null = null;
+    private mapSize: Dimensions = { ...DEFAULT_MAP_SIZE };
+    private trackName: string;
+    private lastCollision: boolean = false;
+
+    constructor(options: HeadlessSimOptions = {}) {
+        const trackName = options.trackName ?? TrackData.tracks[0]?.name;
+        this.track = new Track(trackName, null, this.mapSize, []);
+
+        const session = new Session(options.playerId ?? 'ai_agent');
+        if (options.carType) {
+            session.carType = options.carType;
+        }
+        this.playerManager.ensureLocalPlayer(
+            session,
+            options.playerId ?? 'ai_agent',
+            CarData.types[0]?.name || "default",
+            trackName
+        );
+        this.playerManager.setCarType(session.carType);
+
+        if ((options.cars ?? 1) > 1) {
+            this.fleet = new AIFleet(this.playerManager, {
+                extraCars: options.cars - 1,
+                carCollisions: options.carCollisions
+            });
+            this.fleet.setCarType(session.carType);
+        }
+
+        this.loadTrack(trackName);
+    }
+
+    loadTrack(name: string): void {
+        const trackData = TrackData.getByName(name);
+        this.trackName = name;
+        this.mapSize = { ...(trackData.mapSize || this.mapSize) };
+        this.track.name = name;
+        this.track.mapSize = this.mapSize;
+        this.track.setGeometry(trackData.bounds, TrackData.getPrecomputed(name));
+        this.playerManager.onTrackChanged(this.track, {
+            minLapMs: 10000,
+            requireAllCheckpoints: true
+        });
+        this.fleet?.onTrackChanged(this.track);
+    }
+
+    step(stepMs: number = STEP_MS): void {
+        const localPlayer = this.playerManager.getLocalPlayer();
+        if (!localPlayer) {
+            return;
+        }
+
+        const actions = this.aiController.getActions();
+        const compatKeys = {
+            'ArrowUp': actions.ACCELERATE,
+            'ArrowDown': actions.BRAKE,
+            'ArrowLeft': actions.LEFT,
+            'ArrowRight': actions.RIGHT,
+            'Space': actions.HANDBRAKE,
+        };
+
+        const { collision } = stepLocalPlayer(
+            this.playerManager,
+            this.track,
+            localPlayer,
+            compatKeys,
+            actions.BOOST,
+            stepMs,
+            this.trackName
+        );
+        const carHit = this.fleet ? this.fleet.step(this.track, stepMs, localPlayer) : false;
+        this.lastCollision = collision || carHit;
+    }
+
+    getWallProximity(): number {
+        const localPlayer = this.playerManager.getLocalPlayer();
+        if (!localPlayer) return 1.0;
+
+        return wallProximity(localPlayer.car.position, localPlayer.car.angle, this.track.boundaries);
+    }
+
+    createBridge(transport: TrainingTransport, aiVersion: number): TrainingBridge {
+        return new TrainingBridge(this.aiController, {
+            onReset: () => {},
+            onStep: (action, repeat) => {
+                for (let i = 0; i < repeat; i++) {
+                    this.step(STEP_MS);
+                }
+            },
+            getPlayer: () => this.playerManager.getLocalPlayer(),
+            getTrack: () => this.track,
+            getLapCounter: () => this.playerManager.getLapCounter(),
+            getMapSize: () => this.mapSize,
+            getCollision: () => this.lastCollision,
+            getWallProximity: () => this.getWallProximity(),
+            getFleet: () => this.fleet
+        }, { transport, aiVersion });
+    }
+}
@@ -0,0 +1,42 @@
+import * as readline from "readline";
+import { TrainingTransport, TrainingTransportHandlers } from "../ai/TrainingTransport";
+
+/**
+ * Newline-delimited JSON over stdin/stdout, used when the PPO server spawns the
+ * headless sim as a child process. Anything else written to stdout would corrupt
+ * the stream, so the entry point routes console output to stderr.
+ */
+export class StdioTransport implements TrainingTransport {
+    readonly label = 'stdio';
+    private rl: readline.Interface | null = null;
+
+    open(handlers: TrainingTransportHandlers): void {
+        this.rl = readline.createInterface({ input: process.stdin, terminal: false });
+        this.rl.on('line', (line) => {
+            if (line.trim().length > 0) {
+                handlers.onMessage(line);
+            }
+        });
+        this.rl.on('close', () => {
+            this.rl = null;
+            handlers.onClose();
+        });
+        process.stdout.on('error', (error) => handlers.onError(error));
+        handlers.onOpen();
+    }
+
+    send(data: string): void {
+        process.stdout.write(data + '\n');
+    }
+
+    close(): void {
+        if (this.rl) {
+            this.rl.close();
+            this.rl = null;
+        }
+    }
+
+    isOpen(): boolean {
+        return this.rl !== null;
+    }
+}
@@ -0,0 +1,32 @@
+import { SpectatorFrame } from "../net/SpectatorClient";
+
+/** Page -> worker: everything the worker cannot read itself (tracks include localStorage customs). */
+export interface TrainingWorkerInit {
+    type: 'init';
+    url: string;
+    aiVersion: number;
+    trackName: string;
+    carType: string;
+    tracks: any[];
+    cars?: number;
+    carCollisions?: boolean;
+}
+
+/** Page -> worker: turn the bridge's render flag back on (F8-F10), same as the agent's render message. */
+export interface TrainingWorkerRender {
+    type: 'render';
+    enabled: boolean;
+}
+
+/**
+ * Worker -> page, every STATE_INTERVAL_MS: bridge status and the latest frame per car.
+ * With rendering disabled by the agent no frames are sent and the page stays headless.
+ */
+export interface TrainingWorkerState {
+    type: 'state';
+    connected: boolean;
+    renderEnabled: boolean;
+    frames: SpectatorFrame[];
+}
+
+export const TRAINING_WORKER_SCRIPT = 'trainingWorker.js';
@@ -0,0 +1,74 @@
+import { describe, expect, it } from '@jest/globals';
+import * as fs from 'fs';
+import * as path from 'path';
+import CarData from '../../components/Car/CarData';
+import TrackData from '../../components/Playfield/TrackData';
+import { HeadlessSim } from '../HeadlessSim';
+
+(global as any).localStorage = {
+  getItem: () => null,
+  setItem: () => undefined,
+  removeItem: () => undefined,
+  clear: () => undefined,
+};
+
+const assetsDir = path.resolve(__dirname, '..', '..', 'assets');
+CarData.loadFromObject(JSON.parse(fs.readFileSync(path.join(assetsDir, 'cars.json'), 'utf8')));
+TrackData.loadFromObject(JSON.parse(fs.readFileSync(path.join(assetsDir, 'tracks.json'), 'utf8')), { mergeCustom: false });
+
+describe('HeadlessSim', () => {
+  it('loads track geometry and checkpoints without a DOM', () => {
+    const sim = new HeadlessSim({ trackName: 'bounds2' });
+
+    expect(sim.track.boundaries.length).toBeGreaterThan(0);
+    expect(sim.track.checkpoints.length).toBeGreaterThan(0);
+    expect(sim.playerManager.getLapCounter()).not.toBeNull();
+  });
+
+  it('moves the car when the AI accelerates', () => {
+    const sim = new HeadlessSim({ trackName: 'bounds2' });
+    const car = sim.playerManager.getLocalPlayer()!.car;
+    const start = { x: car.position.x, y: car.position.y };
+
+    sim.aiController.setAction([0, 1, 0, 0, 0]);
+    for (let i = 0; i < 60; i++) {
+      sim.step();
+    }
+
+    const moved = Math.hypot(car.position.x - start.x, car.position.y - start.y);
+    expect(moved).toBeGreaterThan(0);
+  });
+
+  it('steps every fleet car with its own controller', () => {
+    const sim = new HeadlessSim({ trackName: 'bounds2', cars: 3 });
+    expect(sim.fleet!.size).toBe(2);
+    expect(sim.fleet!.cars[0].lapCounter).not.toBeNull();
+
+    const still = sim.fleet!.cars[0].player.car;
+    const driven = sim.fleet!.cars[1].player.car;
+    const stillStart = { x: still.position.x, y: still.position.y };
+    const drivenStart = { x: driven.position.x, y: driven.position.y };
+
+    sim.fleet!.cars[1].aiController.setAction([0, 1, 0, 0, 0]);
+    for (let i = 0; i < 60; i++) {
+      sim.step();
+    }
+
+    const drivenMoved = Math.hypot(driven.position.x - drivenStart.x, driven.position.y - drivenStart.y);
+    const stillMoved = Math.hypot(still.position.x - stillStart.x, still.position.y - stillStart.y);
+    expect(drivenMoved).toBeGreaterThan(stillMoved);
+  });
+
+  it('pushes overlapping cars apart when car collisions are on', () => {
+    const sim = new HeadlessSim({ trackName: 'bounds2', cars: 2, carCollisions: true });
+    const local = sim.playerManager.getLocalPlayer()!.car;
+    const other = sim.fleet!.cars[0].player.car;
+    const gap = () => Math.hypot(other.position.x - local.position.x, other.position.y - local.position.y);
+    const before = gap();
+
+    sim.step();
+
+    expect(sim.fleet!.cars[0].collision).toBe(true);
+    expect(gap()).toBeGreaterThan(before);
+  });
+});
@@ -0,0 +1,68 @@
+/**
+ * Headless training runner for Node. Loads cars and tracks from src/assets,
+ * builds a HeadlessSim and serves the TrainingBridge protocol on stdio:
+ *
+ *   npx ts-node src/sim/headless.ts [--track bounds2] [--car default] [--aiver 2] [--cars 4] [--collide 1]
+ */
+import * as fs from "fs";
+import * as path from "path";
+import CarData from "../components/Car/CarData";
+import TrackData from "../components/Playfield/TrackData";
+import { HeadlessSim } from "./HeadlessSim";
+import { StdioTransport } from "./StdioTransport";
+import { installMemoryStorage } from "./memoryStorage";
+
+// stdout carries protocol frames; keep all logging on stderr
+console.log = console.error.bind(console);
+console.info = console.error.bind(console);
+
+installMemoryStorage();
+
+function parseArgs(argv: string[]): Record<string, string> {
+    const args: Record<string, string> = {};
+    for (let i = 0; i < argv.length; i++) {
+        if (argv[i].startsWith('--') && i + 1 < argv.length) {
+            args[argv[i].slice(2)] = argv[i + 1];
+            i++;
+        }
+    }
+    return args;
+}
+
+const assetsDir = path.resolve(__dirname, '..', 'assets');
+
+function readAsset(name: string): any {
+    return JSON.parse(fs.readFileSync(path.join(assetsDir, name), 'utf8'));
+}
+
+function loadTrackPack(): void {
+    const packPath = path.join(assetsDir, 'tracks.pack');
+    if (!fs.existsSync(packPath)) {
+        console.warn('headless: no tracks.pack, generating track geometry at runtime');
+        return;
+    }
+    const data = fs.readFileSync(packPath);
+    // Copy into a fresh, aligned ArrayBuffer (Node buffers may sit at any offset in a pool)
+    TrackData.loadPackFromBuffer(data.buffer.slice(data.byteOffset, data.byteOffset + data.byteLength));
+}
+
+function main(): void {
+    const args = parseArgs(process.argv.slice(2));
+
+    CarData.loadFromObject(readAsset('cars.json'));
+    TrackData.loadFromObject(readAsset('tracks.json'), { mergeCustom: false });
+    loadTrackPack();
+
+    const sim = new HeadlessSim({
+        trackName: args.track,
+        carType: args.car,
+        cars: Number(args.cars || '1'),
+        carCollisions: args.collide === '1'
+    });
+    const bridge = sim.createBridge(new StdioTransport(), Number(args.aiver || '1'));
+
+    process.stdin.on('end', () => process.exit(0));
+    bridge.connect();
+}
+
+main();
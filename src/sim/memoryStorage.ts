@@ -0,0 +1,17 @@
+/**
+ * In-memory localStorage for runtimes without one (Node, Web Workers). Best-lap
+ * and session bookkeeping expect it; nothing needs to survive the process.
+ */
+export function installMemoryStorage(): void {
+    const scope: any = globalThis;
+    if (typeof scope.localStorage !== 'undefined') {
+        return;
+    }
+    const store = new Map<string, string>();
+    scope.localStorage = {
+        getItem: (key: string) => (store.has(key) ? store.get(key) : null),
+        setItem: (key: string, value: string) => { store.set(key, String(value)); },
+        removeItem: (key: string) => { store.delete(key); },
+        clear: () => store.clear(),
+    };
+}
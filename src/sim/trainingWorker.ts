@@ -0,0 +1,66 @@
+/**
+ * Web Worker entry for browser training (?ai=1&worker=1). Runs HeadlessSim, the
+ * TrainingBridge and the agent WebSocket off the page's main thread, so timer
+ * and requestAnimationFrame throttling of background tabs does not slow
+ * training. The page only receives throttled state for display.
+ */
+import CarData from "../components/Car/CarData";
+import TrackData from "../components/Playfield/TrackData";
+import { WebSocketTransport } from "../ai/TrainingTransport";
+import { TrainingBridge } from "../ai/TrainingBridge";
+import { HeadlessSim } from "./HeadlessSim";
+import { installMemoryStorage } from "./memoryStorage";
+import { TrainingWorkerInit, TrainingWorkerRender, TrainingWorkerState } from "./TrainingWorkerProtocol";
+import { SpectatorFrame } from "../net/SpectatorClient";
+
+const STATE_INTERVAL_MS = 100;
+
+const ctx: any = self;
+
+let bridge: TrainingBridge | null = null;
+
+installMemoryStorage();
+
+async function start(init: TrainingWorkerInit): Promise<void> {
+    // Asset URLs resolve against the worker script, which sits next to the page bundle
+    await Promise.all([
+        CarData.loadFromJSON('assets/cars.json'),
+        TrackData.loadPack('assets/tracks.pack')
+    ]);
+    TrackData.loadFromObject({ tracks: init.tracks }, { mergeCustom: false });
+
+    const sim = new HeadlessSim({
+        trackName: init.trackName,
+        carType: init.carType,
+        cars: init.cars,
+        carCollisions: init.carCollisions
+    });
+    bridge = sim.createBridge(new WebSocketTransport(init.url), init.aiVersion);
+    bridge.connect();
+
+    // Only frames built since the last post, so the page doesn't stamp stale poses as new
+    const posted = new WeakSet<SpectatorFrame>();
+    setInterval(() => {
+        const renderEnabled = bridge.isRenderEnabled();
+        const frames = renderEnabled ? bridge.getSpectatorFrames().filter(frame => !posted.has(frame)) : [];
+        frames.forEach(frame => posted.add(frame));
+        const state: TrainingWorkerState = {
+            type: 'state',
+            connected: bridge.isConnected(),
+            renderEnabled,
+            frames
+        };
+        ctx.postMessage(state);
+    }, STATE_INTERVAL_MS);
+}
+
+ctx.onmessage = (event: MessageEvent) => {
+    const msg = event.data;
+    if (msg?.type === 'init') {
+        start(msg as TrainingWorkerInit).catch((error) => {
+            console.error('trainingWorker: failed to start', error);
+        });
+    } else if (msg?.type === 'render' && bridge) {
+        bridge.renderEnabled = (msg as TrainingWorkerRender).enabled;
+    }
+};
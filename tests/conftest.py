@@ -0,0 +1,5 @@
+# Python tooling lives at the repo root (ai_ppo_server.py, ai_track_pack.py, ...)
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,121 @@
+import os
+
+import numpy as np
+import torch
+from gymnasium import spaces
+from stable_baselines3.common.buffers import RolloutBuffer
+
+import ai_ppo_server
+from ai_ppo_server import PreallocRolloutBuffer
+
+BUFFER_SIZE = 16
+N_ENVS = 2
+OBS_DIM = 5
+ACT_DIM = 3
+BATCH_SIZE = 12  # 32 samples: two full minibatches and a short one
+
+
+def make_buffer(cls):
+    return cls(
+        BUFFER_SIZE,
+        spaces.Box(-np.inf, np.inf, (OBS_DIM,), np.float32),
+        spaces.Box(-1.0, 1.0, (ACT_DIM,), np.float32),
+        device="cpu",
+        gae_lambda=0.95,
+        gamma=0.99,
+        n_envs=N_ENVS,
+    )
+
+
+def fill(buffer, seed: int):
+    rng = np.random.default_rng(seed)
+    for _ in range(BUFFER_SIZE):
+        buffer.add(
+            rng.standard_normal((N_ENVS, OBS_DIM)).astype(np.float32),
+            rng.uniform(-1, 1, (N_ENVS, ACT_DIM)).astype(np.float32),
+            rng.standard_normal(N_ENVS).astype(np.float32),
+            (rng.random(N_ENVS) < 0.1).astype(np.float32),
+            torch.as_tensor(rng.standard_normal(N_ENVS), dtype=torch.float32),
+            torch.as_tensor(rng.standard_normal(N_ENVS), dtype=torch.float32),
+        )
+    buffer.compute_returns_and_advantage(last_values=torch.zeros(N_ENVS), dones=np.zeros(N_ENVS))
+
+
+def sample_epoch(buffer, seed: int):
+    # Same global seed -> same permutation in RolloutBuffer.get; clone since batches are reused
+    np.random.seed(seed)
+    return [tuple(t.clone() for t in batch) for batch in buffer.get(BATCH_SIZE)]
+
+
+def assert_same_batches(got, expected):
+    assert [len(b.observations) for b in expected] == [12, 12, 8]
+    assert len(got) == len(expected)
+    for ours, stock in zip(got, expected):
+        assert len(ours) == len(stock) == 6
+        for a, b in zip(ours, stock):
+            assert a.dtype == b.dtype
+            assert a.shape == b.shape
+            assert torch.equal(a, b)
+
+
+def test_minibatches_match_stock_rollout_buffer_across_epochs_and_rollouts():
+    ours, stock = make_buffer(PreallocRolloutBuffer), make_buffer(RolloutBuffer)
+
+    for rollout in range(2):
+        ours.reset()
+        stock.reset()
+        fill(ours, seed=rollout)
+        fill(stock, seed=rollout)
+        for epoch in range(2):
+            seed = 10 * rollout + epoch
+            assert_same_batches(sample_epoch(ours, seed), sample_epoch(stock, seed))
+
+
+def test_minibatch_tensors_are_reused_across_epochs():
+    buffer = make_buffer(PreallocRolloutBuffer)
+    fill(buffer, seed=0)
+
+    epochs = []
+    for _ in range(2):
+        epochs.append([tuple(t.data_ptr() for t in batch) for batch in buffer.get(BATCH_SIZE)])
+
+    # One set of tensors per minibatch size, shared by every minibatch of that size
+    assert epochs[0] == epochs[1]
+    assert epochs[0][0] == epochs[0][1] != epochs[0][2]
+    assert sorted(buffer._outs) == [8, 12]
+
+
+def test_records_one_time_per_epoch():
+    buffer = make_buffer(PreallocRolloutBuffer)
+    fill(buffer, seed=0)
+
+    for _ in range(3):
+        list(buffer.get(BATCH_SIZE))
+
+    assert len(buffer.epoch_times) == 3
+    assert all(t >= 0.0 for t in buffer.epoch_times)
+
+
+def test_configure_cpu_learner_without_affinity_support(monkeypatch):
+    for name in ("sched_getaffinity", "sched_setaffinity"):
+        monkeypatch.delattr(os, name, raising=False)
+    monkeypatch.setattr(os, "cpu_count", lambda: 4)
+    monkeypatch.setattr(torch.cuda, "is_available", lambda: False)
+    threads = []
+    monkeypatch.setattr(torch, "set_num_threads", threads.append)
+    monkeypatch.setattr(torch, "set_num_interop_threads", lambda n: None)
+    monkeypatch.setattr(ai_ppo_server, "CPU_LEARNER", True)
+    monkeypatch.setattr(ai_ppo_server, "LEARNER_THREADS", None)
+    monkeypatch.setattr(ai_ppo_server, "BRIDGE_RESERVED_CORES", 1)
+    for name in ("LEARNER_CPUS", "BRIDGE_CPUS", "ALL_CPUS"):
+        monkeypatch.setattr(ai_ppo_server, name, None)
+
+    assert ai_ppo_server.configure_cpu_learner() == "cpu"
+    assert threads == [3]
+    assert ai_ppo_server.LEARNER_CPUS is None
+    assert ai_ppo_server.BRIDGE_CPUS is None
+    # Pinning is a no-op rather than an error
+    ai_ppo_server.pin_current_thread({0})
+
+    monkeypatch.setattr(ai_ppo_server, "CPU_LEARNER", False)
+    assert ai_ppo_server.configure_cpu_learner() == "auto"
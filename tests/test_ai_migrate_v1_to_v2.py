@@ -0,0 +1,81 @@
+import pickle
+from types import SimpleNamespace
+
+import numpy as np
+import torch
+from stable_baselines3.common.running_mean_std import RunningMeanStd
+
+import ai_migrate_v1_to_v2 as migrate
+
+
+def test_index_mapping_skips_new_checkpoint_features():
+    index = migrate.V1_TO_V2_OBS_INDEX
+    assert len(index) == migrate.V1_OBS_DIM
+    assert len(set(index)) == len(index)
+    assert max(index) == migrate.V2_OBS_DIM - 1
+    assert sorted(set(range(migrate.V2_OBS_DIM)) - set(index)) == list(range(9, 15))
+
+
+def test_expand_input_layers_maps_columns_and_zeroes_new_ones():
+    hidden = 8
+    state_dict = {
+        "mlp_extractor.policy_net.0.weight": torch.randn(hidden, migrate.V1_OBS_DIM),
+        "mlp_extractor.policy_net.0.bias": torch.randn(hidden),
+        "mlp_extractor.value_net.0.weight": torch.randn(hidden, migrate.V1_OBS_DIM),
+        "mlp_extractor.policy_net.2.weight": torch.randn(hidden, hidden),
+        "action_net.weight": torch.randn(migrate.ACTION_DIM, hidden),
+    }
+
+    expanded = migrate.expand_input_layers(state_dict)
+
+    for key in ("mlp_extractor.policy_net.0.weight", "mlp_extractor.value_net.0.weight"):
+        weight = expanded[key]
+        assert weight.shape == (hidden, migrate.V2_OBS_DIM)
+        assert torch.equal(weight[:, migrate.V1_TO_V2_OBS_INDEX], state_dict[key])
+        assert torch.count_nonzero(weight[:, 9:15]) == 0
+    for key in ("mlp_extractor.policy_net.0.bias", "mlp_extractor.policy_net.2.weight", "action_net.weight"):
+        assert expanded[key] is state_dict[key]
+
+    # Same pre-activations for a v1 observation embedded into the v2 layout
+    obs_v1 = torch.randn(migrate.V1_OBS_DIM)
+    obs_v2 = torch.zeros(migrate.V2_OBS_DIM)
+    obs_v2[migrate.V1_TO_V2_OBS_INDEX] = obs_v1
+    key = "mlp_extractor.policy_net.0.weight"
+    assert torch.allclose(expanded[key] @ obs_v2, state_dict[key] @ obs_v1)
+
+
+def _trained_rms(count: float) -> RunningMeanStd:
+    rms = RunningMeanStd(shape=(migrate.V1_OBS_DIM,))
+    rms.mean = np.arange(migrate.V1_OBS_DIM, dtype=np.float64)
+    rms.var = np.arange(1, migrate.V1_OBS_DIM + 1, dtype=np.float64)
+    rms.count = count
+    return rms
+
+
+def test_vecnorm_carry_over_and_capped_count(tmp_path):
+    src = tmp_path / "vecnorm_v1.pkl"
+    dst = tmp_path / "vecnorm_v2.pkl"
+    with open(src, "wb") as f:
+        pickle.dump(SimpleNamespace(obs_rms=_trained_rms(5e7), observation_space=None), f)
+
+    migrate.migrate_vecnorm(str(src), str(dst))
+    with open(dst, "rb") as f:
+        rms = pickle.load(f).obs_rms
+
+    assert rms.mean.shape == (migrate.V2_OBS_DIM,)
+    assert np.array_equal(rms.mean[migrate.V1_TO_V2_OBS_INDEX], np.arange(migrate.V1_OBS_DIM))
+    assert np.array_equal(rms.var[migrate.V1_TO_V2_OBS_INDEX], np.arange(1, migrate.V1_OBS_DIM + 1))
+    assert np.all(rms.mean[9:15] == 0.0) and np.all(rms.var[9:15] == 1.0)
+    assert rms.count == migrate.MIGRATED_OBS_COUNT
+
+
+def test_new_features_adapt_after_migration():
+    rms = migrate.migrate_obs_rms(_trained_rms(5e7))
+    batch = np.random.default_rng(0).normal(50.0, 2.0, size=(int(migrate.MIGRATED_OBS_COUNT), migrate.V2_OBS_DIM))
+    rms.update(batch)
+    # Half the weight goes to real data after one count's worth of samples
+    assert np.all(rms.mean[9:15] > 20.0)
+
+
+def test_small_count_is_kept():
+    assert migrate.migrate_obs_rms(_trained_rms(123.0)).count == 123.0
@@ -0,0 +1,83 @@
+import numpy as np
+
+from ai_ppo_server import SpawnSampler
+
+
+def test_no_weights_before_any_failure():
+    sampler = SpawnSampler(floor=0.3, decay=0.5)
+    assert sampler.weights() is None
+
+    sampler.on_reset({"numCheckpoints": 4, "spawnIndex": 0})
+    assert sampler.weights() is None
+    sampler.on_step({"section": 1}, False, None)
+    sampler.on_step({"section": 2}, True, "timeout")
+    # Passes alone carry no failure signal: keep the game's own spawn choice
+    assert sampler.weights() is None
+
+
+def test_counts_section_passes_and_decays_on_episode_end():
+    sampler = SpawnSampler(floor=0.3, decay=0.5)
+    sampler.on_reset({"numCheckpoints": 4, "spawnIndex": 0})
+    sampler.on_step({"section": 0}, False, None)
+    sampler.on_step({"section": 1}, False, None)
+    sampler.on_step({"section": 2}, False, None)
+    np.testing.assert_array_equal(sampler.passes, [1, 1, 0, 0])
+    np.testing.assert_array_equal(sampler.failures, [0, 0, 0, 0])
+
+    sampler.on_step({"section": 2}, True, "stuck")
+    np.testing.assert_array_equal(sampler.passes, [0.5, 0.5, 0, 0])
+    np.testing.assert_array_equal(sampler.failures, [0, 0, 0.5, 0])
+
+    # Out-of-range sections are ignored but the episode still decays the stats
+    sampler.on_reset({"numCheckpoints": 4, "spawnIndex": 2})
+    sampler.on_step({"section": 7}, True, "stuck")
+    np.testing.assert_array_equal(sampler.passes, [0.25, 0.25, 0, 0])
+    np.testing.assert_array_equal(sampler.failures, [0, 0, 0.25, 0])
+
+
+def test_weights_mix_uniform_floor_with_failure_rates():
+    floor = 0.3
+    sampler = SpawnSampler(floor=floor, decay=1.0)
+    sampler.passes = np.array([3.0, 1.0, 0.0, 0.0])
+    sampler.failures = np.array([1.0, 1.0, 2.0, 0.0])
+
+    weights = sampler.weights()
+
+    rates = np.array([1 / 5, 1 / 3, 2 / 3, 0.0])
+    expected = floor / 4 + (1 - floor) * rates / rates.sum()
+    np.testing.assert_allclose(weights, expected, atol=1e-5)
+    assert abs(sum(weights) - 1.0) < 1e-4
+    # A checkpoint nobody fails at keeps its share of the uniform floor
+    assert abs(weights[3] - floor / 4) < 1e-5
+    assert int(np.argmax(weights)) == 2
+
+
+def test_cars_of_one_game_keep_their_own_section():
+    sampler = SpawnSampler(floor=0.3, decay=0.5)
+    sampler.on_reset({"numCheckpoints": 4, "spawnIndex": 0}, agent=0)
+    sampler.on_reset({"numCheckpoints": 4, "spawnIndex": 2}, agent=1)
+
+    sampler.on_step({"section": 3}, False, None, agent=1)
+    sampler.on_step({"section": 1}, False, None, agent=0)
+    sampler.on_step({"section": 2}, False, None, agent=0)
+    np.testing.assert_array_equal(sampler.passes, [1, 1, 1, 0])
+
+    # Car 1 fails where it is, not where car 0 is
+    sampler.on_step({"section": 3}, True, "collisions", agent=1)
+    np.testing.assert_array_equal(sampler.failures, [0, 0, 0, 0.5])
+
+
+def test_new_checkpoint_count_drops_old_stats():
+    sampler = SpawnSampler(floor=0.3, decay=0.5)
+    sampler.on_reset({"numCheckpoints": 4, "spawnIndex": 0})
+    sampler.on_step({"section": 1}, True, "stuck")
+
+    # Same track, or a reset info without the count: stats are kept
+    sampler.on_reset({"numCheckpoints": 4, "spawnIndex": 0})
+    sampler.on_reset({"spawnIndex": 0})
+    assert sampler.failures[1] == 0.5
+
+    sampler.on_reset({"numCheckpoints": 6, "spawnIndex": 0})
+    assert len(sampler.passes) == 6
+    assert not sampler.passes.any() and not sampler.failures.any()
+    assert sampler.weights() is None
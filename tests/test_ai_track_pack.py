@@ -0,0 +1,136 @@
+import os
+import struct
+
+import numpy as np
+import pytest
+
+import ai_track_pack
+
+
+def _string(s: str) -> bytes:
+    data = struct.pack("<H", len(s.encode("utf-8"))) + s.encode("utf-8")
+    return data + b"\0" * (ai_track_pack._align4(len(data)) - len(data))
+
+
+def _f32(*values) -> bytes:
+    return struct.pack(f"<{len(values)}f", *values)
+
+
+def _u32(*values) -> bytes:
+    return struct.pack(f"<{len(values)}I", *values)
+
+
+def _square_ring(x0, y0, size):
+    return [(x0, y0), (x0 + size, y0), (x0 + size, y0 + size), (x0, y0 + size), (x0, y0)]
+
+
+def _track_record(name, background, map_size, rings, checkpoints, cell_size):
+    """One track record laid out as in src/race/TrackPack.ts (grid built by brute force)."""
+    segments = [(a[0], a[1], b[0], b[1]) for ring in rings for a, b in zip(ring, ring[1:])]
+    xs = [v for s in segments for v in (s[0], s[2])]
+    ys = [v for s in segments for v in (s[1], s[3])]
+    bbox = (min(xs), min(ys), max(xs), max(ys))
+    cols = int((bbox[2] - bbox[0]) // cell_size) + 1
+    rows = int((bbox[3] - bbox[1]) // cell_size) + 1
+
+    cells = [[] for _ in range(cols * rows)]
+    for i, (x0, y0, x1, y1) in enumerate(segments):
+        cx0, cx1 = int((min(x0, x1) - bbox[0]) // cell_size), int((max(x0, x1) - bbox[0]) // cell_size)
+        cy0, cy1 = int((min(y0, y1) - bbox[1]) // cell_size), int((max(y0, y1) - bbox[1]) // cell_size)
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                cells[cy * cols + cx].append(i)
+    cell_start = [0]
+    for cell in cells:
+        cell_start.append(cell_start[-1] + len(cell))
+
+    body = (
+        _string(name)
+        + _string(background)
+        + _f32(*(map_size or (0.0, 0.0)))
+        + _u32(0xC0FFEE)
+        + _f32(*bbox)
+        + _u32(len(rings), *[len(r) - 1 for r in rings])
+        + _u32(len(segments)) + _f32(*[v for s in segments for v in s])
+        + _u32(len(checkpoints)) + _f32(*[v for c in checkpoints for v in c])
+        + _f32(cell_size, bbox[0], bbox[1]) + _u32(cols, rows)
+        + _u32(*cell_start) + _u32(*[i for cell in cells for i in cell])
+    )
+    return _u32(4 + len(body)) + body, segments
+
+
+def _write_pack(path, records, version=ai_track_pack.TRACK_PACK_VERSION):
+    header = ai_track_pack.TRACK_PACK_MAGIC + struct.pack("<HHI", version, 0, len(records))
+    with open(path, "wb") as f:
+        f.write(header + b"".join(records))
+
+
+@pytest.fixture
+def fixture_pack(tmp_path):
+    ring_a = [_square_ring(0, 0, 1000), _square_ring(300, 300, 400)]
+    ring_b = [_square_ring(-500, 200, 600)]
+    record_a, segments_a = _track_record("square", "bg.png", (2000.0, 1500.0), ring_a,
+                                         [(0, 500, 300, 500), (700, 500, 1000, 500)], 256.0)
+    record_b, segments_b = _track_record("é_track", "", None, ring_b, [(-500, 500, -400, 500)], 128.0)
+    path = tmp_path / "tracks.pack"
+    _write_pack(path, [record_a, record_b])
+    return str(path), {"square": segments_a, "é_track": segments_b}
+
+
+def test_reads_fixture_pack(fixture_pack):
+    path, segments = fixture_pack
+    tracks = ai_track_pack.load_track_pack(path)
+
+    assert list(tracks) == ["square", "é_track"]
+    square = tracks["square"]
+    assert square.background == "bg.png"
+    assert square.map_size == (2000.0, 1500.0)
+    assert square.source_hash == 0xC0FFEE
+    assert square.bbox == (0.0, 0.0, 1000.0, 1000.0)
+    assert list(square.ring_segment_counts) == [4, 4]
+    np.testing.assert_array_equal(square.segments, np.array(segments["square"], dtype=np.float32))
+    np.testing.assert_array_equal(square.checkpoints[1], [700, 500, 1000, 500])
+    assert (square.cols, square.rows, square.cell_size) == (4, 4, 256.0)
+
+    other = tracks["é_track"]
+    assert other.background == ""
+    assert other.map_size is None
+    assert other.origin == (-500.0, 200.0)
+    np.testing.assert_array_equal(other.segments, np.array(segments["é_track"], dtype=np.float32))
+    assert len(other.checkpoints) == 1
+
+
+def test_segments_near_finds_nearby_walls(fixture_pack):
+    path, _ = fixture_pack
+    square = ai_track_pack.load_track_pack(path)["square"]
+
+    # Left edge of the outer ring (segment 3) and nothing from the inner ring
+    near_left = set(square.segments_near(5, 500, 20).tolist())
+    assert 3 in near_left
+    assert not near_left & {4, 5, 6, 7}
+    # Every segment touching a probe at its midpoint is listed
+    for i, (x0, y0, x1, y1) in enumerate(square.segments):
+        assert i in square.segments_near((x0 + x1) / 2, (y0 + y1) / 2, 1).tolist()
+    assert len(square.segments_near(-5000, -5000, 10)) == 0
+
+
+def test_rejects_bad_magic_and_version(tmp_path):
+    bad_magic = tmp_path / "magic.pack"
+    bad_magic.write_bytes(b"NOPE" + struct.pack("<HHI", 1, 0, 0))
+    with pytest.raises(ValueError, match="magic"):
+        ai_track_pack.load_track_pack(str(bad_magic))
+
+    bad_version = tmp_path / "version.pack"
+    _write_pack(bad_version, [], version=99)
+    with pytest.raises(ValueError, match="version"):
+        ai_track_pack.load_track_pack(str(bad_version))
+
+
+@pytest.mark.skipif(not os.path.exists(ai_track_pack.DEFAULT_PACK_PATH), reason="run `npm run build:tracks` first")
+def test_built_pack_is_consistent():
+    tracks = ai_track_pack.load_track_pack()
+    assert tracks
+    for t in tracks.values():
+        assert t.segments.shape[0] == int(np.sum(t.ring_segment_counts))
+        assert int(t.cell_start[-1]) == len(t.cell_segments)
+        assert int(t.cell_segments.max()) < len(t.segments)
@@ -0,0 +1,147 @@
+from typing import Any, Dict
+
+import numpy as np
+import pytest
+import torch
+from stable_baselines3 import PPO
+from stable_baselines3.common.callbacks import BaseCallback
+from stable_baselines3.common.vec_env import DummyVecEnv
+
+import ai_ppo_server
+from ai_ppo_server import AppliedActionCallback, DriftGymEnv, GameBridge, ReasonCounter, WarmupCurriculum
+
+N_ENVS = 2
+N_STEPS = 32
+EPISODE_STEPS = 10
+WARMUP_STEPS = 5
+
+
+@pytest.fixture
+def fresh_curriculum(monkeypatch):
+    reasons = ReasonCounter(window=20)
+    curriculum = WarmupCurriculum()
+    monkeypatch.setattr(ai_ppo_server, "REASONS", reasons)
+    monkeypatch.setattr(ai_ppo_server, "CURRICULUM", curriculum)
+    monkeypatch.setattr(ai_ppo_server, "CURRICULUM_WINDOW", 20)
+    monkeypatch.setattr(ai_ppo_server, "CURRICULUM_UPDATE_EVERY", 10)
+    return reasons, curriculum
+
+
+class FakeGameBridge(GameBridge):
+    """In-process game: random observations, fixed-length episodes, records every action it applies."""
+
+    def __init__(self, seed: int):
+        super().__init__()
+        self.spawn_sampler = None
+        self.rng = np.random.default_rng(seed)
+        self.t = 0
+        self.steps = []  # per step: (action received from SB3, clamped action in policy space or None)
+
+    def _request(self, msg: Any) -> Dict[str, Any]:
+        obs = self.rng.uniform(-1, 1, self.obs_dim).tolist()
+        if msg["type"] == "reset":
+            self.t = 0
+            return {"type": "reset_result", "obs": obs, "info": {}}
+        self.t += 1
+        done = self.t >= EPISODE_STEPS
+        return {"type": "step_result", "obs": obs, "reward": float(self.rng.standard_normal()),
+                "done": done, "info": {"reason": "timeout"} if done else {}}
+
+    def _notify(self, msg: Any):
+        pass
+
+    def _game_action(self, action_vec: np.ndarray, agent: int):
+        game_action = super()._game_action(action_vec, agent)
+        self.steps.append((np.array(action_vec, dtype=np.float32), self._applied_actions[agent]))
+        return game_action
+
+
+class RolloutRecorder(BaseCallback):
+    """Copies the filled rollout buffer and the policy's log-probs for it, before the update."""
+
+    def _on_rollout_end(self) -> None:
+        buffer = self.model.rollout_buffer
+        self.actions = buffer.actions.copy()
+        self.log_probs = buffer.log_probs.copy()
+        with torch.no_grad():
+            obs = torch.as_tensor(buffer.observations.reshape(-1, buffer.obs_shape[0]))
+            act = torch.as_tensor(buffer.actions.reshape(-1, buffer.action_dim))
+            _values, log_prob, _entropy = self.model.policy.evaluate_actions(obs, act)
+        self.evaluated = log_prob.numpy().reshape(self.log_probs.shape)
+
+    def _on_step(self) -> bool:
+        return True
+
+
+def test_rollout_stores_applied_actions_and_their_log_probs(monkeypatch, fresh_curriculum):
+    monkeypatch.setattr(ai_ppo_server, "ADAPTIVE_WARMUP", False)
+    monkeypatch.setattr(ai_ppo_server, "WARMUP_STEPS_PER_EPISODE", WARMUP_STEPS)
+    bridges = [FakeGameBridge(seed) for seed in range(N_ENVS)]
+    env = DummyVecEnv([lambda b=b: DriftGymEnv(b, frame_skip=1) for b in bridges])
+    model = PPO("MlpPolicy", env, n_steps=N_STEPS, batch_size=N_STEPS, n_epochs=1, device="cpu", seed=0)
+    recorder = RolloutRecorder()
+
+    model.learn(total_timesteps=N_STEPS * N_ENVS, callback=[AppliedActionCallback(), recorder])
+
+    relabeled = 0
+    for env_idx, bridge in enumerate(bridges):
+        assert len(bridge.steps) >= N_STEPS
+        for t, (received, applied) in enumerate(bridge.steps[:N_STEPS]):
+            stored = recorder.actions[t, env_idx]
+            if applied is not None:
+                # Clamped warmup step: the buffer holds what the game applied
+                np.testing.assert_array_equal(stored, np.asarray(applied, dtype=np.float32))
+                relabeled += 1
+            else:
+                # SB3 keeps the unclipped sample and sends the clipped one
+                np.testing.assert_array_equal(np.clip(stored, -1.0, 1.0), received)
+    # Warmup covers the first half of every episode
+    assert 0 < relabeled < N_STEPS * N_ENVS
+
+    np.testing.assert_allclose(recorder.log_probs, recorder.evaluated, rtol=1e-5, atol=1e-5)
+
+
+def test_warmup_level_follows_the_rolling_stuck_rate(fresh_curriculum):
+    reasons, curriculum = fresh_curriculum
+    levels = []
+
+    def episodes(reason, n):
+        for _ in range(n):
+            reasons.add(reason)
+            curriculum.on_episode_end()
+            if reasons.episodes % 10 == 0:
+                levels.append(round(curriculum.level, 6))
+
+    # Needs a full window before the first update, then anneals while nobody gets stuck
+    episodes("timeout", 40)
+    assert levels == [1.0, 0.9, 0.8, 0.7]
+    assert curriculum.warmup_steps() == round(ai_ppo_server.WARMUP_STEPS_PER_EPISODE * 0.7)
+
+    # Stuck rate 0.1 is inside the band: no change
+    episodes("stuck", 1)
+    episodes("timeout", 9)
+    episodes("stuck", 1)
+    episodes("timeout", 9)
+    assert levels[-2:] == [0.7, 0.7]
+
+    # Stuck episodes push the rolling rate up: the warmup comes back
+    episodes("stuck", 20)
+    assert levels[-2:] == [0.8, 0.9]
+
+    # Level 0 leaves actions alone
+    curriculum.level = 0.0
+    assert curriculum.clamp(0.0, 1.0, 1.0) == (0.0, 1.0, 1.0)
+    assert curriculum.warmup_steps() == 0
+
+
+def test_fixed_warmup_without_adaptive_curriculum(monkeypatch, fresh_curriculum):
+    monkeypatch.setattr(ai_ppo_server, "ADAPTIVE_WARMUP", False)
+    reasons, curriculum = fresh_curriculum
+    for _ in range(50):
+        reasons.add("timeout")
+        curriculum.on_episode_end()
+    assert curriculum.level == 1.0
+    throttle, brake, handbrake = curriculum.clamp(0.0, 1.0, 1.0)
+    assert throttle == ai_ppo_server.MIN_THROTTLE_DURING_WARMUP
+    assert brake == pytest.approx(ai_ppo_server.MAX_BRAKE_DURING_WARMUP)
+    assert handbrake == (0.0 if ai_ppo_server.DISABLE_HANDBRAKE_DURING_WARMUP else 1.0)
@@ -0,0 +1,45 @@
+/**
+ * Compiles src/assets/tracks.json into src/assets/tracks.pack (see src/race/TrackPack.ts
+ * for the layout). Run after editing tracks:
+ *
+ *   npm run build:tracks
+ */
+import * as fs from "fs";
+import * as path from "path";
+import { buildTrackPackEntry, decodeTrackPack, encodeTrackPack, TRACK_PACK_VERSION } from "../src/race/TrackPack";
+
+const assetsDir = path.resolve(__dirname, '..', 'src', 'assets');
+const inputPath = path.join(assetsDir, 'tracks.json');
+const outputPath = path.join(assetsDir, 'tracks.pack');
+
+function main(): void {
+    const json = JSON.parse(fs.readFileSync(inputPath, 'utf8'));
+    const tracks = Array.isArray(json?.tracks) ? json.tracks : [];
+    if (tracks.length === 0) {
+        throw new Error(`No tracks in ${inputPath}`);
+    }
+
+    const entries = tracks.map(buildTrackPackEntry);
+    const buffer = encodeTrackPack(entries);
+
+    // Round-trip before writing so a broken pack never lands in assets
+    const decoded = decodeTrackPack(buffer);
+    decoded.forEach((entry, i) => {
+        if (entry.name !== entries[i].name ||
+            entry.checkpoints.length !== entries[i].checkpoints.length ||
+            entry.segments.length !== entries[i].segments.length) {
+            throw new Error(`Round-trip mismatch for track ${entries[i].name}`);
+        }
+    });
+
+    fs.writeFileSync(outputPath, new Uint8Array(buffer));
+    for (const entry of entries) {
+        console.log(
+            `  ${entry.name}: ${entry.segments.length / 4} segments, ${entry.checkpoints.length} checkpoints, ` +
+            `${entry.grid.cols}x${entry.grid.rows} cells`
+        );
+    }
+    console.log(`Wrote ${outputPath} (v${TRACK_PACK_VERSION}, ${entries.length} tracks, ${buffer.byteLength} bytes)`);
+}
+
+main();
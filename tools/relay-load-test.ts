@@ -0,0 +1,345 @@
+/**
+ * Load test for the multiplayer relay (server.ts). Opens a fleet of simulated
+ * clients against a local server, publishes realistic PlayerState updates
+ * (driving cars, trail stamps, spark/smoke bursts) at game rate and reports
+ * end-to-end broadcast latency, drop rate and server CPU:
+ *
+ *   npx ts-node server.ts                      # in another terminal
+ *   npm run loadtest:relay -- --clients 300 --duration 60
+ *
+ * Options: --url ws://localhost:3000/ws --clients 200 --hz 20 --duration 30 --ramp 5
+ *          --observers 20 --frames 1 --json out.json
+ *
+ * Every client publishes; only --observers of them decode what they receive, so
+ * the tester itself does not become the bottleneck. All clients share this
+ * process's clock, so tMs (ms since test start) gives exact sender -> server ->
+ * receiver latency. tServerMs splits off the server -> receiver leg, measured
+ * above its best case since the server clock has its own origin.
+ */
+import * as path from "path";
+import { performance } from "perf_hooks";
+import * as protobuf from "protobufjs";
+import ServerMessageDecoder, { PlayerStateMessage } from "../src/net/ServerMessageDecoder";
+import { RELAY_FRAMES_ACK } from "../src/net/RelayWire";
+
+const WS = require('ws');
+
+const ID_PREFIX = 'loadtest_';
+const MAP_SIZE = { width: 5000, height: 4000 };
+const HISTOGRAM_MAX_MS = 5000;
+
+function parseArgs(argv: string[]): Record<string, string> {
+    const args: Record<string, string> = {};
+    for (let i = 0; i < argv.length; i++) {
+        if (argv[i].startsWith('--') && i + 1 < argv.length) {
+            args[argv[i].slice(2)] = argv[i + 1];
+            i++;
+        }
+    }
+    return args;
+}
+
+const args = parseArgs(process.argv.slice(2));
+const config = {
+    url: args.url || 'ws://localhost:3000/ws',
+    clients: Number(args.clients || 200),
+    hz: Number(args.hz || 20),
+    durationS: Number(args.duration || 30),
+    rampS: Number(args.ramp || 5),
+    observers: Number(args.observers || 20),
+    frames: (args.frames ?? '1') === '1',
+    json: args.json || null,
+};
+
+const root = protobuf.loadSync(path.resolve(__dirname, '..', 'src', 'assets', 'player.proto'));
+const PlayerState = root.lookupType('PlayerState');
+const decoder = new ServerMessageDecoder(PlayerState, root.lookupType('RelayFrame'));
+
+const t0 = performance.now();
+const nowMs = () => performance.now() - t0;
+
+/** 1 ms buckets; everything above HISTOGRAM_MAX_MS lands in the last one. */
+class LatencyHistogram {
+    private buckets = new Uint32Array(HISTOGRAM_MAX_MS + 1);
+    count = 0;
+    max = 0;
+
+    add(ms: number): void {
+        const bucket = Math.min(HISTOGRAM_MAX_MS, Math.max(0, Math.round(ms)));
+        this.buckets[bucket]++;
+        this.count++;
+        this.max = Math.max(this.max, ms);
+    }
+
+    percentile(p: number): number {
+        if (this.count === 0) return NaN;
+        const target = Math.ceil(this.count * p);
+        let seen = 0;
+        for (let ms = 0; ms < this.buckets.length; ms++) {
+            seen += this.buckets[ms];
+            if (seen >= target) return ms;
+        }
+        return HISTOGRAM_MAX_MS;
+    }
+
+    reset(): void {
+        this.buckets.fill(0);
+        this.count = 0;
+        this.max = 0;
+    }
+}
+
+const endToEnd = new LatencyHistogram();
+// recv - tServerMs above the lowest value seen while ramping up (clocks differ by an unknown offset).
+// The floor is frozen when measuring starts so every sample is taken against the same baseline.
+const serverToClient = new LatencyHistogram();
+let serverToClientFloor = Infinity;
+let serverToClientFloorFrozen = false;
+const totals = { sent: 0, received: 0, gaps: 0, bytesIn: 0, connectErrors: 0, closed: 0 };
+
+class LoadClient {
+    private ws: any = null;
+    private timer: ReturnType<typeof setInterval> | null = null;
+    private lastSeqBySender = new Map<string, number>();
+    // Frames are only decoded once the server acknowledged ?frames=1
+    private relayFrames = false;
+    private readonly id: string;
+    private readonly center: { x: number; y: number };
+    private readonly radius: number;
+    private readonly angularSpeed: number;
+    private phase: number;
+
+    constructor(private readonly index: number, private readonly observer: boolean) {
+        this.id = `${ID_PREFIX}${index}`;
+        this.center = { x: Math.random() * MAP_SIZE.width, y: Math.random() * MAP_SIZE.height };
+        this.radius = 200 + Math.random() * 400;
+        this.angularSpeed = 0.6 + Math.random() * 0.8; // rad/s
+        this.phase = Math.random() * Math.PI * 2;
+    }
+
+    connect(): void {
+        this.ws = new WS(config.frames ? `${config.url}?frames=1` : config.url);
+        this.ws.binaryType = 'arraybuffer';
+        this.ws.on('open', () => {
+            // Random phase so updates don't arrive in lockstep
+            setTimeout(() => {
+                this.timer = setInterval(() => this.publish(), 1000 / config.hz);
+            }, Math.random() * (1000 / config.hz));
+        });
+        this.ws.on('message', (data: ArrayBuffer, isBinary: boolean) => {
+            if (!isBinary) {
+                this.relayFrames = this.relayFrames || Buffer.from(data).toString() === RELAY_FRAMES_ACK;
+                return;
+            }
+            this.receive(data);
+        });
+        this.ws.on('error', () => { totals.connectErrors++; });
+        this.ws.on('close', () => {
+            totals.closed++;
+            this.stop();
+        });
+    }
+
+    close(): void {
+        this.stop();
+        this.ws?.close();
+    }
+
+    private stop(): void {
+        if (this.timer) {
+            clearInterval(this.timer);
+            this.timer = null;
+        }
+    }
+
+    private publish(): void {
+        if (!this.ws || this.ws.readyState !== WS.OPEN) return;
+
+        const t = nowMs();
+        this.phase += this.angularSpeed / config.hz;
+        const x = this.center.x + Math.cos(this.phase) * this.radius;
+        const y = this.center.y + Math.sin(this.phase) * this.radius;
+        const speed = this.angularSpeed * this.radius;
+        const angle = this.phase + Math.PI / 2;
+        const drifting = Math.sin(this.phase * 3 + this.index) > 0.3;
+
+        // Same caps as ServerConnection.sendUpdate: up to 5 stamps, 2 spark + 2 smoke bursts
+        const stamps = drifting ? Array.from({ length: 1 + Math.floor(Math.random() * 5) }, () => ({
+            x, y, angle, weight: Math.random(), h: 200 * Math.random(), s: 80, b: 60,
+            overscore: false, tMs: Math.round(t), a: 0.8
+        })) : [];
+        const bursts = drifting && Math.random() < 0.5 ? Array.from({ length: 1 + Math.floor(Math.random() * 4) }, (_, i) => ({
+            x, y, dirAngle: angle, slip: Math.random(), count: 6, ttlMs: 400,
+            stageId: i % 2 ? 'smoke' : 'sparks', seed: Math.floor(Math.random() * 1e9), tMs: Math.round(t)
+        })) : [];
+
+        const payload = PlayerState.encode(PlayerState.create({
+            id: this.id,
+            name: `Load ${this.index}`,
+            car: {
+                position: { x, y },
+                drifting,
+                angle,
+                vx: -Math.sin(this.phase) * speed,
+                vy: Math.cos(this.phase) * speed,
+                angVel: this.angularSpeed
+            },
+            score: { frameScore: drifting ? 50 : 0, driftScore: 1000 * this.index, highScore: 0 },
+            stamps,
+            bursts,
+            tMs: Math.round(t)
+        })).finish();
+
+        this.ws.send(payload);
+        totals.sent++;
+    }
+
+    private receive(data: ArrayBuffer): void {
+        totals.bytesIn += data.byteLength;
+        if (!this.observer) return;
+
+        const recvMs = nowMs();
+        const states: PlayerStateMessage[] = this.relayFrames ? decoder.decodeFrame(data) : [decoder.decode(data)];
+        for (const state of states) {
+            if (!state.id?.startsWith(ID_PREFIX)) continue;
+            totals.received++;
+
+            endToEnd.add(recvMs - state.tMs);
+            if (state.tServerMs) {
+                const raw = recvMs - state.tServerMs;
+                if (!serverToClientFloorFrozen || serverToClientFloor === Infinity) {
+                    serverToClientFloor = Math.min(serverToClientFloor, raw);
+                }
+                // Anything below the frozen floor is best case and lands in the 0 ms bucket
+                serverToClient.add(raw - serverToClientFloor);
+            }
+
+            const last = this.lastSeqBySender.get(state.id);
+            if (state.seq) {
+                if (last !== undefined && state.seq > last + 1) {
+                    totals.gaps += state.seq - last - 1;
+                }
+                if (last === undefined || state.seq > last) {
+                    this.lastSeqBySender.set(state.id, state.seq);
+                }
+            }
+        }
+    }
+}
+
+interface RelayStats {
+    clients: number;
+    cpuUserMs: number;
+    cpuSystemMs: number;
+    uptimeMs: number;
+    droppedPending?: number;
+    droppedSlow?: number;
+    [key: string]: unknown;
+}
+
+async function fetchRelayStats(): Promise<RelayStats | null> {
+    const statsUrl = config.url.replace(/^ws/, 'http').replace(/\/ws\/?$/, '') + '/relay-stats';
+    try {
+        const res = await fetch(statsUrl);
+        return res.ok ? (await res.json()) as RelayStats : null;
+    } catch {
+        return null;
+    }
+}
+
+function serverCpuPercent(a: RelayStats | null, b: RelayStats | null): number | null {
+    if (!a || !b || b.uptimeMs <= a.uptimeMs) return null;
+    const cpuMs = (b.cpuUserMs + b.cpuSystemMs) - (a.cpuUserMs + a.cpuSystemMs);
+    return 100 * cpuMs / (b.uptimeMs - a.uptimeMs);
+}
+
+function dropRate(): number {
+    const expected = totals.received + totals.gaps;
+    return expected > 0 ? totals.gaps / expected : 0;
+}
+
+const sleep = (ms: number) => new Promise(resolve => setTimeout(resolve, ms));
+
+async function main(): Promise<void> {
+    console.log(`[loadtest] ${config.clients} clients (${config.observers} observing) -> ${config.url}, ` +
+        `${config.hz} Hz, ramp ${config.rampS}s, measure ${config.durationS}s, frames ${config.frames ? 'on' : 'off'}`);
+
+    const clients: LoadClient[] = [];
+    for (let i = 0; i < config.clients; i++) {
+        const client = new LoadClient(i, i < config.observers);
+        clients.push(client);
+        client.connect();
+        await sleep((config.rampS * 1000) / config.clients);
+    }
+
+    // Measure only the steady state after the ramp
+    await sleep(1000);
+    endToEnd.reset();
+    serverToClient.reset();
+    serverToClientFloorFrozen = true;
+    Object.assign(totals, { sent: 0, received: 0, gaps: 0, bytesIn: 0 });
+    const statsStart = await fetchRelayStats();
+    const measureStart = nowMs();
+
+    const progress = setInterval(() => {
+        const elapsedS = (nowMs() - measureStart) / 1000;
+        console.log(`[loadtest] ${elapsedS.toFixed(0)}s: e2e p50 ${endToEnd.percentile(0.5)} ms, ` +
+            `p99 ${endToEnd.percentile(0.99)} ms, drops ${(100 * dropRate()).toFixed(2)}%, ` +
+            `in ${(totals.bytesIn / 1024 / 1024 / elapsedS).toFixed(1)} MB/s`);
+    }, 5000);
+
+    await sleep(config.durationS * 1000);
+    clearInterval(progress);
+    const statsEnd = await fetchRelayStats();
+    const elapsedS = (nowMs() - measureStart) / 1000;
+    clients.forEach(client => client.close());
+
+    const cpu = serverCpuPercent(statsStart, statsEnd);
+    const result = {
+        config,
+        publishedPerSec: totals.sent / elapsedS,
+        observedStates: totals.received,
+        endToEndMs: {
+            p50: endToEnd.percentile(0.5),
+            p95: endToEnd.percentile(0.95),
+            p99: endToEnd.percentile(0.99),
+            max: endToEnd.max
+        },
+        serverToClientAboveFloorMs: {
+            p50: serverToClient.percentile(0.5),
+            p95: serverToClient.percentile(0.95),
+            p99: serverToClient.percentile(0.99)
+        },
+        dropRate: dropRate(),
+        receivedMBPerSec: totals.bytesIn / 1024 / 1024 / elapsedS,
+        connectErrors: totals.connectErrors,
+        serverCpuPercent: cpu,
+        serverStats: statsEnd
+    };
+
+    console.log('[loadtest] ---- result ----');
+    console.log(`[loadtest] published ${result.publishedPerSec.toFixed(0)} updates/s`);
+    console.log(`[loadtest] end-to-end latency p50 ${result.endToEndMs.p50} / p95 ${result.endToEndMs.p95} / ` +
+        `p99 ${result.endToEndMs.p99} / max ${result.endToEndMs.max.toFixed(0)} ms`);
+    console.log(`[loadtest] server -> client above best case p50 ${result.serverToClientAboveFloorMs.p50} / ` +
+        `p95 ${result.serverToClientAboveFloorMs.p95} / p99 ${result.serverToClientAboveFloorMs.p99} ms`);
+    // With RELAY_INTEREST_RADIUS set, far players are skipped on purpose and show up as gaps too
+    const interestNote = statsEnd && Number(statsEnd.interestRadius) > 0 ? ', includes interest-filtered updates' : '';
+    console.log(`[loadtest] drop rate ${(100 * result.dropRate).toFixed(2)}% (seq gaps at observers${interestNote})` +
+        (statsEnd ? `, server dropped ${statsEnd.droppedPending ?? 0} queued / ${statsEnd.droppedSlow ?? 0} to slow sockets` : ''));
+    console.log(`[loadtest] server CPU ${cpu === null ? 'n/a (no /relay-stats)' : `${cpu.toFixed(0)}% of one core`}`);
+    if (totals.connectErrors > 0) {
+        console.log(`[loadtest] ${totals.connectErrors} connection errors`);
+    }
+
+    if (config.json) {
+        require('fs').writeFileSync(config.json, JSON.stringify(result, null, 2));
+        console.log(`[loadtest] wrote ${config.json}`);
+    }
+    setTimeout(() => process.exit(0), 500);
+}
+
+main().catch((error) => {
+    console.error('[loadtest] failed', error);
+    process.exit(1);
+});
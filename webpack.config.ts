@@ -2,7 +2,10 @@ const path = require('path');
 const CopyWebpackPlugin = require('copy-webpack-plugin');
 
 module.exports = {
-    entry: './src/main.ts', // orchestrates runtime bootstrapping
+    entry: {
+        bundle: './src/main.ts', // orchestrates runtime bootstrapping
+        trainingWorker: './src/sim/trainingWorker.ts', // browser training off the main thread (?ai=1&worker=1)
+    },
     mode: 'development',
     module: {
         rules: [
@@ -56,7 +59,7 @@ module.exports = {
         }),
     ],
     output: {
-        filename: 'bundle.js',
+        filename: '[name].js',
         path: path.resolve(__dirname, 'dist'), // the output directory
     },
 };